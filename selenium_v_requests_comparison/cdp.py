@@ -0,0 +1,354 @@
+"""
+Direct Chrome DevTools Protocol Backend
+---------------------------------------
+Drives headless Chrome over a raw DevTools Protocol (CDP) websocket instead of
+WebDriver, so pages can be loaded and scraped without a chromedriver HTTP round
+trip per command. Benchmarked next to Selenium, the difference between the two
+is the overhead WebDriver adds on top of the browser itself.
+
+Chrome is started with ``--remote-debugging-port=0`` and the chosen port is
+read back from the ``DevToolsActivePort`` file in its profile directory, so
+concurrent browsers never race for a port.
+"""
+
+import collections
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+# Page lifecycle events Chrome reports, in the order they usually fire
+LIFECYCLE_EVENTS = ("DOMContentLoaded", "load", "networkAlmostIdle", "networkIdle")
+DEFAULT_LIFECYCLE = "load"
+DEFAULT_TIMEOUT = 10.0
+STARTUP_TIMEOUT = 20.0
+DEVTOOLS_PORT_FILENAME = "DevToolsActivePort"
+# Returns the text of every scraped job title on the page
+EXTRACTION_SCRIPT = (
+    "Array.from(document.getElementsByClassName('job-card-list__title'),"
+    " element => element.textContent)"
+)
+
+
+class CDPError(RuntimeError):
+    """
+    Raised when Chrome answers a CDP command with an error.
+    """
+
+
+def as_expression(script: str) -> str:
+    """
+    Wraps a WebDriver-style script body (using ``return``) as an expression.
+    """
+    return f"(() => {{ {script} }})()"
+
+
+class CDPConnection:
+    """
+    A websocket connection to one DevTools target.
+
+    Command responses are matched to requests by id; events received while
+    waiting are buffered for ``wait_for_event``.
+
+    Args:
+        websocket_url (str): The target's ``webSocketDebuggerUrl``.
+        timeout (float): Seconds to wait for each command's response.
+    """
+
+    def __init__(self, websocket_url: str, timeout: float = DEFAULT_TIMEOUT):
+        import websocket
+
+        self.timeout = timeout
+        # Chrome rejects websocket connections that send an unknown Origin
+        self._ws = websocket.create_connection(
+            websocket_url, timeout=timeout, suppress_origin=True
+        )
+        self._next_id = 0
+        self._events = collections.deque()
+
+    def _receive(self, deadline: float) -> dict:
+        import websocket
+
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError("Timed out waiting for a CDP message.")
+        self._ws.settimeout(remaining)
+        try:
+            return json.loads(self._ws.recv())
+        except websocket.WebSocketTimeoutException:
+            raise TimeoutError("Timed out waiting for a CDP message.") from None
+
+    def send(self, method: str, params: dict | None = None) -> dict:
+        """
+        Sends a command and waits for its result.
+
+        Args:
+            method (str): CDP method, e.g. ``"Page.navigate"``.
+            params (dict, optional): Command parameters.
+
+        Returns:
+            dict: The command's result.
+
+        Raises:
+            CDPError: If Chrome reports an error for the command.
+            TimeoutError: If no response arrives within the timeout.
+        """
+        self._next_id += 1
+        message_id = self._next_id
+        self._ws.send(
+            json.dumps({"id": message_id, "method": method, "params": params or {}})
+        )
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            message = self._receive(deadline)
+            if message.get("id") == message_id:
+                if "error" in message:
+                    raise CDPError(f"{method}: {message['error'].get('message')}")
+                return message.get("result", {})
+            if "method" in message:
+                self._events.append(message)
+
+    def wait_for_event(self, predicate, timeout: float = DEFAULT_TIMEOUT) -> dict:
+        """
+        Returns the first buffered or incoming event matching a predicate.
+
+        Args:
+            predicate (callable): Called with each event message.
+            timeout (float): Seconds to wait.
+
+        Raises:
+            TimeoutError: If no matching event arrives in time.
+        """
+        for event in list(self._events):
+            if predicate(event):
+                self._events.remove(event)
+                return event
+        deadline = time.perf_counter() + timeout
+        while True:
+            message = self._receive(deadline)
+            if "method" not in message:
+                continue
+            if predicate(message):
+                return message
+            self._events.append(message)
+
+    def clear_events(self) -> None:
+        """
+        Discards buffered events, e.g. those from a previous page.
+        """
+        self._events.clear()
+
+    def close(self) -> None:
+        self._ws.close()
+
+
+def read_devtools_port(profile_dir: str) -> int | None:
+    """
+    Reads the debugging port Chrome chose from its ``DevToolsActivePort`` file.
+
+    Returns:
+        int: The port, or None if Chrome has not written it yet.
+    """
+    try:
+        with open(os.path.join(profile_dir, DEVTOOLS_PORT_FILENAME)) as f:
+            return int(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def page_websocket_url(port: int) -> str | None:
+    """
+    Returns the websocket URL of the first page target on a debugging port.
+    """
+    with urllib.request.urlopen(
+        f"http://127.0.0.1:{port}/json/list", timeout=2
+    ) as response:
+        targets = json.load(response)
+    for target in targets:
+        if target.get("type") == "page":
+            return target["webSocketDebuggerUrl"]
+    return None
+
+
+def browser_websocket_url(port: int) -> str:
+    """
+    Returns the websocket URL of the browser target on a debugging port.
+
+    Browser-wide domains such as ``Tracing`` are driven through this target.
+    """
+    with urllib.request.urlopen(
+        f"http://127.0.0.1:{port}/json/version", timeout=2
+    ) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
+
+
+class CDPBrowser:
+    """
+    A headless Chrome process driven over CDP.
+
+    Args:
+        chrome_binary (str): Chrome or Chromium executable.
+        profile_dir (str, optional): Chrome user-data-dir; a temporary one is
+            created and removed on close when omitted.
+        timeout (float): Seconds to wait for each CDP command.
+    """
+
+    def __init__(
+        self,
+        chrome_binary: str,
+        profile_dir: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.chrome_binary = chrome_binary
+        self.timeout = timeout
+        self._temp_dir = None if profile_dir else tempfile.TemporaryDirectory()
+        self.profile_dir = profile_dir or self._temp_dir.name
+        self.process = None
+        self.connection = None
+        # Debugging port Chrome picked, once started
+        self.port = None
+
+    def start(self) -> None:
+        """
+        Launches Chrome and connects to its initial page.
+
+        On failure the browser is closed, so its temporary profile is removed.
+
+        Raises:
+            RuntimeError: If Chrome exits during startup.
+            TimeoutError: If Chrome does not expose a page in time.
+        """
+        try:
+            self._launch()
+        except BaseException:
+            self.close()
+            raise
+
+    def _launch(self) -> None:
+        self.process = subprocess.Popen(
+            [
+                self.chrome_binary,
+                "--headless",
+                "--no-sandbox",
+                "--disable-dev-shm-usage",
+                "--disable-gpu",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--remote-allow-origins=*",
+                "--remote-debugging-port=0",
+                f"--user-data-dir={self.profile_dir}",
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.perf_counter() + STARTUP_TIMEOUT
+        websocket_url = None
+        while websocket_url is None:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Chrome exited with code {self.process.returncode}."
+                )
+            if time.perf_counter() >= deadline:
+                raise TimeoutError("Chrome did not expose a DevTools page in time.")
+            port = read_devtools_port(self.profile_dir)
+            if port is not None:
+                try:
+                    websocket_url = page_websocket_url(port)
+                except OSError:
+                    pass
+            if websocket_url is None:
+                time.sleep(0.05)
+        self.port = port
+        self.connection = CDPConnection(websocket_url, self.timeout)
+        self.connection.send("Page.enable")
+        self.connection.send("Page.setLifecycleEventsEnabled", {"enabled": True})
+        logging.debug(f"CDP browser connected to {websocket_url}")
+
+    def navigate(
+        self,
+        url: str,
+        lifecycle: str = DEFAULT_LIFECYCLE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """
+        Navigates the page and waits for a lifecycle event of the new document.
+
+        Args:
+            url (str): URL to load.
+            lifecycle (str): One of ``LIFECYCLE_EVENTS``.
+            timeout (float): Seconds to wait for the event.
+
+        Returns:
+            bool: True if the event fired, False on timeout.
+
+        Raises:
+            CDPError: If the navigation itself fails, e.g. DNS errors.
+        """
+        self.connection.clear_events()
+        result = self.connection.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        loader_id = result.get("loaderId")
+
+        def is_ready(message):
+            params = message.get("params", {})
+            return (
+                message["method"] == "Page.lifecycleEvent"
+                and params.get("name") == lifecycle
+                and params.get("loaderId") == loader_id
+            )
+
+        try:
+            self.connection.wait_for_event(is_ready, timeout)
+        except TimeoutError:
+            logging.warning(f"No {lifecycle} event after {timeout}s for {url}.")
+            return False
+        return True
+
+    def evaluate(self, expression: str):
+        """
+        Evaluates a JavaScript expression in the page and returns its value.
+
+        Raises:
+            CDPError: If the expression throws.
+        """
+        result = self.connection.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True, "awaitPromise": True},
+        )
+        if "exceptionDetails" in result:
+            raise CDPError(result["exceptionDetails"].get("text", "Evaluation failed"))
+        return result.get("result", {}).get("value")
+
+    def close(self) -> None:
+        """
+        Closes the connection, stops Chrome and removes a temporary profile.
+        """
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                logging.debug("Failed to close CDP connection.", exc_info=True)
+            self.connection = None
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -2,29 +2,185 @@
 Comparison Tool between Selenium and Requests
 ------------------------------------------------
 This script measures the performance of fetching data using the 'requests'
-library and Selenium. It collects execution times for API and a JavaScript 
+library and Selenium. It collects execution times for API and a JavaScript
 rendered webpage, then generates a boxplot to compare the results.
 
 Usage:
-    python comparison.py [--debug]
+    python comparison.py [--debug] [--methods requests,selenium,cdp]
 
 Ensure Google Chrome is installed for Selenium to work.
 """
 
 import time
-import requests
+import functools
 import logging
 import argparse
 import os  # Added to check for Chrome binary
 import tempfile  # Added for temporary user data dir
-import shutil  # Added for cleaning up the temporary directory
 import socket  # Added for free port lookup
+import sys
+
+import requests
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-import matplotlib.pyplot as plt
+from selenium_v_requests_comparison.cdp import (
+    DEFAULT_LIFECYCLE,
+    EXTRACTION_SCRIPT,
+    LIFECYCLE_EVENTS,
+    CDPBrowser,
+    as_expression,
+)
+from selenium_v_requests_comparison.distributed import (
+    DEFAULT_COORDINATOR_PORT,
+    DEFAULT_LEASE_TIMEOUT,
+    AgentClient,
+    Coordinator,
+    agent_summary,
+    run_agent,
+)
+from selenium_v_requests_comparison.drivers import (
+    CHROME_BINARY_LOCATIONS as PLATFORM_CHROME_LOCATIONS,
+    DRIVER_PATH_ENV,
+    OFFLINE_ENV,
+    find_chrome,
+    platform_key,
+    resolve_chromedriver,
+)
+from selenium_v_requests_comparison.experiment import (
+    METHOD_LABELS,
+    apply_to_args,
+    group_label,
+    load_experiment,
+    run_experiment,
+)
+from selenium_v_requests_comparison.extraction import (
+    DEFAULT_SELECTOR as DEFAULT_EXTRACT_SELECTOR,
+    SelectorExtractor,
+    extract_stream,
+)
+from selenium_v_requests_comparison.history import (
+    HISTORY_DIR,
+    SUBCOMMANDS as HISTORY_SUBCOMMANDS,
+    archive_run,
+    main as history_main,
+    save_baseline,
+)
+from selenium_v_requests_comparison.httpcache import (
+    DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES,
+    HTTPCache,
+    browser_cache_outcome,
+)
+from selenium_v_requests_comparison.load import (
+    DEFAULT_CONCURRENCY_LEVELS,
+    DEFAULT_LOAD_DURATION,
+    LOAD_CURVE_FILENAME,
+    plot_load_curve,
+    run_load_curve,
+)
+from selenium_v_requests_comparison.metrics import (
+    DEFAULT_ABORT_MIN_SAMPLES,
+    ErrorBudget,
+    MetricsRegistry,
+    MetricsServer,
+    RunAborted,
+)
+from selenium_v_requests_comparison.openloop import (
+    ARRIVAL_DISTRIBUTIONS,
+    DEFAULT_OPEN_LOOP_DURATION,
+    DEFAULT_RATES,
+    DEFAULT_SLO_P99,
+    DEFAULT_WORKERS as DEFAULT_OPEN_LOOP_WORKERS,
+    OPEN_LOOP_FILENAME,
+    find_sustainable_rate,
+    plot_open_loop,
+)
+from selenium_v_requests_comparison.pool import WebDriverPool
+from selenium_v_requests_comparison.profiles import (
+    LOAD_PROFILES,
+    PAGE_LOAD_STRATEGIES,
+    PROFILE_MATRIX_FILENAME,
+    RESOURCE_TYPE_PATTERNS,
+    apply_blocking,
+    blocked_url_patterns,
+    compare_to_baseline,
+    format_profile_row,
+    plot_profile_matrix,
+    run_profile_matrix,
+)
+from selenium_v_requests_comparison.profiling import (
+    DEFAULT_PROFILE_DIR,
+    DEFAULT_TRACE_EVERY,
+    Profiler,
+    driver_debugging_port,
+    profile_section,
+    profiling,
+    top_functions,
+    trace_section,
+)
+from selenium_v_requests_comparison.readiness import (
+    DEFAULT_SELECTOR,
+    DEFAULT_STRATEGY,
+    DEFAULT_TIMEOUT,
+    STRATEGIES,
+    Readiness,
+)
+from selenium_v_requests_comparison.report import (
+    REPORT_FILENAME,
+    save_boxplot,
+    summarize_series,
+    write_report,
+)
+from selenium_v_requests_comparison.resources import (
+    RESOURCE_METRICS,
+    RESOURCES_FILENAME,
+    driver_pid,
+    plot_resource_usage,
+    sample_resources,
+)
+from selenium_v_requests_comparison.sampling import (
+    DEFAULT_CI_WIDTH,
+    DEFAULT_MAX_SAMPLES,
+    DEFAULT_TIME_BUDGET,
+    DEFAULT_WARMUP,
+    AdaptiveSampler,
+    SampleSet,
+    bootstrap_ci,
+)
+from selenium_v_requests_comparison.server import BenchmarkServer, ServerConfig
+from selenium_v_requests_comparison.session import KeepAliveSession
+from selenium_v_requests_comparison.store import (
+    RESULTS_FILENAME,
+    ResultStore,
+    load_series,
+    read_run,
+)
+from selenium_v_requests_comparison.timing import (
+    DECODE_PHASE,
+    EXTRACT_PHASE,
+    NAVIGATION_TIMING_SCRIPT,
+    FetchRecord,
+    navigation_phases,
+    phase_timer,
+)
+from selenium_v_requests_comparison.transfer import (
+    DEFAULT_ENCODING_SAMPLES,
+    ENCODINGS,
+    ENCODINGS_FILENAME,
+    RESOURCE_SIZES_SCRIPT,
+    compare_encodings,
+    decode_body,
+    format_encoding_row,
+    format_transfer,
+    plot_encodings,
+    resource_sizes,
+    run_encoding_comparison,
+    transfer_counter,
+)
+from selenium_v_requests_comparison.workers import (
+    DEFAULT_WORKER_SAMPLES,
+    WORKER_SCALING_FILENAME,
+    plot_worker_scaling,
+    run_worker_scaling,
+)
 
 # URL for endpoints and global configuration:
 # API_URL: Endpoint for data via Requests.
@@ -34,33 +190,28 @@ SELENIUM_URL = r"https://example.com"
 BOXPLOT_FILENAME = "comparison_boxplot.png"
 # Define the path to the Chrome binary
 CHROME_EXECUTABLE_PATH = r"chrome_installer.exe"
-# Define a list of default Chrome binary locations
-CHROME_BINARY_LOCATIONS = [
-    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-]
+# Define a list of default Chrome binary locations for this platform
+CHROME_BINARY_LOCATIONS = PLATFORM_CHROME_LOCATIONS[platform_key()]
 # Define a global flag to cache the chrome installation status
 IS_CHROME_INSTALLED = True
-# Number of times to run the experiments
+# Fetch methods that can be benchmarked; cdp drives Chrome without WebDriver
+METHODS = ("requests", "selenium", "cdp")
+DEFAULT_METHODS = ("requests", "selenium")
+# (slower, faster) method pairs whose speedup is reported when both ran
+SPEEDUP_PAIRS = (("selenium", "requests"), ("selenium", "cdp"), ("cdp", "requests"))
+# Minimum number of samples per method before the sampler checks convergence
 EXPERIMENT_COUNT = 5
 
 
 # New function to look up the Chrome binary
 def find_chrome_binary() -> str:
     """
-    Finds the Chrome binary in default locations or via PATH.
+    Finds the Chrome or Chromium binary in default locations or via PATH.
 
     Returns:
         str: Chrome binary path if found; otherwise an empty string.
     """
-
-    for path in CHROME_BINARY_LOCATIONS:
-        if os.path.exists(path):
-            return path
-    chrome = shutil.which("chrome")
-    if chrome:
-        return chrome
-    return ""
+    return find_chrome(CHROME_BINARY_LOCATIONS)
 
 
 def install_chrome_if_needed() -> None:
@@ -86,29 +237,161 @@ def install_chrome_if_needed() -> None:
         exit(1)
 
 
-def measure_requests(api_url):
+def measure_requests(
+    api_url,
+    session: KeepAliveSession | None = None,
+    extractor_factory=None,
+    cache: HTTPCache | None = None,
+) -> FetchRecord:
     """
-    Measures and returns the execution time for fetching data using the requests library.
+    Measures the time to fetch data using the requests library, split into phases.
+
+    DNS, connect, TLS and time to first byte are recorded by the session's
+    instrumented connections, which also count the bytes sent and received;
+    body download is timed here after the headers have arrived. HTML bodies
+    are parsed while they stream in when an extractor is given, so the sample
+    includes extraction like the browser paths do; parsing is recorded as the
+    ``extract`` phase and taken out of ``body``.
 
     Args:
         api_url (str): The API endpoint URL.
+        session (KeepAliveSession, optional): Pooled session to send the request
+            through. Without one, a new session and connection are used for the call.
+        extractor_factory (callable, optional): Returns a fresh extractor, e.g. a
+            ``SelectorExtractor``, for each HTML response.
+        cache (HTTPCache, optional): Serve the request through this cache. The
+            sample is tagged with the cache outcome, and the body is read by
+            the cache, so no ``body`` phase is recorded.
 
     Returns:
-        float: Duration in seconds.
+        FetchRecord: The timed sample, tagged with connection reuse when a
+            session was given.
     """
     logging.debug("Starting measure_requests...")
-    # Start time measurement
-    start_time = time.time()
-    response = requests.get(api_url)
-    end_time = time.time()
+    owns_session = session is None
+    if owns_session:
+        session = KeepAliveSession(pool_size=1)
+    extraction = None
+    try:
+        with (
+            sample_resources(os.getpid(), include_children=False) as sampler,
+            phase_timer() as timer,
+            transfer_counter() as counter,
+        ):
+            # Start time measurement
+            start_ns = time.perf_counter_ns()
+            cpu_start = time.thread_time()
+            with profile_section("requests", "fetch"):
+                if cache is not None:
+                    response, outcome = cache.fetch(session, api_url)
+                else:
+                    response = session.get(api_url, stream=True)
+            headers_ns = time.perf_counter_ns()
+            content_type = response.headers.get("Content-Type", "")
+            with profile_section("requests", "body"):
+                if extractor_factory is not None and "html" in content_type:
+                    extraction = extract_stream(response, extractor_factory())
+                    decoded_bytes = extraction.bytes_decoded
+                else:
+                    decoded_bytes = len(response.content)  # Download the body
+            end_ns = time.perf_counter_ns()
+            cpu_seconds = time.thread_time() - cpu_start
+        parse_ns = extraction.parse_ns if extraction else 0
+        if cache is None:
+            timer.add("body", end_ns - headers_ns - parse_ns)
+        if extraction is not None:
+            timer.add(EXTRACT_PHASE, parse_ns)
+    finally:
+        if owns_session:
+            session.close()
     # Log response status code for debugging
     logging.debug(f"API response status code: {response.status_code}")
     if response.status_code == 200:
-        print("API response received successfully.")
+        logging.debug("API response received successfully.")
     else:
-        print("Failed to fetch API data.")
+        logging.warning(
+            f"Failed to fetch API data: HTTP {response.status_code} from {api_url}"
+        )
+    record = FetchRecord(
+        method="requests",
+        url=api_url,
+        total_ns=end_ns - start_ns,
+        phases_ns=timer.phases_ns,
+        status=response.status_code,
+        metrics={**counter.metrics(), "decoded_bytes": decoded_bytes},
+    )
+    if extraction is not None:
+        record.tags["extraction"] = "early-exit" if extraction.early_exit else "full"
+        body_ns = timer.phases_ns.get("body", 0)
+        record.metrics.update(_extraction_metrics(extraction, body_ns))
+    if cache is not None:
+        record.tags["cache"] = outcome
+    if sampler is not None:
+        record.metrics.update(sampler.usage())
+    # Process CPU would include in-process servers such as --local-server and
+    # the metrics endpoint, so only this thread's CPU is charged to the sample
+    record.metrics["cpu_seconds"] = cpu_seconds
+    if not owns_session and record.tags.get("cache") != "hit":
+        reused = session.last_connection_reused
+        record.tags["connection"] = "reused" if reused else "cold"
+        logging.debug(f"Connection reused: {reused}")
     logging.debug("Finished measure_requests.")
-    return end_time - start_time
+    return record
+
+
+def _extraction_metrics(extraction, body_ns: int) -> dict:
+    # The unread bytes would have arrived at the rate the read ones did
+    rate = body_ns / extraction.bytes_read if extraction.bytes_read else 0
+    return {
+        "matches": len(extraction.matches),
+        "bytes_read": extraction.bytes_read,
+        "bytes_skipped": extraction.bytes_skipped,
+        "early_exit_saved_ns": int(extraction.bytes_skipped * rate),
+    }
+
+
+def measure_encoding(url: str, encoding: str, session: KeepAliveSession) -> FetchRecord:
+    """
+    Fetches a URL asking for one content encoding, timing decoding on its own.
+
+    The body is read undecoded as the ``body`` phase, then decompressed as the
+    ``decode`` phase, whose thread CPU time is also recorded.
+
+    Args:
+        url (str): URL to fetch.
+        encoding (str): ``Accept-Encoding`` value, one of ``ENCODINGS``.
+        session (KeepAliveSession): Session with instrumented connections.
+
+    Returns:
+        FetchRecord: The sample, tagged with the encoding the server used.
+    """
+    with phase_timer() as timer, transfer_counter() as counter:
+        start_ns = time.perf_counter_ns()
+        response = session.get(url, headers={"Accept-Encoding": encoding}, stream=True)
+        headers_ns = time.perf_counter_ns()
+        body = response.raw.read(decode_content=False)
+        body_ns = time.perf_counter_ns()
+        cpu_ns = time.thread_time_ns()
+        used = response.headers.get("Content-Encoding", "identity").strip().lower()
+        decoded = decode_body(body, used)
+        cpu_ns = time.thread_time_ns() - cpu_ns
+        end_ns = time.perf_counter_ns()
+    timer.add("body", body_ns - headers_ns)
+    timer.add(DECODE_PHASE, end_ns - body_ns)
+    return FetchRecord(
+        method="requests",
+        url=url,
+        total_ns=end_ns - start_ns,
+        phases_ns=timer.phases_ns,
+        status=response.status_code,
+        tags={"encoding": used},
+        metrics={
+            **counter.metrics(),
+            "encoded_bytes": len(body),
+            "decoded_bytes": len(decoded),
+            "decode_cpu_ns": cpu_ns,
+        },
+    )
 
 
 def get_free_port() -> int:
@@ -124,19 +407,40 @@ def get_free_port() -> int:
     return port
 
 
-def measure_selenium(selenium_url: str) -> float:
+def start_chrome(
+    profile_dir: str,
+    performance_log: bool = False,
+    debugging_port: int | None = None,
+    page_load_strategy: str = "normal",
+    blocked_urls=(),
+    service_port: int | None = None,
+):
     """
-    Measures and returns the time to fetch data using Selenium.
+    Launches a headless Chrome WebDriver using the given profile directory.
 
-    Uses a temporary user-data-dir and a free remote debugging port to avoid conflicts.
+    Unless a debugging port is given, a free remote debugging port is assigned
+    to avoid conflicts between sessions; chromedriver picks its own port the
+    same way unless ``service_port`` is given.
 
     Args:
-        selenium_url (str): The webpage URL to load via Selenium.
+        profile_dir (str): Directory to use as the Chrome user-data-dir.
+        performance_log (bool): Record DevTools events in the performance log,
+            as needed by the network-idle readiness strategy.
+        debugging_port (int, optional): Remote debugging port to use, e.g. one
+            reserved by a ``PortAllocator``.
+        page_load_strategy (str): WebDriver page-load strategy: ``normal``,
+            ``eager`` or ``none``.
+        blocked_urls (list of str): URL patterns blocked through DevTools.
+        service_port (int, optional): Port chromedriver listens on, e.g. one
+            reserved by a ``PortAllocator``.
 
     Returns:
-        float: Duration in seconds.
+        WebDriver: The started Chrome driver.
     """
-    logging.debug("Starting measure_selenium...")
+    # Selenium is imported here so that requests-only runs and --help never pay for it
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")  # Run in headless mode
     options.add_argument("--no-sandbox")
@@ -145,38 +449,865 @@ def measure_selenium(selenium_url: str) -> float:
     options.add_argument(
         "--disable-features=MediaFoundationVideoEncodeAccelerator"
     )  # Disable MediaFoundation video encode
-    # Use a temporary directory for Chrome user profile to avoid conflicts
-    with tempfile.TemporaryDirectory() as temp_profile_dir:
-        options.add_argument(f"--user-data-dir={temp_profile_dir}")
-        free_port = get_free_port()
-        options.add_argument(f"--remote-debugging-port={free_port}")
-        if IS_CHROME_INSTALLED:
-            options.binary_location = CHROME_EXECUTABLE_PATH
-        else:
-            logging.warning(
-                f"Chrome binary not found at {CHROME_EXECUTABLE_PATH}, using default system path."
-            )
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        logging.debug("Chrome WebDriver initialized.")
-
-        # Measure page load time
-        start_time = time.time()
-        driver.get(selenium_url)
-        time.sleep(5)  # Allow JavaScript to execute
-        job_titles = driver.find_elements(By.CLASS_NAME, "job-card-list__title")
-        end_time = time.time()
-        driver.quit()
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    free_port = debugging_port or get_free_port()
+    options.add_argument(f"--remote-debugging-port={free_port}")
+    options.page_load_strategy = page_load_strategy
+    if performance_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if IS_CHROME_INSTALLED:
+        options.binary_location = CHROME_EXECUTABLE_PATH
+    else:
+        logging.warning(
+            f"Chrome binary not found at {CHROME_EXECUTABLE_PATH}, using default system path."
+        )
+    # Resolved once per process and cached on disk by Chrome version
+    service = Service(
+        resolve_chromedriver(CHROME_EXECUTABLE_PATH if IS_CHROME_INSTALLED else ""),
+        port=service_port or 0,
+    )
+    driver = webdriver.Chrome(service=service, options=options)
+    apply_blocking(driver, blocked_urls)
+    logging.debug("Chrome WebDriver initialized.")
+    return driver
+
+
+def scrape_page(
+    driver,
+    selenium_url: str,
+    readiness: Readiness | None = None,
+    track_cache: bool = False,
+) -> FetchRecord:
+    """
+    Loads a page in an already running driver and scrapes the job titles.
+
+    Phase timings are read from the page's Navigation Timing entry. The time
+    until the readiness condition was met, the bytes transferred for the page
+    and its subresources and the memory and CPU used by the chromedriver/Chrome
+    process tree are recorded in the record's metrics.
+
+    Args:
+        driver (WebDriver): A started Chrome driver.
+        selenium_url (str): The webpage URL to load.
+        readiness (Readiness, optional): When to consider the page loaded.
+            Defaults to waiting for ``document.readyState`` to be complete.
+        track_cache (bool): Tag the sample with how the browser's HTTP cache
+            served the page (hit, revalidated or miss).
+
+    Returns:
+        FetchRecord: The timed navigation and scrape.
+    """
+    from selenium.webdriver.common.by import By
+
+    readiness = readiness or Readiness()
+    readiness.prepare(driver)
+    with (
+        trace_section("selenium", lambda: driver_debugging_port(driver)),
+        sample_resources(driver_pid(driver)) as sampler,
+    ):
+        start_ns = time.perf_counter_ns()
+        with profile_section("selenium", "navigate"):
+            driver.get(selenium_url)
+            ready = readiness.wait(driver)
+        ready_ns = time.perf_counter_ns()
+        with profile_section("selenium", "extract"):
+            job_titles = driver.find_elements(By.CLASS_NAME, "job-card-list__title")
+        end_ns = time.perf_counter_ns()
     logging.debug(f"Scraped {len(job_titles)} job listings using Selenium.")
+    entry = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+    sizes = resource_sizes(driver.execute_script(RESOURCE_SIZES_SCRIPT))
+    record = FetchRecord(
+        method="selenium",
+        url=selenium_url,
+        total_ns=end_ns - start_ns,
+        phases_ns={**navigation_phases(entry), EXTRACT_PHASE: end_ns - ready_ns},
+        status=entry.get("responseStatus") if isinstance(entry, dict) else None,
+        tags={"readiness": readiness.strategy, "ready": ready},
+        metrics={"time_to_ready_ns": ready_ns - start_ns},
+    )
+    record.metrics.update(sizes)
+    if track_cache and browser_cache_outcome(entry):
+        record.tags["cache"] = browser_cache_outcome(entry)
+    if sampler is not None:
+        record.metrics.update(sampler.usage())
+    return record
+
+
+def measure_selenium(
+    selenium_url: str,
+    pool: WebDriverPool | None = None,
+    readiness: Readiness | None = None,
+    driver_factory=None,
+    track_cache: bool = False,
+) -> FetchRecord:
+    """
+    Measures and returns the time to fetch data using Selenium.
+
+    Without a pool a fresh browser is launched with a temporary user-data-dir and
+    quit afterwards. With a pool, a warm session is borrowed and reset on return,
+    so the timing excludes browser start-up.
+
+    Args:
+        selenium_url (str): The webpage URL to load via Selenium.
+        pool (WebDriverPool, optional): Pool of warm sessions to borrow from.
+            Its drivers must have performance logging enabled if ``readiness``
+            uses the network-idle strategy.
+        readiness (Readiness, optional): When to consider the page loaded.
+        driver_factory (callable, optional): Starts the browser when no pool is
+            given, called with a profile directory. Defaults to ``start_chrome``.
+        track_cache (bool): Tag the sample with its browser cache outcome.
+
+    Returns:
+        FetchRecord: The timed sample; pooled samples are tagged as warm.
+    """
+    logging.debug("Starting measure_selenium...")
+    if pool is not None:
+        with pool.session() as driver:
+            record = scrape_page(driver, selenium_url, readiness, track_cache)
+        record.tags["session"] = "warm"
+    else:
+        # Use a temporary directory for Chrome user profile to avoid conflicts
+        with tempfile.TemporaryDirectory() as temp_profile_dir:
+            driver_factory = driver_factory or functools.partial(
+                start_chrome,
+                performance_log=readiness is not None
+                and readiness.needs_performance_log,
+            )
+            driver = driver_factory(temp_profile_dir)
+            try:
+                record = scrape_page(driver, selenium_url, readiness, track_cache)
+            finally:
+                driver.quit()
     logging.debug("Finished measure_selenium.")
-    return end_time - start_time
+    return record
+
+
+def measure_cdp(
+    url: str,
+    browser: CDPBrowser | None = None,
+    lifecycle: str = DEFAULT_LIFECYCLE,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> FetchRecord:
+    """
+    Measures loading and scraping a page over the raw DevTools Protocol.
+
+    The same job titles as ``measure_selenium`` are extracted, but navigation,
+    the wait and the extraction are CDP messages sent straight to Chrome.
+
+    Args:
+        url (str): The webpage URL to load.
+        browser (CDPBrowser, optional): A started browser to reuse. Without
+            one, a fresh browser is launched and closed for the call.
+        lifecycle (str): Page lifecycle event to wait for, one of ``LIFECYCLE_EVENTS``.
+        timeout (float): Seconds to wait for the lifecycle event.
+
+    Returns:
+        FetchRecord: The timed sample; samples from a reused browser are tagged as warm.
+    """
+    logging.debug("Starting measure_cdp...")
+    owns_browser = browser is None
+    if owns_browser:
+        browser = CDPBrowser(CHROME_EXECUTABLE_PATH)
+    try:
+        if owns_browser:
+            browser.start()
+        with (
+            trace_section("cdp", lambda: browser.port),
+            sample_resources(browser.process.pid) as sampler,
+        ):
+            start_ns = time.perf_counter_ns()
+            with profile_section("cdp", "navigate"):
+                ready = browser.navigate(url, lifecycle, timeout)
+            ready_ns = time.perf_counter_ns()
+            with profile_section("cdp", "extract"):
+                job_titles = browser.evaluate(EXTRACTION_SCRIPT) or []
+            end_ns = time.perf_counter_ns()
+        entry = browser.evaluate(as_expression(NAVIGATION_TIMING_SCRIPT))
+        sizes = resource_sizes(browser.evaluate(as_expression(RESOURCE_SIZES_SCRIPT)))
+    finally:
+        if owns_browser:
+            browser.close()
+    logging.debug(f"Scraped {len(job_titles)} job listings over CDP.")
+    record = FetchRecord(
+        method="cdp",
+        url=url,
+        total_ns=end_ns - start_ns,
+        phases_ns={**navigation_phases(entry), EXTRACT_PHASE: end_ns - ready_ns},
+        status=entry.get("responseStatus") if isinstance(entry, dict) else None,
+        tags={"readiness": lifecycle, "ready": ready},
+        metrics={"time_to_ready_ns": ready_ns - start_ns, **sizes},
+    )
+    if sampler is not None:
+        record.metrics.update(sampler.usage())
+    if not owns_browser:
+        record.tags["session"] = "warm"
+    logging.debug("Finished measure_cdp.")
+    return record
+
+
+def _format_ci(interval) -> str:
+    low, high = interval
+    return f"[{low:.3f}, {high:.3f}]"
+
+
+def _parse_group_label(label: str) -> tuple:
+    # "API - Requests" -> ("API", "requests")
+    target, _, method_label = label.partition(" - ")
+    methods = {name: method for method, name in METHOD_LABELS.items()}
+    return target, methods.get(method_label)
+
+
+def report_results(
+    results_path: str, sampler: AdaptiveSampler, report_filename: str | None = None
+) -> dict:
+    """
+    Logs summaries and speedups and saves the plots for a stored run.
+
+    Everything is computed from the result file, streaming, so a finished or
+    interrupted run can be re-analyzed later.
+
+    Args:
+        results_path (str): File written by ``ResultStore``.
+        sampler (AdaptiveSampler): Provides the confidence level and resamples.
+        report_filename (str, optional): Also writes the HTML report here.
+
+    Returns:
+        dict: Plot label to ``Series``, split by connection reuse and session
+            warmth, including cold-start series.
+    """
+    groups = load_series(results_path, split=False)
+    for series in groups.values():
+        summary = sampler.summarize(
+            SampleSet(series.label, keep_records=False, durations=series.durations)
+        )
+        logging.info(
+            f"{series.label}: n={summary['n']} ({series.stop_reason or 'n/a'}, "
+            f"{summary['outliers']} outliers) "
+            f"median={summary['median']:.3f}s {_format_ci(summary['median_ci'])} "
+            f"mean={summary['mean']:.3f}s {_format_ci(summary['mean_ci'])}"
+        )
+    cells = {_parse_group_label(label): series for label, series in groups.items()}
+    targets = list(dict.fromkeys(target for target, _ in cells))
+    for slower, faster in SPEEDUP_PAIRS:
+        for target in targets:
+            if (target, slower) not in cells or (target, faster) not in cells:
+                continue
+            ratio, low, high = sampler.speedup(
+                cells[(target, slower)], cells[(target, faster)]
+            )
+            logging.info(
+                f"{target}: {METHOD_LABELS[faster]} is {ratio:.1f}x faster than "
+                f"{METHOD_LABELS[slower]} (median ratio, CI {low:.1f}x-{high:.1f}x)"
+            )
+
+    # Series keyed by plot label, split by how each sample was taken
+    results = load_series(results_path)
+    for label, series in results.items():
+        phases = ", ".join(
+            f"{phase}={seconds * 1000:.1f}ms"
+            for phase, seconds in series.mean_phases().items()
+        )
+        if phases:
+            logging.info(f"{label} mean phases: {phases}")
+        metrics = series.mean_metrics()
+        transfer = format_transfer(metrics)
+        if transfer:
+            logging.info(f"{label} mean transfer: {transfer}")
+        if "early_exit_saved_ns" in metrics:
+            logging.info(
+                f"{label} early exit: {metrics['bytes_skipped'] / 1024:.1f}KiB "
+                f"and ~{metrics['early_exit_saved_ns'] / 1e6:.1f}ms saved per sample"
+            )
+
+    # Each series is reduced once; the charts only see these fixed-size summaries
+    stats = [
+        summary
+        for summary in map(summarize_series, results.values())
+        if summary is not None
+    ]
+    annotations = []
+    for summary in stats:
+        low, high = bootstrap_ci(results[summary.label].values)
+        annotations.append(f"median: {summary.median:.2f}\nCI: {low:.2f}-{high:.2f}")
+    save_boxplot(stats, BOXPLOT_FILENAME, annotations)
+    if report_filename:
+        write_report(stats, report_filename, run=read_run(results_path))
+        logging.info(f"Report written to {report_filename}")
+
+    usage = {label: series.mean_metrics() for label, series in results.items()}
+    if any("cpu_seconds" in metrics for metrics in usage.values()):
+        for label, metrics in usage.items():
+            summary = ", ".join(
+                f"{metric}={metrics[metric]:.4g}"
+                for metric in RESOURCE_METRICS
+                if metric in metrics
+            )
+            if summary:
+                logging.info(f"{label} mean resource usage: {summary}")
+        plot_resource_usage(usage, RESOURCES_FILENAME)
+    return results
+
+
+def report_profile(profiler: Profiler) -> None:
+    """
+    Writes a profiled run's statistics and logs each method's hottest functions.
+    """
+    for path in profiler.write_stats():
+        name = os.path.basename(path)
+        # Merged per-method files have no phase in their name
+        if name.count(".") == 1:
+            logging.info(f"Hottest functions in {path}:")
+            for line in top_functions(path):
+                logging.info(f"  {line}")
+    if profiler.traces:
+        logging.info(
+            f"Saved {len(profiler.traces)} Chrome traces under {profiler.directory}"
+        )
+
+
+def report_agents(results_path: str) -> None:
+    """
+    Logs how many samples each agent of a coordinated run took and its medians.
+    """
+    for agent_id, summary in agent_summary(results_path).items():
+        logging.info(
+            f"Agent {agent_id} on {summary['hostname']}: {summary['samples']} samples, "
+            f"clock offset {summary['clock_offset_ns'] / 1e6:+.2f}ms"
+        )
+        for label, median in summary["medians"].items():
+            logging.info(f"  {label}: median={median * 1000:.1f}ms")
+
+
+def save_history(results_path: str, args) -> None:
+    """
+    Archives a run's result file and saves it as a baseline, as requested by ``args``.
+    """
+    if not args.no_history:
+        logging.info(f"Archived run to {archive_run(results_path, args.history)}")
+    if args.save_baseline:
+        path = save_baseline(results_path, args.save_baseline, args.history)
+        logging.info(f"Saved baseline {args.save_baseline} to {path}")
+
+
+def coordinate(args, experiment) -> str:
+    """
+    Hands an experiment to agents on other hosts and streams their samples to disk.
+
+    Returns:
+        str: Path of the result file.
+    """
+    registry = MetricsRegistry()
+    budget = None
+    if args.abort_error_rate is not None:
+        budget = ErrorBudget(registry, args.abort_error_rate, args.abort_min_samples)
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(registry, args.metrics_host, args.metrics_port)
+        metrics_server.start()
+        logging.info(f"Serving live metrics at {metrics_server.url}")
+    with ResultStore(
+        args.results,
+        {
+            "methods": list(experiment.methods),
+            "targets": experiment.targets,
+            "coordinated": True,
+        },
+    ) as store:
+        registry.run_id = store.run_id
+
+        def on_result(label, result, warmup, agent):
+            store.append(label, result, warmup, agent)
+            registry.observe(label, result, warmup)
+            if budget is not None:
+                budget.check(label)
+
+        def on_error(label, warmup, agent):
+            registry.observe_error(label)
+            if budget is not None:
+                budget.check(label)
+
+        coordinator = Coordinator(
+            experiment,
+            on_result=on_result,
+            on_error=on_error,
+            on_agent=store.append_agent,
+            host=args.coordinator_host,
+            port=args.coordinator_port,
+            lease_timeout=args.lease_timeout,
+        )
+        with coordinator:
+            logging.info(
+                f"Coordinating {experiment.name} ({coordinator.total} samples); "
+                f"start agents with --agent {coordinator.url}"
+            )
+            try:
+                sample_sets = coordinator.wait()
+            except KeyboardInterrupt:
+                logging.error(
+                    f"Interrupted; {store.count} samples saved to {store.path}. "
+                    f"Report on them with --analyze {store.path}."
+                )
+                exit(130)
+            except RunAborted as e:
+                logging.error(
+                    f"Aborted: {e} {store.count} samples saved to {store.path}. "
+                    f"Report on them with --analyze {store.path}."
+                )
+                exit(2)
+            finally:
+                if metrics_server is not None:
+                    metrics_server.stop()
+        for sample_set in sample_sets.values():
+            store.append_group(sample_set)
+    return store.path
+
+
+def run_open_loop_comparison(
+    args, api_url: str, selenium_url: str, readiness: Readiness, driver_factory
+) -> dict:
+    """
+    Finds the sustainable open-loop rate of the requests and Selenium paths.
+
+    Requests go through one keep-alive session shared by the open-loop
+    workers; Selenium page loads share a pool of ``--pool-size`` warm browsers
+    (at least one), which is also the number of loads allowed at once.
+
+    Returns:
+        dict: Method label to its list of ``OpenLoopResult``.
+    """
+    by_method = {}
+    rate_options = dict(
+        rates=args.rates,
+        slo_p99=args.slo_p99,
+        duration=args.open_loop_duration,
+        distribution=args.arrival,
+    )
+    if "requests" in args.methods:
+        with KeepAliveSession(pool_size=DEFAULT_OPEN_LOOP_WORKERS) as load_session:
+            rate, by_method["Requests"] = find_sustainable_rate(
+                lambda: load_session.get(api_url).status_code == 200,
+                workers=DEFAULT_OPEN_LOOP_WORKERS,
+                **rate_options,
+            )
+        logging.info(
+            f"Requests sustains {rate:g}/s with p99 under {args.slo_p99 * 1000:.0f}ms"
+        )
+    if "selenium" in args.methods:
+        size = max(args.pool_size, 1)
+        with WebDriverPool(size, driver_factory) as load_pool:
+
+            def load_page():
+                record = measure_selenium(
+                    selenium_url, pool=load_pool, readiness=readiness
+                )
+                return record.status in (None, 200)
+
+            rate, by_method["Selenium"] = find_sustainable_rate(
+                load_page,
+                workers=size,
+                **rate_options,
+            )
+        logging.info(
+            f"Selenium sustains {rate:g}/s with p99 under {args.slo_p99 * 1000:.0f}ms"
+        )
+    return by_method
 
 
 def main():
     import argparse
 
+    if len(sys.argv) > 1 and sys.argv[1] in HISTORY_SUBCOMMANDS:
+        exit(history_main(sys.argv[1:]))
+
     parser = argparse.ArgumentParser(description="Run performance comparison.")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument(
+        "--methods",
+        type=lambda value: value.split(","),
+        default=list(DEFAULT_METHODS),
+        help="Comma-separated fetch methods to benchmark: requests, selenium, cdp",
+    )
+    parser.add_argument(
+        "--chromedriver",
+        help=f"Pinned chromedriver path (default: ${DRIVER_PATH_ENV}, else resolved and cached)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Never download chromedriver; use the cache, a pinned path or PATH",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=0,
+        help="Keep this many warm Chrome sessions alive (0 launches one per sample)",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        action="store_true",
+        help="Send requests through a shared pooled session and tag cold/reused connections",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=10,
+        help="Connections kept alive per host when --keep-alive is used",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="Retries for failed requests when --keep-alive is used",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=0.0,
+        help="Backoff factor in seconds between retries",
+    )
+    parser.add_argument(
+        "--ready",
+        choices=STRATEGIES,
+        default=DEFAULT_STRATEGY,
+        help="How Selenium decides a page is ready to scrape",
+    )
+    parser.add_argument(
+        "--page-load-strategy",
+        choices=PAGE_LOAD_STRATEGIES,
+        default="normal",
+        help="WebDriver page-load strategy for Selenium samples",
+    )
+    parser.add_argument(
+        "--block",
+        type=lambda value: value.split(","),
+        default=[],
+        help=f"Comma-separated resource types to block: {', '.join(RESOURCE_TYPE_PATTERNS)}",
+    )
+    parser.add_argument(
+        "--block-url",
+        action="append",
+        default=[],
+        help="URL pattern to block in Selenium samples (repeatable)",
+    )
+    parser.add_argument(
+        "--load-matrix",
+        action="store_true",
+        help="Compare page-load strategies and resource blocking against the baseline",
+    )
+    parser.add_argument(
+        "--load-profiles",
+        type=lambda value: value.split(","),
+        default=list(LOAD_PROFILES),
+        help="Comma-separated load profiles for --load-matrix",
+    )
+    parser.add_argument(
+        "--matrix-samples",
+        type=int,
+        default=EXPERIMENT_COUNT,
+        help="Samples per load profile",
+    )
+    parser.add_argument(
+        "--cdp-lifecycle",
+        choices=LIFECYCLE_EVENTS,
+        default=DEFAULT_LIFECYCLE,
+        help="Page lifecycle event the cdp method waits for",
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds to wait for the readiness condition",
+    )
+    parser.add_argument(
+        "--ready-selector",
+        default=DEFAULT_SELECTOR,
+        help="CSS selector awaited by the selector strategy",
+    )
+    parser.add_argument(
+        "--extract-selector",
+        default=DEFAULT_EXTRACT_SELECTOR,
+        help="CSS selector whose elements the requests path extracts from HTML pages",
+    )
+    parser.add_argument(
+        "--extract-limit",
+        type=int,
+        default=0,
+        help="Stop reading an HTML page once this many elements are found (0 reads it all)",
+    )
+    parser.add_argument(
+        "--no-extract",
+        action="store_true",
+        help="Download HTML pages on the requests path without parsing them",
+    )
+    parser.add_argument(
+        "--ready-script",
+        help="JavaScript predicate for the js strategy, e.g. 'return window.done'",
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Also drive the API with the requests path at increasing concurrency",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=list(DEFAULT_CONCURRENCY_LEVELS),
+        help="Comma-separated concurrency levels for --load (default 1,8,64,256)",
+    )
+    parser.add_argument(
+        "--load-duration",
+        type=float,
+        default=DEFAULT_LOAD_DURATION,
+        help="Seconds to spend at each concurrency level",
+    )
+    parser.add_argument(
+        "--open-loop",
+        action="store_true",
+        help="Find the highest arrival rate each method sustains under --slo-p99",
+    )
+    parser.add_argument(
+        "--rates",
+        type=lambda value: [float(rate) for rate in value.split(",")],
+        default=list(DEFAULT_RATES),
+        help="Comma-separated target rates (requests/second) for --open-loop",
+    )
+    parser.add_argument(
+        "--arrival",
+        choices=ARRIVAL_DISTRIBUTIONS,
+        default="constant",
+        help="Arrival schedule for --open-loop: constant spacing or Poisson",
+    )
+    parser.add_argument(
+        "--slo-p99",
+        type=float,
+        default=DEFAULT_SLO_P99,
+        help="p99 latency objective in seconds for --open-loop",
+    )
+    parser.add_argument(
+        "--open-loop-duration",
+        type=float,
+        default=DEFAULT_OPEN_LOOP_DURATION,
+        help="Seconds of arrivals at each --open-loop rate",
+    )
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(level) for level in value.split(",")],
+        help="Comma-separated Selenium worker process counts to measure, e.g. 1,2,4",
+    )
+    parser.add_argument(
+        "--worker-samples",
+        type=int,
+        default=DEFAULT_WORKER_SAMPLES,
+        help="Page loads per worker count when --workers is used",
+    )
+    parser.add_argument(
+        "--local-server",
+        action="store_true",
+        help="Benchmark against a built-in local server instead of public sites",
+    )
+    parser.add_argument(
+        "--server-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the local server waits before each response",
+    )
+    parser.add_argument(
+        "--server-payload-size",
+        type=int,
+        default=0,
+        help="Minimum body size in bytes of local server responses",
+    )
+    parser.add_argument(
+        "--server-chunked",
+        action="store_true",
+        help="Stream local server responses with chunked transfer encoding",
+    )
+    parser.add_argument(
+        "--server-max-age",
+        type=int,
+        help="Make local server responses cacheable for N seconds, with ETag and Last-Modified",
+    )
+    parser.add_argument(
+        "--http-cache",
+        action="store_true",
+        help="Send requests samples through an HTTP cache and split series by hit, 304 and miss",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size bound of the in-memory HTTP cache, and of its disk tier",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Also keep HTTP cache entries on disk in this directory",
+    )
+    parser.add_argument(
+        "--server-compression",
+        action="store_true",
+        help="Send gzip or deflate local server bodies when the client accepts them",
+    )
+    parser.add_argument(
+        "--compare-encodings",
+        type=lambda value: value.split(","),
+        nargs="?",
+        const=list(ENCODINGS),
+        help="Compare bytes and decode time per Accept-Encoding on the requests "
+        f"target (default {','.join(ENCODINGS)}); turns on local server compression",
+    )
+    parser.add_argument(
+        "--encoding-samples",
+        type=int,
+        default=DEFAULT_ENCODING_SAMPLES,
+        help="Samples per encoding for --compare-encodings",
+    )
+    parser.add_argument(
+        "--render-delay",
+        type=float,
+        default=0.5,
+        help="Seconds before the local rendered page injects its job titles",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP,
+        help="Leading samples discarded per method",
+    )
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=EXPERIMENT_COUNT,
+        help="Samples per method before checking for convergence",
+    )
+    parser.add_argument(
+        "--max-samples",
+        type=int,
+        default=DEFAULT_MAX_SAMPLES,
+        help="Maximum samples per method",
+    )
+    parser.add_argument(
+        "--ci-width",
+        type=float,
+        default=DEFAULT_CI_WIDTH,
+        help="Stop a method once its median CI width relative to the median is below this",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=DEFAULT_TIME_BUDGET,
+        help="Seconds of measurement allowed per method",
+    )
+    parser.add_argument(
+        "--experiment",
+        help="TOML experiment file; runs its targets and methods in a randomized blocked order",
+    )
+    parser.add_argument(
+        "--results",
+        default=RESULTS_FILENAME,
+        help="New file every sample is streamed to; {run_id} is replaced by the "
+        f"run id and .gz compresses it (default {RESULTS_FILENAME})",
+    )
+    parser.add_argument(
+        "--analyze",
+        metavar="RESULTS",
+        help="Report on a stored result file instead of measuring",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        metavar="DIR",
+        help="Write cProfile .pstats per method and phase and Chrome traces to DIR "
+        f"(default {DEFAULT_PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--trace-every",
+        type=int,
+        default=DEFAULT_TRACE_EVERY,
+        help="With --profile, record a Chrome trace every N browser samples (0 disables)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve live Prometheus/OpenMetrics metrics on PORT while sampling "
+        "(0 picks a free port)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Interface the metrics endpoint binds to",
+    )
+    parser.add_argument(
+        "--abort-error-rate",
+        type=float,
+        metavar="FRACTION",
+        help="Abort the run once a series' fraction of failed samples exceeds this",
+    )
+    parser.add_argument(
+        "--abort-min-samples",
+        type=int,
+        default=DEFAULT_ABORT_MIN_SAMPLES,
+        help="Samples a series needs before --abort-error-rate applies",
+    )
+    parser.add_argument(
+        "--report",
+        default=REPORT_FILENAME,
+        metavar="FILE",
+        help=f"Self-contained HTML report to write (default: {REPORT_FILENAME}); "
+        "an empty string disables it",
+    )
+    parser.add_argument(
+        "--history",
+        default=HISTORY_DIR,
+        help="Directory each run's result file is archived to for compare and trend",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not archive this run's result file",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        metavar="NAME",
+        help="Also save this run as the named baseline",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted --experiment run from its progress file",
+    )
+    parser.add_argument(
+        "--coordinate",
+        action="store_true",
+        help="Hand the --experiment to agents on other hosts instead of measuring",
+    )
+    parser.add_argument(
+        "--coordinator-host",
+        default="127.0.0.1",
+        help="Interface the coordinator binds to; 0.0.0.0 accepts remote agents",
+    )
+    parser.add_argument(
+        "--coordinator-port",
+        type=int,
+        default=DEFAULT_COORDINATOR_PORT,
+        help="Port the coordinator listens on (0 picks a free port)",
+    )
+    parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=DEFAULT_LEASE_TIMEOUT,
+        help="Seconds without a sample before an agent's work is handed to another",
+    )
+    parser.add_argument(
+        "--agent",
+        metavar="URL",
+        help="Measure work units leased from the coordinator at URL",
+    )
+    parser.add_argument(
+        "--agent-name",
+        help="Name this agent registers under (default: hostname)",
+    )
     args = parser.parse_args()
 
     if args.debug:
@@ -184,60 +1315,329 @@ def main():
     else:
         logging.basicConfig(level=logging.INFO)
 
-    # Ensure Chrome is installed before running tests
-    install_chrome_if_needed()
-
-    # Collect and compare execution times
-    requests_api_times = []
-    selenium_api_times = []
-    requests_text_times = []
-    selenium_text_times = []
-
-    for _ in range(EXPERIMENT_COUNT):
-        requests_api_times.append(measure_requests(API_URL))
-        selenium_api_times.append(measure_selenium(API_URL))
-        requests_text_times.append(measure_requests(SELENIUM_URL))
-        selenium_text_times.append(measure_selenium(SELENIUM_URL))
-
-    import matplotlib.pyplot as plt
-    import numpy as np  # Added for calculations
-
-    groups = [
-        requests_api_times,
-        selenium_api_times,
-        requests_text_times,
-        selenium_text_times,
-    ]
-    tick_labels = [
-        "API - Requests",
-        "API - Selenium",
-        "Text - Requests",
-        "Text - Selenium",
-    ]
-    bp = plt.boxplot(
-        groups, labels=tick_labels, patch_artist=True
-    )  # Changed from tick_label to labels
-
-    # Set a title and axis labels
-    plt.title("Comparison of Performance Metrics")
-    plt.xlabel("Method")
-    plt.ylabel("Time (seconds)")
-
-    # Annotate each group with mean and standard deviation
-    for i, group in enumerate(groups, start=1):
-        mean_val = np.mean(group)
-        std_val = np.std(group)
-        plt.text(
-            i,
-            mean_val,
-            f"mean: {mean_val:.2f}\nstd: {std_val:.2f}",
-            horizontalalignment="center",
-            verticalalignment="bottom",
-            fontsize=8,
-            color="blue",
-        )
-
-    plt.savefig(BOXPLOT_FILENAME)
+    sampler = AdaptiveSampler(
+        warmup=args.warmup,
+        min_samples=args.min_samples,
+        max_samples=args.max_samples,
+        ci_width=args.ci_width,
+        time_budget=args.time_budget,
+    )
+    if args.analyze:
+        report_results(args.analyze, sampler, args.report)
+        return
+    if os.path.exists(args.results):
+        # Checked before any browser starts; the store never overwrites a file
+        parser.error(
+            f"{args.results} already exists; include {{run_id}} in --results "
+            "or pick a new name."
+        )
+
+    experiment = None
+    agent = None
+    if args.agent:
+        if args.experiment or args.coordinate:
+            parser.error("--agent takes its experiment from the coordinator.")
+        agent = AgentClient(args.agent, args.agent_name)
+        try:
+            experiment = agent.register()
+        except requests.RequestException as e:
+            logging.error(f"Could not register with the coordinator: {e}")
+            exit(1)
+        apply_to_args(experiment, args)
+    elif args.experiment:
+        try:
+            experiment = load_experiment(args.experiment)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        apply_to_args(experiment, args)
+    if args.coordinate:
+        if experiment is None:
+            parser.error("--coordinate needs an --experiment file.")
+        results_path = coordinate(args, experiment)
+        report_results(results_path, sampler, args.report)
+        report_agents(results_path)
+        save_history(results_path, args)
+        return
+
+    unknown = set(args.methods) - set(METHODS)
+    if unknown:
+        parser.error(f"Unknown methods: {', '.join(sorted(unknown))}")
+    use_selenium = "selenium" in args.methods
+    use_cdp = "cdp" in args.methods
+    unknown = set(args.load_profiles) - set(LOAD_PROFILES)
+    if unknown:
+        parser.error(f"Unknown load profiles: {', '.join(sorted(unknown))}")
+    unknown = set(args.compare_encodings or ()) - set(ENCODINGS)
+    if unknown:
+        parser.error(f"Unknown encodings: {', '.join(sorted(unknown))}")
+    try:
+        blocked_urls = blocked_url_patterns(args.block, args.block_url)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Set in the environment so worker processes resolve the same driver
+    if args.chromedriver:
+        os.environ[DRIVER_PATH_ENV] = args.chromedriver
+    if args.offline:
+        os.environ[OFFLINE_ENV] = "1"
+
+    # Ensure Chrome is installed before running Selenium or CDP tests
+    if use_selenium or use_cdp:
+        install_chrome_if_needed()
+    if use_selenium:
+        setup_start = time.perf_counter()
+        try:
+            driver_path = resolve_chromedriver(CHROME_EXECUTABLE_PATH)
+        except RuntimeError as e:
+            logging.error(str(e))
+            exit(1)
+        logging.debug(
+            f"Resolved chromedriver {driver_path} in {time.perf_counter() - setup_start:.3f}s"
+        )
+
+    api_url, selenium_url = API_URL, SELENIUM_URL
+    server = None
+    if args.local_server:
+        server = BenchmarkServer(
+            config=ServerConfig(
+                latency=args.server_latency,
+                payload_size=args.server_payload_size,
+                chunked=args.server_chunked,
+                render_delay=args.render_delay,
+                cache_max_age=args.server_max_age,
+                compression=args.server_compression or bool(args.compare_encodings),
+            )
+        )
+        server.start()
+        api_url, selenium_url = server.api_url, server.rendered_url
+        logging.info(f"Benchmarking against local server at {server.base_url}")
+    targets = {"API": api_url, "Text": selenium_url}
+    if experiment is not None:
+        try:
+            targets = experiment.urls(server.base_url if server else None)
+        except ValueError as e:
+            parser.error(str(e))
+
+    readiness = Readiness(
+        args.ready,
+        timeout=args.ready_timeout,
+        selector=args.ready_selector,
+        script=args.ready_script,
+    )
+    driver_factory = functools.partial(
+        start_chrome,
+        performance_log=readiness.needs_performance_log,
+        page_load_strategy=args.page_load_strategy,
+        blocked_urls=blocked_urls,
+    )
+    pool = (
+        WebDriverPool(args.pool_size, driver_factory)
+        if args.pool_size and use_selenium
+        else None
+    )
+    # With a pool, the cdp method also keeps one warm browser for the run
+    cdp_browser = None
+    if args.pool_size and use_cdp:
+        cdp_browser = CDPBrowser(CHROME_EXECUTABLE_PATH, timeout=args.ready_timeout)
+        start_time = time.perf_counter()
+        cdp_browser.start()
+        cdp_cold_start = time.perf_counter() - start_time
+    session = (
+        KeepAliveSession(
+            pool_size=args.http_pool_size,
+            max_retries=args.retries,
+            backoff_factor=args.retry_backoff,
+        )
+        if args.keep_alive
+        else None
+    )
+    extractor_factory = None
+    if not args.no_extract:
+        extractor_factory = functools.partial(
+            SelectorExtractor, args.extract_selector, args.extract_limit or None
+        )
+    cache = None
+    if args.http_cache:
+        cache = HTTPCache(
+            args.cache_max_bytes,
+            directory=args.cache_dir,
+            disk_max_bytes=args.cache_max_bytes,
+        )
+    measures = {
+        "requests": lambda url: measure_requests(
+            url, session=session, extractor_factory=extractor_factory, cache=cache
+        ),
+        "selenium": lambda url: measure_selenium(
+            url,
+            pool=pool,
+            readiness=readiness,
+            driver_factory=driver_factory,
+            track_cache=args.http_cache,
+        ),
+        "cdp": lambda url: measure_cdp(
+            url, cdp_browser, args.cdp_lifecycle, args.ready_timeout
+        ),
+    }
+    registry = MetricsRegistry()
+    budget = None
+    if args.abort_error_rate is not None:
+        budget = ErrorBudget(registry, args.abort_error_rate, args.abort_min_samples)
+    # A measurement that raises is counted and skipped; the budget decides
+    # whether the run goes on
+    methods = {
+        group_label(target, method): registry.track(
+            group_label(target, method),
+            functools.partial(measures[method], url),
+            method,
+            on_error=budget.check if budget is not None else None,
+        )
+        for target, url in targets.items()
+        for method in METHODS
+        if method in args.methods
+    }
+    profiler = Profiler(args.profile, args.trace_every) if args.profile else None
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(registry, args.metrics_host, args.metrics_port)
+        metrics_server.start()
+        logging.info(f"Serving live metrics at {metrics_server.url}")
+    # Samples are streamed to disk as they complete; only durations stay in memory
+    with (
+        ResultStore(
+            args.results, {"methods": args.methods, "targets": targets}
+        ) as store,
+        profiling(profiler),
+    ):
+        registry.run_id = store.run_id
+
+        def on_result(label, result, warmup=False):
+            store.append(label, result, warmup)
+            registry.observe(label, result, warmup)
+            if budget is not None:
+                budget.check(label)
+
+        try:
+            if agent is not None:
+                sample_sets = run_agent(
+                    agent,
+                    methods,
+                    experiment.warmup,
+                    on_result=on_result,
+                    keep_records=False,
+                )
+            elif experiment is not None:
+                sample_sets = run_experiment(
+                    experiment,
+                    methods,
+                    resume=args.resume,
+                    on_result=on_result,
+                    keep_records=False,
+                )
+            else:
+                sample_sets = sampler.run(
+                    methods, on_result=on_result, keep_records=False
+                )
+        except KeyboardInterrupt:
+            logging.error(
+                f"Interrupted; {store.count} samples saved to {store.path}. "
+                f"Report on them with --analyze {store.path}."
+            )
+            if experiment is not None:
+                logging.error("Rerun with --resume to continue the experiment.")
+            exit(130)
+        except RunAborted as e:
+            logging.error(
+                f"Aborted: {e} {store.count} samples saved to {store.path}. "
+                f"Report on them with --analyze {store.path}."
+            )
+            exit(2)
+        finally:
+            if pool is not None:
+                for seconds in pool.cold_start_times:
+                    # Browser launch cost is reported separately from warm navigation
+                    store.append_cold_start("Selenium cold start", seconds)
+                pool.close()
+            if cdp_browser is not None:
+                store.append_cold_start("CDP cold start", cdp_cold_start)
+                cdp_browser.close()
+            if session is not None:
+                session.close()
+            if metrics_server is not None:
+                metrics_server.stop()
+            if agent is not None:
+                agent.close()
+        for sample_set in sample_sets.values():
+            store.append_group(sample_set)
+
+    if profiler is not None:
+        report_profile(profiler)
+    if agent is not None:
+        # The coordinator reports on the merged run; this host's file is a local copy
+        logging.info(f"Agent done; {store.count} samples also saved to {store.path}")
+        if server is not None:
+            server.stop()
+        return
+    results = report_results(store.path, sampler, args.report)
+    save_history(store.path, args)
+
+    if args.load:
+        curve = run_load_curve(api_url, args.concurrency, args.load_duration)
+        # Serial Selenium throughput is drawn as a reference line on the curve
+        reference = {
+            f"{label} (serial)": 1 / series.values.mean()
+            for label, series in results.items()
+            if label.startswith("API - Selenium")
+        }
+        plot_load_curve(curve, LOAD_CURVE_FILENAME, reference)
+
+    if args.open_loop:
+        open_loop = run_open_loop_comparison(
+            args, api_url, selenium_url, readiness, driver_factory
+        )
+        plot_open_loop(open_loop, args.slo_p99, OPEN_LOOP_FILENAME)
+
+    if args.workers and use_selenium:
+        scaling = run_worker_scaling(
+            selenium_url,
+            args.workers,
+            args.worker_samples,
+            readiness,
+            chrome_path=CHROME_EXECUTABLE_PATH,
+            # Same browser settings as the in-process Selenium samples
+            driver_options={
+                "page_load_strategy": args.page_load_strategy,
+                "blocked_urls": blocked_urls,
+            },
+        )
+        plot_worker_scaling(scaling, WORKER_SCALING_FILENAME)
+
+    if args.load_matrix and use_selenium:
+        matrix = run_profile_matrix(
+            selenium_url,
+            [LOAD_PROFILES[name] for name in args.load_profiles],
+            args.matrix_samples,
+            functools.partial(
+                start_chrome, performance_log=readiness.needs_performance_log
+            ),
+            functools.partial(measure_selenium, readiness=readiness),
+        )
+        rows = compare_to_baseline(matrix)
+        for row in rows:
+            logging.info(format_profile_row(row))
+        plot_profile_matrix(rows, PROFILE_MATRIX_FILENAME)
+
+    if args.compare_encodings:
+        rows = compare_encodings(
+            run_encoding_comparison(
+                api_url, args.compare_encodings, args.encoding_samples, measure_encoding
+            )
+        )
+        for row in rows:
+            logging.info(format_encoding_row(row))
+        plot_encodings(rows, ENCODINGS_FILENAME)
+
+    if server is not None:
+        server.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,666 @@
+"""
+Distributed Campaigns
+---------------------
+Spreads an experiment over several machines, to see how browser-based
+scraping scales out across nodes rather than within one.
+
+A coordinator splits the experiment's schedule into work units, one per
+randomized block, and hands them out over a small JSON-over-HTTP protocol:
+
+    GET /clock: the coordinator's wall clock, for offset estimation.
+    POST /register: an agent announces its host and clock offset and gets
+        the experiment back.
+    POST /lease: an agent asks for its next unit; the reply is a unit, a
+        delay to retry after, or that the campaign is done.
+    POST /samples: an agent streams one finished sample back, or reports
+        with an ``error`` flag that a measurement failed.
+    GET /status: progress of the campaign.
+
+Agents run the experiment's methods with the usual measurement code, warm up
+on their own, and post every sample as soon as it completes. A unit whose
+agent stops reporting for ``lease_timeout`` seconds goes back to the queue
+with whatever samples it is still missing, so a lost agent costs time, not
+data; a sample that arrives twice is kept once. A run whose measurement
+fails ``max_attempts`` times is dropped, so a method that is broken on every
+agent cannot keep the campaign going forever.
+
+Each agent estimates the offset of its clock from the coordinator's, NTP
+style, from the round trip with the lowest delay. Sample completion times
+are stored on the coordinator's clock next to the agent that took them.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from selenium_v_requests_comparison.experiment import (
+    Experiment,
+    build_schedule,
+    group_label,
+)
+from selenium_v_requests_comparison.sampling import STOP_MAX_SAMPLES, SampleSet
+from selenium_v_requests_comparison.store import host_info, read_entries
+from selenium_v_requests_comparison.timing import FetchRecord
+
+DEFAULT_COORDINATOR_PORT = 8790
+# Seconds without a sample before a leased unit is handed to another agent
+DEFAULT_LEASE_TIMEOUT = 120.0
+# Seconds an idle agent waits before asking for work again
+POLL_INTERVAL = 0.5
+# Round trips an agent makes to estimate its clock offset
+CLOCK_PROBES = 5
+REQUEST_TIMEOUT = 30.0
+# Seconds the coordinator keeps serving after the campaign so agents learn it ended
+RELEASE_TIMEOUT = 5.0
+# Failed measurements of one run before it is dropped from the campaign
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def estimate_clock_offset(probes) -> tuple:
+    """
+    Estimates a clock offset from round trips to a reference clock.
+
+    The round trip with the lowest delay bounds the error best, so only it
+    is used; the reference is assumed to have been read halfway through it.
+
+    Args:
+        probes (iterable of tuple): ``(sent_ns, reference_ns, received_ns)``
+            per round trip, with ``sent_ns`` and ``received_ns`` on the local clock.
+
+    Returns:
+        tuple: ``(offset_ns, round_trip_ns)``; add the offset to a local
+            timestamp to get the reference clock's.
+    """
+    sent, reference, received = min(probes, key=lambda p: p[2] - p[0])
+    return reference - (sent + received) // 2, received - sent
+
+
+class _Lease:
+    def __init__(self, unit_id: int, runs: dict):
+        self.unit_id = unit_id
+        # Schedule index to group label of the samples still missing
+        self.runs = runs
+        self.agent = None
+        self.deadline = 0.0
+
+
+class Coordinator:
+    """
+    Hands an experiment's work units to agents and collects their samples.
+
+    Args:
+        experiment (Experiment): The campaign to run; its targets are resolved
+            by each agent, so relative URLs hit each agent's own local server.
+        on_result (callable, optional): Called with the label, the record,
+            whether it is a warmup sample and the agent fields (``id`` and
+            ``finished_ns`` on the coordinator's clock) of every sample, in
+            arrival order. An exception it raises ends the campaign and is
+            re-raised by ``wait``.
+        on_error (callable, optional): Called like ``on_result``, without the
+            record, for every failed measurement an agent reports.
+        on_agent (callable, optional): Called with the id and description of
+            each agent as it registers.
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port.
+        lease_timeout (float): Seconds without a sample before a unit is
+            handed to another agent.
+        max_attempts (int): Failed measurements of a run before it is dropped.
+    """
+
+    def __init__(
+        self,
+        experiment: Experiment,
+        on_result=None,
+        on_agent=None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_COORDINATOR_PORT,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        on_error=None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.experiment = experiment
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_agent = on_agent
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.seed = experiment.seed
+        if self.seed is None:
+            self.seed = random.randrange(2**32)
+        # Agents warm up on their own, so units hold measured samples only
+        schedule = build_schedule(replace(experiment, warmup=0), self.seed)
+        blocks = {}
+        for run in schedule:
+            blocks.setdefault(run.block, {})[run.index] = run.label
+        self._pending = [_Lease(block, runs) for block, runs in blocks.items()]
+        self._leased = {}
+        self.total = len(schedule)
+        self.completed = 0
+        # Runs dropped after max_attempts failures, and failures per run
+        self.dropped = 0
+        self._failures = {}
+        self.agents = {}
+        self.sample_sets = {
+            group_label(target, method): SampleSet(
+                group_label(target, method), keep_records=False
+            )
+            for target in experiment.targets
+            for method in experiment.methods
+        }
+        self._released = set()
+        self._error = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), CoordinatorRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.coordinator = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """str: Base URL agents connect to."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def register(self, name: str | None, info: dict) -> dict:
+        """
+        Registers an agent under a unique id.
+
+        Args:
+            name (str, optional): Requested id; defaults to the agent's hostname.
+            info (dict): ``host`` description and ``clock_offset_ns`` and
+                ``clock_rtt_ns`` estimates.
+
+        Returns:
+            dict: The agent's ``agent`` id and the ``experiment``.
+        """
+        with self._lock:
+            hostname = info.get("host", {}).get("hostname", "")
+            base = name or hostname or "agent"
+            agent_id, suffix = base, 1
+            while agent_id in self.agents:
+                suffix += 1
+                agent_id = f"{base}-{suffix}"
+            self.agents[agent_id] = {**info, "samples": 0, "registered": time.time()}
+            if self.on_agent is not None:
+                self.on_agent(agent_id, self.agents[agent_id])
+        logging.info(f"Agent {agent_id} registered from {hostname or 'unknown host'}")
+        return {"agent": agent_id, "experiment": asdict(self.experiment)}
+
+    def _expire_leases(self, now: float) -> None:
+        for unit_id, lease in list(self._leased.items()):
+            if lease.deadline < now:
+                logging.warning(
+                    f"Agent {lease.agent} stopped reporting; requeuing "
+                    f"{len(lease.runs)} samples of unit {unit_id}"
+                )
+                del self._leased[unit_id]
+                self._pending.append(lease)
+
+    def lease(self, agent_id: str) -> dict:
+        """
+        Returns the next unit for an agent.
+
+        Returns:
+            dict: ``{"unit": ..., "runs": [[index, label], ...]}``,
+                ``{"wait": seconds}`` while the remaining units are leased, or
+                ``{"done": True}`` once the campaign is over.
+        """
+        with self._lock:
+            self._check_agent(agent_id)
+            now = time.monotonic()
+            for unit_id, lease in list(self._leased.items()):
+                # An agent asking for more work has given up on its last unit
+                if lease.agent == agent_id:
+                    del self._leased[unit_id]
+                    self._pending.append(lease)
+            self._expire_leases(now)
+            if self._done.is_set():
+                self._released.add(agent_id)
+                return {"done": True}
+            if not self._pending:
+                return {"wait": POLL_INTERVAL}
+            lease = self._pending.pop(0)
+            lease.agent = agent_id
+            lease.deadline = now + self.lease_timeout
+            self._leased[lease.unit_id] = lease
+            return {
+                "unit": lease.unit_id,
+                "runs": [[index, label] for index, label in lease.runs.items()],
+            }
+
+    def submit(self, agent_id: str, sample: dict) -> dict:
+        """
+        Accepts one sample, or one failed measurement, from an agent.
+
+        Args:
+            agent_id (str): The sending agent.
+            sample (dict): ``unit`` and ``index`` (None for warmup samples),
+                ``label``, ``warmup``, ``finished_ns`` on the agent's clock and
+                either the ``record`` or a true ``error`` flag.
+
+        Returns:
+            dict: ``accepted`` (False for a sample already received) and
+                ``stop`` (True once the agent should stop measuring).
+        """
+        error = bool(sample.get("error"))
+        record = None if error else FetchRecord(**sample["record"])
+        with self._lock:
+            agent = self._check_agent(agent_id)
+            if self._done.is_set():
+                self._released.add(agent_id)
+                return {"accepted": False, "stop": True}
+            warmup = bool(sample.get("warmup"))
+            label = sample["label"]
+            if not warmup:
+                lease = self._find_run(sample.get("unit"), sample["index"])
+                if lease is None:
+                    return {"accepted": False, "stop": False}
+                if lease.agent == agent_id:
+                    lease.deadline = time.monotonic() + self.lease_timeout
+                if not error or self._drop_failed(lease, sample["index"], label):
+                    del lease.runs[sample["index"]]
+                    if not lease.runs:
+                        self._leased.pop(lease.unit_id, None)
+                        if lease in self._pending:
+                            self._pending.remove(lease)
+                    if not error:
+                        self.completed += 1
+            sample_set = self.sample_sets[label]
+            if error:
+                sample_set.errors += 1
+            else:
+                sample_set.elapsed += record.duration
+                if warmup:
+                    sample_set.warmup += 1
+                else:
+                    sample_set.add(record)
+                agent["samples"] += 1
+            fields = {
+                "id": agent_id,
+                "finished_ns": sample["finished_ns"] + agent.get("clock_offset_ns", 0),
+            }
+            try:
+                if error and self.on_error is not None:
+                    self.on_error(label, warmup, fields)
+                elif not error and self.on_result is not None:
+                    self.on_result(label, record, warmup, fields)
+            except Exception as e:
+                self._error = e
+                self._done.set()
+                return {"accepted": True, "stop": True}
+            if self.completed + self.dropped == self.total:
+                self._done.set()
+            return {"accepted": True, "stop": self._done.is_set()}
+
+    def _drop_failed(self, lease: _Lease, index: int, label: str) -> bool:
+        # Counts a failed run; True once it has failed too often to retry
+        self._failures[index] = self._failures.get(index, 0) + 1
+        if self._failures[index] < self.max_attempts:
+            return False
+        logging.warning(
+            f"Dropping sample {index} of {label} after {self.max_attempts} "
+            f"failed attempts"
+        )
+        self.dropped += 1
+        return True
+
+    def _check_agent(self, agent_id: str) -> dict:
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            raise KeyError(f"Unknown agent {agent_id}; register first.")
+        return agent
+
+    def _find_run(self, unit_id, index):
+        for lease in [*self._leased.values(), *self._pending]:
+            if lease.unit_id == unit_id and index in lease.runs:
+                return lease
+        return None
+
+    def status(self) -> dict:
+        """
+        Returns the campaign's progress and agents.
+        """
+        with self._lock:
+            return {
+                "experiment": self.experiment.name,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "total": self.total,
+                "leased": {str(u): l.agent for u, l in self._leased.items()},
+                "agents": {
+                    agent_id: {"samples": agent["samples"]}
+                    for agent_id, agent in self.agents.items()
+                },
+                "done": self._done.is_set(),
+            }
+
+    def wait(self, timeout: float | None = None) -> dict:
+        """
+        Blocks until every unit has been measured.
+
+        Returns:
+            dict: Group label to ``SampleSet``, in target then method order.
+
+        Raises:
+            TimeoutError: If the campaign is not done within ``timeout`` seconds.
+            Exception: Whatever ``on_result`` raised, e.g. ``RunAborted``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Short waits keep the main thread responsive to KeyboardInterrupt
+        while not self._done.wait(POLL_INTERVAL):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"{self.completed} of {self.total} samples done after {timeout}s."
+                )
+        if self._error is not None:
+            raise self._error
+        for sample_set in self.sample_sets.values():
+            sample_set.stop_reason = STOP_MAX_SAMPLES
+        return self.sample_sets
+
+    def start(self) -> None:
+        """
+        Starts serving on a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.debug(f"Coordinator listening on {self.url}")
+
+    def stop(self, release_timeout: float = RELEASE_TIMEOUT) -> None:
+        """
+        Ends the campaign and stops serving.
+
+        Args:
+            release_timeout (float): Seconds to keep serving until every
+                agent has been told the campaign is over.
+        """
+        self._done.set()
+        deadline = time.monotonic() + release_timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._released >= set(self.agents):
+                    break
+            time.sleep(POLL_INTERVAL / 5)
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop(release_timeout=RELEASE_TIMEOUT if exc_type is None else 0)
+
+
+class CoordinatorRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes the agent protocol to the server's ``Coordinator``.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        coordinator = self.server.coordinator
+        if self.path == "/clock":
+            self._reply(200, {"time_ns": time.time_ns()})
+        elif self.path == "/status":
+            self._reply(200, coordinator.status())
+        else:
+            self._reply(404, {"error": f"No such endpoint: {self.path}"})
+
+    def do_POST(self):
+        coordinator = self.server.coordinator
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/register":
+                reply = coordinator.register(body.pop("name", None), body)
+            elif self.path == "/lease":
+                reply = coordinator.lease(body["agent"])
+            elif self.path == "/samples":
+                reply = coordinator.submit(body["agent"], body)
+            else:
+                self._reply(404, {"error": f"No such endpoint: {self.path}"})
+                return
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(200, reply)
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Coordinator: {format % args}")
+
+
+class AgentClient:
+    """
+    Talks to a ``Coordinator`` on behalf of one agent.
+
+    Args:
+        url (str): Base URL of the coordinator.
+        name (str, optional): Requested agent id; defaults to the hostname.
+        timeout (float): Seconds to wait for each reply.
+    """
+
+    def __init__(
+        self, url: str, name: str | None = None, timeout: float = REQUEST_TIMEOUT
+    ):
+        self.url = url.rstrip("/")
+        self.name = name
+        self.timeout = timeout
+        self.agent_id = None
+        self.clock_offset_ns = 0
+        self.clock_rtt_ns = 0
+        # Kept alive so clock probes do not include connection setup
+        self._session = requests.Session()
+
+    def _post(self, path: str, payload: dict) -> dict:
+        response = self._session.post(
+            self.url + path, json=payload, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def sync_clock(self, probes: int = CLOCK_PROBES) -> int:
+        """
+        Estimates this host's clock offset from the coordinator's.
+
+        Returns:
+            int: Nanoseconds to add to a local timestamp.
+        """
+        samples = []
+        for _ in range(probes):
+            sent = time.time_ns()
+            response = self._session.get(self.url + "/clock", timeout=self.timeout)
+            received = time.time_ns()
+            response.raise_for_status()
+            samples.append((sent, response.json()["time_ns"], received))
+        self.clock_offset_ns, self.clock_rtt_ns = estimate_clock_offset(samples)
+        return self.clock_offset_ns
+
+    def register(self) -> Experiment:
+        """
+        Syncs the clock and registers with the coordinator.
+
+        Returns:
+            Experiment: The campaign to measure.
+
+        Raises:
+            requests.RequestException: If the coordinator cannot be reached.
+        """
+        self.sync_clock()
+        reply = self._post(
+            "/register",
+            {
+                "name": self.name,
+                "host": host_info(),
+                "clock_offset_ns": self.clock_offset_ns,
+                "clock_rtt_ns": self.clock_rtt_ns,
+            },
+        )
+        self.agent_id = reply["agent"]
+        logging.info(
+            f"Registered as {self.agent_id} at {self.url} "
+            f"(clock offset {self.clock_offset_ns / 1e6:+.2f}ms, "
+            f"round trip {self.clock_rtt_ns / 1e6:.2f}ms)"
+        )
+        return Experiment(**reply["experiment"])
+
+    def lease(self) -> dict | None:
+        """
+        Waits for the next unit of work.
+
+        Returns:
+            dict: The unit, with ``runs`` as ``[index, label]`` pairs; None
+                once the campaign is over.
+        """
+        while True:
+            reply = self._post("/lease", {"agent": self.agent_id})
+            if reply.get("done"):
+                return None
+            if "unit" in reply:
+                return reply
+            time.sleep(reply.get("wait", POLL_INTERVAL))
+
+    def send(self, label: str, record, warmup=False, unit=None, index=None) -> bool:
+        """
+        Streams one finished sample to the coordinator.
+
+        Args:
+            label (str): Group label of the sample.
+            record (FetchRecord): The sample, or None to report that its
+                measurement failed.
+            warmup (bool): Whether it is a warmup sample.
+            unit (int, optional): Leased unit the sample belongs to.
+            index (int, optional): Schedule index of the sample in the unit.
+
+        Returns:
+            bool: False once the coordinator wants the agent to stop.
+        """
+        payload = {
+            "agent": self.agent_id,
+            "unit": unit,
+            "index": index,
+            "label": label,
+            "warmup": warmup,
+            "finished_ns": time.time_ns(),
+        }
+        if record is None:
+            payload["error"] = True
+        else:
+            payload["record"] = asdict(record)
+        return not self._post("/samples", payload).get("stop")
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def run_agent(
+    client: AgentClient,
+    measures: dict,
+    warmup: int = 0,
+    on_result=None,
+    keep_records: bool = True,
+) -> dict:
+    """
+    Measures leased units until the coordinator reports the campaign done.
+
+    Args:
+        client (AgentClient): A registered client.
+        measures (dict): Group label to a zero-argument callable returning a
+            ``FetchRecord``, or None if it failed, for every cell of the
+            experiment. A failure is reported to the coordinator, which
+            retries the run until it has failed ``max_attempts`` times.
+        warmup (int): Rounds over every cell to run and report as warmup
+            before the first unit.
+        on_result (callable, optional): Called with the label, the record and
+            whether it is a warmup sample, before the sample is sent.
+        keep_records (bool): Keep every record in memory as well as its duration.
+
+    Returns:
+        dict: Group label to ``SampleSet`` of the samples this agent took.
+    """
+    sample_sets = {
+        label: SampleSet(label, keep_records=keep_records) for label in measures
+    }
+
+    def take(label, is_warmup, unit=None, index=None):
+        record = measures[label]()
+        sample_set = sample_sets[label]
+        if record is None:
+            sample_set.errors += 1
+            return client.send(label, None, is_warmup, unit, index)
+        sample_set.elapsed += record.duration
+        if is_warmup:
+            sample_set.warmup += 1
+        else:
+            sample_set.add(record)
+        if on_result is not None:
+            on_result(label, record, is_warmup)
+        return client.send(label, record, is_warmup, unit, index)
+
+    running = True
+    for _ in range(warmup):
+        for label in measures:
+            running = running and take(label, True)
+    while running and (unit := client.lease()) is not None:
+        for index, label in unit["runs"]:
+            if not take(label, False, unit["unit"], index):
+                running = False
+                break
+    for sample_set in sample_sets.values():
+        sample_set.stop_reason = STOP_MAX_SAMPLES
+    return sample_sets
+
+
+def agent_summary(path: str) -> dict:
+    """
+    Summarizes a coordinated run's samples per agent.
+
+    Args:
+        path (str): Result file written by a coordinator.
+
+    Returns:
+        dict: Agent id to its ``hostname``, ``clock_offset_ns``, measured
+            ``samples`` and ``medians`` (group label to seconds), in
+            registration order.
+    """
+    agents, durations = {}, {}
+    for entry in read_entries(path):
+        if entry.get("type") == "agent":
+            agents[entry["agent"]] = {
+                "hostname": entry.get("host", {}).get("hostname", ""),
+                "clock_offset_ns": entry.get("clock_offset_ns", 0),
+            }
+        elif entry.get("type") == "sample" and "agent" in entry:
+            if entry["warmup"]:
+                continue
+            by_label = durations.setdefault(entry["agent"]["id"], {})
+            by_label.setdefault(entry["label"], []).append(
+                entry["record"]["total_ns"] / 1e9
+            )
+    for agent_id, summary in agents.items():
+        by_label = durations.get(agent_id, {})
+        summary["samples"] = sum(len(values) for values in by_label.values())
+        summary["medians"] = {
+            label: float(np.median(values)) for label, values in by_label.items()
+        }
+    return agents
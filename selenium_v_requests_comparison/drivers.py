@@ -0,0 +1,308 @@
+"""
+Chrome and Chromedriver Resolution
+----------------------------------
+Finds the Chrome (or Chromium) binary and a matching chromedriver once per
+process, instead of asking ``webdriver_manager`` on every browser start.
+
+Resolved drivers are persisted to a JSON cache keyed by the Chrome version,
+so later runs skip the version lookup and network I/O entirely. The Chrome
+version itself is cached per binary path and modification time. On Windows
+it is read from the install directory rather than from ``chrome --version``.
+
+Resolution order for the driver:
+    1. A pinned path from the ``CHROMEDRIVER_PATH`` environment variable.
+    2. The result already resolved in this process.
+    3. The on-disk cache entry for the installed Chrome version.
+    4. In offline mode, ``chromedriver`` on PATH.
+    5. Otherwise, a download through ``webdriver_manager``.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+DRIVER_PATH_ENV = "CHROMEDRIVER_PATH"
+OFFLINE_ENV = "SELENIUM_V_REQUESTS_OFFLINE"
+CACHE_FILENAME = "chromedriver.json"
+UNKNOWN_VERSION = "unknown"
+
+# Default Chrome and Chromium install locations per platform
+CHROME_BINARY_LOCATIONS = {
+    "win32": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    ],
+    "darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "linux": [
+        "/usr/bin/google-chrome",
+        "/usr/bin/google-chrome-stable",
+        "/opt/google/chrome/chrome",
+        "/usr/bin/chromium",
+        "/usr/bin/chromium-browser",
+        "/snap/bin/chromium",
+    ],
+}
+# Executable names looked up on PATH when no default location exists
+CHROME_COMMANDS = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "chrome",
+]
+
+_VERSION_PATTERN = re.compile(r"(\d+(?:\.\d+){1,3})")
+# Windows installs keep each version's files in a directory such as 120.0.6099.109
+_DIRECTORY_VERSION_PATTERN = re.compile(r"\d+\.\d+\.\d+\.\d+")
+# Drivers resolved in this process, keyed by Chrome binary
+_resolved = {}
+
+
+def platform_key() -> str:
+    """
+    Returns the key of the current platform in ``CHROME_BINARY_LOCATIONS``.
+    """
+    if sys.platform.startswith("win"):
+        return "win32"
+    if sys.platform == "darwin":
+        return "darwin"
+    return "linux"
+
+
+def find_chrome(locations=None, commands=CHROME_COMMANDS) -> str:
+    """
+    Finds a Chrome or Chromium binary in default locations or via PATH.
+
+    Args:
+        locations (list of str, optional): Paths to check first; defaults to
+            the current platform's ``CHROME_BINARY_LOCATIONS``.
+        commands (list of str): Executable names to look up on PATH.
+
+    Returns:
+        str: Chrome binary path if found; otherwise an empty string.
+    """
+    if locations is None:
+        locations = CHROME_BINARY_LOCATIONS[platform_key()]
+    for path in locations:
+        if os.path.exists(path):
+            return path
+    for command in commands:
+        chrome = shutil.which(command)
+        if chrome:
+            return chrome
+    return ""
+
+
+def cache_path() -> str:
+    """
+    Returns the path of the on-disk resolution cache.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(root, "selenium_v_requests_comparison", CACHE_FILENAME)
+
+
+def load_cache(path: str) -> dict:
+    """
+    Reads the resolution cache, returning empty sections if it is missing or corrupt.
+    """
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache.setdefault("versions", {})
+    cache.setdefault("drivers", {})
+    return cache
+
+
+def save_cache(path: str, cache: dict) -> None:
+    """
+    Writes the resolution cache atomically, ignoring unwritable locations.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.debug(f"Could not write driver cache {path}: {e}")
+
+
+def parse_version(output: str) -> str:
+    """
+    Extracts the version number from ``chrome --version`` output.
+
+    Args:
+        output (str): e.g. ``"Google Chrome 120.0.6099.109"``.
+
+    Returns:
+        str: The version, or ``UNKNOWN_VERSION`` if none is found.
+    """
+    match = _VERSION_PATTERN.search(output)
+    return match.group(1) if match else UNKNOWN_VERSION
+
+
+def _version_key(version: str) -> tuple:
+    return tuple(int(part) for part in version.split("."))
+
+
+def windows_chrome_version(binary: str) -> str:
+    """
+    Returns the version of a Windows Chrome install without starting it.
+
+    ``chrome.exe --version`` prints nothing on Windows and may open a window,
+    so the version is read from the version-named directory the installer
+    puts next to ``chrome.exe``, falling back to the ``BLBeacon`` registry key.
+
+    Args:
+        binary (str): Path of ``chrome.exe``.
+
+    Returns:
+        str: The newest installed version, or ``UNKNOWN_VERSION``.
+    """
+    try:
+        names = os.listdir(os.path.dirname(binary))
+    except OSError:
+        names = []
+    versions = [name for name in names if _DIRECTORY_VERSION_PATTERN.fullmatch(name)]
+    if versions:
+        return max(versions, key=_version_key)
+    try:
+        import winreg
+    except ImportError:
+        return UNKNOWN_VERSION
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                return parse_version(winreg.QueryValueEx(key, "version")[0])
+        except OSError:
+            continue
+    return UNKNOWN_VERSION
+
+
+def chrome_version(binary: str, cache: dict) -> str:
+    """
+    Returns the version of a Chrome binary, cached by path and modification time.
+
+    Args:
+        binary (str): Chrome binary path.
+        cache (dict): Loaded resolution cache; updated in place.
+
+    Returns:
+        str: The Chrome version, or ``UNKNOWN_VERSION``.
+    """
+    try:
+        stamp = os.stat(binary).st_mtime_ns
+    except OSError:
+        return UNKNOWN_VERSION
+    entry = cache["versions"].get(binary)
+    if entry and entry.get("mtime_ns") == stamp:
+        return entry["version"]
+    if sys.platform == "win32":
+        version = windows_chrome_version(binary)
+    else:
+        try:
+            output = subprocess.run(
+                [binary, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return UNKNOWN_VERSION
+        version = parse_version(output)
+    if version != UNKNOWN_VERSION:
+        cache["versions"][binary] = {"mtime_ns": stamp, "version": version}
+    return version
+
+
+def _download_driver(chrome_binary: str) -> str:
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.os_manager import ChromeType
+
+    chrome_type = (
+        ChromeType.CHROMIUM
+        if "chromium" in os.path.basename(chrome_binary).lower()
+        else ChromeType.GOOGLE
+    )
+    return ChromeDriverManager(chrome_type=chrome_type).install()
+
+
+def offline_mode() -> bool:
+    """
+    Returns True if driver downloads are disabled via ``OFFLINE_ENV``.
+    """
+    return os.environ.get(OFFLINE_ENV, "").lower() not in ("", "0", "false")
+
+
+def resolve_chromedriver(
+    chrome_binary: str = "",
+    driver_path: str | None = None,
+    offline: bool | None = None,
+    cache_file: str | None = None,
+) -> str:
+    """
+    Returns a chromedriver path matching the given Chrome binary.
+
+    The first resolution in a process may check the Chrome version and
+    download a driver; later calls, and later runs with the same Chrome
+    version, return immediately.
+
+    Args:
+        chrome_binary (str): Chrome binary the driver must match.
+        driver_path (str, optional): Pinned driver; defaults to the
+            ``CHROMEDRIVER_PATH`` environment variable.
+        offline (bool, optional): Never download; defaults to the
+            ``OFFLINE_ENV`` environment variable.
+        cache_file (str, optional): Resolution cache; defaults to ``cache_path()``.
+
+    Returns:
+        str: Path to a chromedriver executable.
+
+    Raises:
+        RuntimeError: If no driver can be found offline.
+    """
+    driver_path = driver_path or os.environ.get(DRIVER_PATH_ENV)
+    if driver_path:
+        return driver_path
+    if chrome_binary in _resolved:
+        return _resolved[chrome_binary]
+    offline = offline_mode() if offline is None else offline
+    cache_file = cache_file or cache_path()
+    cache = load_cache(cache_file)
+    snapshot = json.dumps(cache, sort_keys=True)
+    version = chrome_version(chrome_binary, cache) if chrome_binary else UNKNOWN_VERSION
+    cached = cache["drivers"].get(version)
+    if version != UNKNOWN_VERSION and cached and os.path.exists(cached):
+        logging.debug(f"Using cached chromedriver for Chrome {version}: {cached}")
+        path = cached
+    elif offline:
+        path = shutil.which("chromedriver")
+        if not path:
+            raise RuntimeError(
+                f"No cached chromedriver for Chrome {version} and none on PATH; "
+                f"set {DRIVER_PATH_ENV} or run once online."
+            )
+    else:
+        logging.debug(f"Resolving chromedriver for Chrome {version}...")
+        path = _download_driver(chrome_binary)
+        if version != UNKNOWN_VERSION:
+            cache["drivers"][version] = path
+    if json.dumps(cache, sort_keys=True) != snapshot:
+        save_cache(cache_file, cache)
+    _resolved[chrome_binary] = path
+    return path
+
+
+def clear_resolved() -> None:
+    """
+    Forgets drivers resolved in this process; the on-disk cache is kept.
+    """
+    _resolved.clear()
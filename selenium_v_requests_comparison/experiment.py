@@ -0,0 +1,402 @@
+"""
+Declarative Experiments
+-----------------------
+Loads an experiment from a TOML file and runs it in a randomized, blocked
+order, so slow drift (thermal throttling, warming caches) spreads evenly over
+every group instead of biasing whichever runs last.
+
+Each block runs every (target, method) cell once, shuffled. Blocks repeat
+until each method has taken its sample budget. Completed samples are appended
+to a progress file as they finish, so an interrupted run can be resumed: the
+same seed rebuilds the same schedule and finished entries are skipped.
+
+Example::
+
+    [experiment]
+    name = "baseline"
+    seed = 42
+    samples = 20
+    warmup = 1
+    local_server = true
+
+    [[targets]]
+    name = "API"
+    url = "/api/fact"
+
+    [[targets]]
+    name = "Text"
+    url = "https://example.com"
+
+    [methods.requests]
+    keep_alive = true
+
+    [methods.selenium]
+    pool_size = 1
+    ready = "selector"
+    samples = 10
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import tomllib
+from dataclasses import asdict, dataclass
+
+from selenium_v_requests_comparison.sampling import STOP_MAX_SAMPLES, SampleSet
+from selenium_v_requests_comparison.timing import FetchRecord
+
+DEFAULT_SAMPLES = 10
+DEFAULT_PROGRESS_FILENAME = "experiment_progress.jsonl"
+# Display names used in group labels such as "API - Requests"
+METHOD_LABELS = {"requests": "Requests", "selenium": "Selenium", "cdp": "CDP"}
+# Per-method options and the command-line argument each one sets
+METHOD_OPTIONS = {
+    "requests": {
+        "keep_alive": "keep_alive",
+        "pool_size": "http_pool_size",
+        "retries": "retries",
+        "retry_backoff": "retry_backoff",
+        "extract_selector": "extract_selector",
+        "extract_limit": "extract_limit",
+        "http_cache": "http_cache",
+        "cache_max_bytes": "cache_max_bytes",
+        "cache_dir": "cache_dir",
+    },
+    "selenium": {
+        "pool_size": "pool_size",
+        "ready": "ready",
+        "ready_timeout": "ready_timeout",
+        "ready_selector": "ready_selector",
+        "ready_script": "ready_script",
+        "page_load_strategy": "page_load_strategy",
+        "block": "block",
+        "block_url": "block_url",
+    },
+    "cdp": {
+        "lifecycle": "cdp_lifecycle",
+        "pool_size": "pool_size",
+    },
+}
+
+
+@dataclass
+class Experiment:
+    """
+    An experiment loaded from a TOML file.
+
+    Attributes:
+        name (str): Experiment name.
+        targets (dict): Target name to URL; URLs starting with ``/`` are
+            resolved against the local benchmark server.
+        methods (dict): Method name to its options, in file order.
+        samples (int): Default sample budget per (target, method) cell.
+        warmup (int): Leading samples per cell that are discarded.
+        seed (int, optional): Seed of the schedule shuffle.
+        local_server (bool): Start the local benchmark server.
+        progress (str): Path of the progress file used for resuming.
+    """
+
+    name: str
+    targets: dict
+    methods: dict
+    samples: int = DEFAULT_SAMPLES
+    warmup: int = 0
+    seed: int | None = None
+    local_server: bool = False
+    progress: str = DEFAULT_PROGRESS_FILENAME
+
+    def budget(self, method: str) -> int:
+        """
+        Returns the sample budget of a method, after warmup.
+        """
+        return self.methods[method].get("samples", self.samples)
+
+    def urls(self, base_url: str | None = None) -> dict:
+        """
+        Returns target names to absolute URLs.
+
+        Args:
+            base_url (str, optional): Root of the local benchmark server.
+
+        Raises:
+            ValueError: If a relative URL is used without a server.
+        """
+        urls = {}
+        for name, url in self.targets.items():
+            if url.startswith("/"):
+                if base_url is None:
+                    raise ValueError(f"Target {name} needs local_server = true.")
+                url = base_url + url
+            urls[name] = url
+        return urls
+
+
+def load_experiment(path: str) -> Experiment:
+    """
+    Reads and validates an experiment file.
+
+    Args:
+        path (str): TOML file path.
+
+    Returns:
+        Experiment: The parsed experiment.
+
+    Raises:
+        ValueError: If the file is missing required fields or uses unknown
+            methods or options.
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    settings = data.get("experiment", {})
+    targets = {target["name"]: target["url"] for target in data.get("targets", [])}
+    if not targets:
+        raise ValueError(f"{path}: at least one [[targets]] entry is required.")
+    methods = data.get("methods", {})
+    if not methods:
+        raise ValueError(f"{path}: at least one [methods.<name>] table is required.")
+    # Argument to the (method, option, value) that set it, to catch conflicts
+    arguments = {}
+    for method, options in methods.items():
+        if method not in METHOD_OPTIONS:
+            raise ValueError(f"{path}: unknown method {method}.")
+        unknown = set(options) - set(METHOD_OPTIONS[method]) - {"samples"}
+        if unknown:
+            raise ValueError(
+                f"{path}: unknown {method} options: {', '.join(sorted(unknown))}."
+            )
+        for option, value in options.items():
+            argument = METHOD_OPTIONS[method].get(option)
+            other = arguments.setdefault(argument, (method, option, value))
+            if argument is not None and other[2] != value:
+                raise ValueError(
+                    f"{path}: {method}.{option} = {value!r} conflicts with "
+                    f"{other[0]}.{other[1]} = {other[2]!r}; both set "
+                    f"--{argument.replace('_', '-')}."
+                )
+    return Experiment(
+        name=settings.get("name", os.path.splitext(os.path.basename(path))[0]),
+        targets=targets,
+        methods=methods,
+        samples=settings.get("samples", DEFAULT_SAMPLES),
+        warmup=settings.get("warmup", 0),
+        seed=settings.get("seed"),
+        local_server=settings.get("local_server", False),
+        progress=settings.get("progress", DEFAULT_PROGRESS_FILENAME),
+    )
+
+
+def apply_to_args(experiment: Experiment, args) -> None:
+    """
+    Copies the experiment's methods and per-method options onto parsed CLI arguments.
+
+    Args:
+        experiment (Experiment): The loaded experiment.
+        args (argparse.Namespace): Arguments of the comparison CLI; updated in place.
+    """
+    args.methods = list(experiment.methods)
+    args.local_server = args.local_server or experiment.local_server
+    for method, options in experiment.methods.items():
+        for option, value in options.items():
+            if option in METHOD_OPTIONS[method]:
+                setattr(args, METHOD_OPTIONS[method][option], value)
+
+
+def group_label(target: str, method: str) -> str:
+    """
+    Returns the label of a (target, method) group, e.g. ``"API - Requests"``.
+    """
+    return f"{target} - {METHOD_LABELS[method]}"
+
+
+@dataclass(frozen=True)
+class ScheduledRun:
+    """
+    One sample in an experiment schedule.
+
+    Attributes:
+        index (int): Position in the schedule.
+        block (int): Block the sample belongs to.
+        label (str): Group label of the sample's (target, method) cell.
+        warmup (bool): Whether the sample is discarded as warmup.
+    """
+
+    index: int
+    block: int
+    label: str
+    warmup: bool = False
+
+
+def build_schedule(experiment: Experiment, seed: int) -> list:
+    """
+    Expands an experiment into a randomized, blocked execution order.
+
+    Every block contains each cell that still has samples left, in a fresh
+    random order. Warmup blocks come first.
+
+    Args:
+        experiment (Experiment): The experiment to schedule.
+        seed (int): Seed of the shuffle; the same seed gives the same schedule.
+
+    Returns:
+        list of ScheduledRun: The schedule.
+    """
+    rng = random.Random(seed)
+    remaining = {
+        group_label(target, method): experiment.warmup + experiment.budget(method)
+        for target in experiment.targets
+        for method in experiment.methods
+    }
+    schedule, block = [], 0
+    while any(remaining.values()):
+        cells = [label for label, count in remaining.items() if count]
+        rng.shuffle(cells)
+        for label in cells:
+            remaining[label] -= 1
+            schedule.append(
+                ScheduledRun(len(schedule), block, label, block < experiment.warmup)
+            )
+        block += 1
+    return schedule
+
+
+def schedule_fingerprint(schedule) -> str:
+    """
+    Returns a short hash identifying a schedule, used to validate resumes.
+    """
+    text = json.dumps([[run.block, run.label, run.warmup] for run in schedule])
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def read_progress(path: str) -> tuple:
+    """
+    Reads a progress file.
+
+    Returns:
+        tuple: ``(header, completed)`` where ``header`` is the header dict (or
+            None if the file is missing or empty) and ``completed`` maps
+            schedule index to its FetchRecord.
+    """
+    header, completed = None, {}
+    if not os.path.exists(path):
+        return header, completed
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by the interruption
+                continue
+            if entry.get("type") == "header":
+                header = entry
+            elif entry.get("type") == "sample":
+                completed[entry["index"]] = FetchRecord(**entry["record"])
+    return header, completed
+
+
+def _terminate_last_line(path: str) -> None:
+    # An interrupted write can leave a partial line; start appending on a new one
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def run_experiment(
+    experiment: Experiment,
+    measures: dict,
+    resume: bool = False,
+    on_result=None,
+    keep_records: bool = True,
+) -> dict:
+    """
+    Runs an experiment's schedule, appending each sample to the progress file.
+
+    Args:
+        experiment (Experiment): The experiment to run.
+        measures (dict): Group label to a zero-argument callable returning a
+            ``FetchRecord``, or None if it failed, for every cell of the
+            experiment. Failed samples are left out of the progress file, so
+            ``resume`` retries them.
+        resume (bool): Continue from an existing progress file instead of
+            starting over.
+        on_result (callable, optional): Called with the label, the record and
+            whether it is a warmup sample, in schedule order; resumed samples
+            are replayed through it too.
+        keep_records (bool): Keep every record in memory as well as its duration.
+
+    Returns:
+        dict: Group label to ``SampleSet``, in target then method order.
+
+    Raises:
+        ValueError: If the progress file belongs to a different schedule.
+    """
+    header, completed = read_progress(experiment.progress) if resume else (None, {})
+    seed = experiment.seed
+    if seed is None:
+        seed = header["seed"] if header else random.randrange(2**32)
+    schedule = build_schedule(experiment, seed)
+    fingerprint = schedule_fingerprint(schedule)
+    if header is not None and header["fingerprint"] != fingerprint:
+        raise ValueError(
+            f"{experiment.progress} was written by a different experiment schedule."
+        )
+    if completed:
+        logging.info(
+            f"Resuming {experiment.name}: {len(completed)}/{len(schedule)} samples done."
+        )
+
+    if header is not None:
+        _terminate_last_line(experiment.progress)
+    with open(experiment.progress, "a" if header else "w") as progress:
+        if header is None:
+            header = {
+                "type": "header",
+                "name": experiment.name,
+                "seed": seed,
+                "fingerprint": fingerprint,
+            }
+            progress.write(json.dumps(header) + "\n")
+        sample_sets = {
+            label: SampleSet(label, keep_records=keep_records) for label in measures
+        }
+        for run in schedule:
+            record = completed.pop(run.index, None)
+            if record is None:
+                record = measures[run.label]()
+                if record is None:
+                    sample_sets[run.label].errors += 1
+                    continue
+                _write_sample(progress, run, record)
+            sample_set = sample_sets[run.label]
+            sample_set.elapsed += record.duration
+            if run.warmup:
+                sample_set.warmup += 1
+            else:
+                sample_set.add(record)
+            if on_result is not None:
+                on_result(run.label, record, run.warmup)
+
+    for sample_set in sample_sets.values():
+        sample_set.stop_reason = STOP_MAX_SAMPLES
+    return sample_sets
+
+
+def _write_sample(progress, run: ScheduledRun, record) -> None:
+    progress.write(
+        json.dumps(
+            {
+                "type": "sample",
+                "index": run.index,
+                "label": run.label,
+                "record": asdict(record),
+            }
+        )
+        + "\n"
+    )
+    # Flushed per sample so an interruption loses at most the current one
+    progress.flush()
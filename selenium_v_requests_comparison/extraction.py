@@ -0,0 +1,272 @@
+"""
+Streaming HTML Extraction
+-------------------------
+Gives the requests path the same extraction stage the browser paths have:
+the job titles are parsed out of the page, not just downloaded.
+
+The body is fed to an incremental ``html.parser`` as ``iter_content`` chunks
+arrive, and matched against a simple CSS selector (``tag``, ``.class``,
+``#id`` or a compound such as ``a.job-card-list__title``). With a match limit
+the download stops as soon as enough elements have been found, and the bytes
+left unread are recorded as the early-exit saving.
+
+Extractors are pluggable: anything with ``feed_bytes(chunk) -> bool`` (True
+once done), ``close()`` and a ``matches`` list can be passed to
+``extract_stream``. Those that also have ``set_encoding(name)`` are told the
+charset the response declares, so non-UTF-8 pages decode correctly.
+"""
+
+import codecs
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from html.parser import HTMLParser
+
+DEFAULT_SELECTOR = ".job-card-list__title"
+DEFAULT_CHUNK_SIZE = 8192
+
+_SELECTOR_PATTERN = re.compile(r"^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+# Elements that never have an end tag
+_VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+@dataclass(frozen=True)
+class Selector:
+    """
+    A compound CSS selector of an optional tag, classes and an id.
+
+    Attributes:
+        tag (str, optional): Lowercase tag name.
+        classes (frozenset of str): Classes the element must all have.
+        element_id (str, optional): Required id.
+    """
+
+    tag: str | None = None
+    classes: frozenset = frozenset()
+    element_id: str | None = None
+
+    @classmethod
+    def parse(cls, selector: str) -> "Selector":
+        """
+        Parses a selector such as ``"a.job-card-list__title"``.
+
+        Raises:
+            ValueError: If the selector uses combinators, attributes or pseudo-classes.
+        """
+        match = _SELECTOR_PATTERN.match(selector.strip())
+        if not match or not selector.strip():
+            raise ValueError(f"Unsupported selector: {selector}")
+        tag, rest = match.groups()
+        parts = re.findall(r"[.#][\w-]+", rest)
+        ids = [part[1:] for part in parts if part[0] == "#"]
+        if len(ids) > 1:
+            raise ValueError(f"Unsupported selector: {selector}")
+        return cls(
+            tag=tag.lower() if tag else None,
+            classes=frozenset(part[1:] for part in parts if part[0] == "."),
+            element_id=ids[0] if ids else None,
+        )
+
+    def matches(self, tag: str, attrs) -> bool:
+        """
+        Returns True if an element with this tag and attributes matches.
+        """
+        if self.tag is not None and tag != self.tag:
+            return False
+        attributes = dict(attrs)
+        if self.element_id is not None and attributes.get("id") != self.element_id:
+            return False
+        return self.classes <= set((attributes.get("class") or "").split())
+
+
+class SelectorExtractor(HTMLParser):
+    """
+    Collects the text of elements matching a selector, fed incrementally.
+
+    Args:
+        selector (str): CSS selector, see ``Selector.parse``.
+        limit (int, optional): Stop once this many elements are complete.
+        encoding (str): Encoding used to decode byte chunks, unless the
+            response declares its own through ``set_encoding``.
+    """
+
+    def __init__(
+        self,
+        selector: str = DEFAULT_SELECTOR,
+        limit: int | None = None,
+        encoding: str = "utf-8",
+    ):
+        super().__init__(convert_charrefs=True)
+        self.selector = Selector.parse(selector)
+        self.limit = limit
+        self.matches = []
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        # Open-element depth of each match still being read, and its text
+        self._open = []
+
+    def set_encoding(self, encoding: str) -> None:
+        """
+        Decodes the chunks fed from now on with ``encoding``.
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    @property
+    def done(self) -> bool:
+        """bool: Whether the match limit has been reached."""
+        return self.limit is not None and len(self.matches) >= self.limit
+
+    def feed_bytes(self, chunk: bytes) -> bool:
+        """
+        Parses the next chunk of the body.
+
+        Returns:
+            bool: True once no more input is needed.
+        """
+        self.feed(self._decoder.decode(chunk))
+        return self.done
+
+    def close(self) -> None:
+        self.feed(self._decoder.decode(b"", final=True))
+        super().close()
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        for entry in self._open:
+            entry[0] += 1
+        if self.selector.matches(tag, attrs):
+            self._open.append([1, []])
+        if tag in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for entry in self._open:
+            entry[0] -= 1
+        while self._open and self._open[-1][0] <= 0:
+            _, text = self._open.pop()
+            self.matches.append("".join(text).strip())
+
+    def handle_data(self, data):
+        for _, text in self._open:
+            text.append(data)
+
+
+@dataclass
+class ExtractionResult:
+    """
+    The outcome of extracting from a streamed body.
+
+    Attributes:
+        matches (list of str): Text of each matched element.
+        parse_ns (int): Time spent parsing, excluding time waiting for the network.
+        bytes_read (int): Body bytes received from the socket, before decoding.
+        bytes_decoded (int): Decoded body bytes fed to the extractor.
+        content_length (int, optional): Declared body size, when known.
+        early_exit (bool): Whether reading stopped before the end of the body.
+    """
+
+    matches: list = field(default_factory=list)
+    parse_ns: int = 0
+    bytes_read: int = 0
+    bytes_decoded: int = 0
+    content_length: int | None = None
+    early_exit: bool = False
+
+    @property
+    def bytes_skipped(self) -> int:
+        """int: Body bytes never read thanks to the early exit; 0 if unknown."""
+        if not self.early_exit or self.content_length is None:
+            return 0
+        return max(self.content_length - self.bytes_read, 0)
+
+
+def declared_encoding(response) -> str | None:
+    """
+    Returns the charset a response's Content-Type declares, if Python knows it.
+
+    Unlike ``response.encoding``, a text type without a charset gives None
+    rather than ISO-8859-1, so the extractor keeps its UTF-8 default.
+    """
+    message = Message()
+    message["Content-Type"] = response.headers.get("Content-Type", "")
+    charset = message.get_content_charset()
+    if charset is None:
+        return None
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        logging.debug(f"Unknown charset {charset}; decoding with the default.")
+        return None
+
+
+def extract_stream(
+    response, extractor, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ExtractionResult:
+    """
+    Feeds a streamed response to an extractor, stopping once it is done.
+
+    An early exit closes the response without reading the rest of the body,
+    so its connection is not returned to the pool.
+
+    Args:
+        response (requests.Response): A response requested with ``stream=True``.
+        extractor: E.g. a ``SelectorExtractor``.
+        chunk_size (int): Bytes per ``iter_content`` chunk.
+
+    Returns:
+        ExtractionResult: The matches and the extraction cost and savings.
+    """
+    length = response.headers.get("Content-Length")
+    result = ExtractionResult(content_length=int(length) if length else None)
+    encoding = declared_encoding(response)
+    if encoding is not None and hasattr(extractor, "set_encoding"):
+        extractor.set_encoding(encoding)
+    for chunk in response.iter_content(chunk_size):
+        result.bytes_decoded += len(chunk)
+        start_ns = time.perf_counter_ns()
+        done = extractor.feed_bytes(chunk)
+        result.parse_ns += time.perf_counter_ns() - start_ns
+        if done:
+            result.early_exit = True
+            break
+    start_ns = time.perf_counter_ns()
+    extractor.close()
+    result.parse_ns += time.perf_counter_ns() - start_ns
+    # Responses served from memory, e.g. by a cache, have no raw stream
+    result.bytes_read = (
+        response.raw.tell() if response.raw is not None else result.bytes_decoded
+    )
+    if result.early_exit:
+        response.close()
+        # Nothing is saved on a body already in memory, or one that ended
+        # exactly at the last match
+        result.early_exit = response.raw is not None and (
+            result.bytes_skipped > 0 or result.content_length is None
+        )
+    result.matches = list(extractor.matches)
+    logging.debug(
+        f"Extracted {len(result.matches)} elements from {result.bytes_read} bytes"
+        f"{' (early exit)' if result.early_exit else ''}."
+    )
+    return result
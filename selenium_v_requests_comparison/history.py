@@ -0,0 +1,384 @@
+"""
+Benchmark History and Regression Gating
+---------------------------------------
+Keeps every run's result file in a history directory, lets a run be saved as a
+named baseline, and compares a new run against a baseline series by series.
+
+A series regresses when a one-sided Mann-Whitney U test says its samples are
+slower than the baseline's (``p < alpha``) *and* its median grew by more than
+the threshold, so neither noise on a large run nor a large shift on a handful
+of samples fails the gate alone. Cold-start series are compared as well, so a
+Chrome upgrade that slows browser launches is caught like any other.
+
+Subcommands of the comparison CLI::
+
+    selenium_v_requests_comparison baseline results_<run_id>.jsonl --name main
+    selenium_v_requests_comparison compare results_<run_id>.jsonl --baseline main
+    selenium_v_requests_comparison trend
+"""
+
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from selenium_v_requests_comparison.sampling import (
+    bootstrap_ci,
+    mann_whitney_u,
+    ratio_ci,
+)
+from selenium_v_requests_comparison.store import (
+    COLD_START,
+    Series,
+    load_series,
+    read_entries,
+    read_run,
+)
+
+HISTORY_DIR = "benchmark_history"
+BASELINES_DIRNAME = "baselines"
+TREND_FILENAME = "trend.png"
+# Relative median increase a series may show before it counts as regressed
+DEFAULT_THRESHOLD = 0.10
+# Significance level of the Mann-Whitney U test
+DEFAULT_ALPHA = 0.05
+SUBCOMMANDS = ("compare", "trend", "baseline")
+
+
+def _suffix(path: str) -> str:
+    return ".jsonl.gz" if path.endswith(".gz") else ".jsonl"
+
+
+def archive_run(results_path: str, history_dir: str = HISTORY_DIR) -> str:
+    """
+    Copies a result file into the history directory.
+
+    Files are named after the run's start time and id, so they sort in run
+    order and archiving the same run twice keeps one copy.
+
+    Args:
+        results_path (str): File written by ``ResultStore``.
+        history_dir (str): History directory; created if missing.
+
+    Returns:
+        str: Path of the archived copy.
+    """
+    run = read_run(results_path)
+    started = run.get("started")
+    stamp = (
+        datetime.fromisoformat(started)
+        if started
+        else datetime.fromtimestamp(os.path.getmtime(results_path))
+    )
+    name = f"{stamp:%Y%m%dT%H%M%S}_{run.get('run_id', 'unknown')[:8]}"
+    os.makedirs(history_dir, exist_ok=True)
+    path = os.path.join(history_dir, name + _suffix(results_path))
+    shutil.copyfile(results_path, path)
+    logging.debug(f"Archived {results_path} to {path}")
+    return path
+
+
+def save_baseline(results_path: str, name: str, history_dir: str = HISTORY_DIR) -> str:
+    """
+    Saves a result file as a named baseline, replacing any baseline of that name.
+
+    Returns:
+        str: Path of the saved baseline.
+    """
+    directory = os.path.join(history_dir, BASELINES_DIRNAME)
+    os.makedirs(directory, exist_ok=True)
+    for suffix in (".jsonl", ".jsonl.gz"):
+        stale = os.path.join(directory, name + suffix)
+        if os.path.exists(stale):
+            os.remove(stale)
+    path = os.path.join(directory, name + _suffix(results_path))
+    shutil.copyfile(results_path, path)
+    return path
+
+
+def resolve_baseline(name_or_path: str, history_dir: str = HISTORY_DIR) -> str:
+    """
+    Returns the result file of a named baseline, or the argument if it is a file.
+
+    Raises:
+        FileNotFoundError: If neither a file nor a named baseline exists.
+    """
+    if os.path.isfile(name_or_path):
+        return name_or_path
+    for suffix in (".jsonl", ".jsonl.gz"):
+        path = os.path.join(history_dir, BASELINES_DIRNAME, name_or_path + suffix)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No baseline named {name_or_path} in {history_dir}.")
+
+
+def list_runs(history_dir: str = HISTORY_DIR) -> list:
+    """
+    Returns the archived result files, oldest run first.
+    """
+    if not os.path.isdir(history_dir):
+        return []
+    paths = [
+        os.path.join(history_dir, name)
+        for name in os.listdir(history_dir)
+        if name.endswith((".jsonl", ".jsonl.gz"))
+    ]
+    return sorted(paths, key=lambda path: (read_run(path).get("started", ""), path))
+
+
+def comparable_series(results_path: str) -> dict:
+    """
+    Returns one ``Series`` per group plus one per cold-start series.
+    """
+    series = load_series(results_path, split=False)
+    for entry in read_entries(results_path):
+        if entry.get("type") == COLD_START:
+            label = entry["label"]
+            series.setdefault(label, Series(label)).durations.append(entry["seconds"])
+    return series
+
+
+@dataclass
+class Comparison:
+    """
+    One series of a run compared against the same series of a baseline.
+
+    Attributes:
+        label (str): Series label, e.g. ``"API - Requests"``.
+        baseline_median (float): Baseline median in seconds.
+        current_median (float): Current median in seconds.
+        ratio (float): Current median over baseline median.
+        ratio_ci (tuple): Bootstrap CI ``(low, high)`` of the ratio.
+        p_value (float): One-sided Mann-Whitney U p-value for "current is slower".
+        regressed (bool): Whether the series fails the regression gate.
+    """
+
+    label: str
+    baseline_median: float
+    current_median: float
+    ratio: float
+    ratio_ci: tuple
+    p_value: float
+    regressed: bool
+
+
+def compare_runs(
+    baseline_path: str,
+    current_path: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    alpha: float = DEFAULT_ALPHA,
+) -> list:
+    """
+    Compares every series present in both result files.
+
+    Args:
+        baseline_path (str): Baseline result file.
+        current_path (str): Result file of the run under test.
+        threshold (float): Relative median increase tolerated, e.g. 0.1 for 10%.
+        alpha (float): Significance level of the test.
+
+    Returns:
+        list of Comparison: One per shared series, in the current run's order.
+    """
+    baseline = comparable_series(baseline_path)
+    current = comparable_series(current_path)
+    comparisons = []
+    for label, series in current.items():
+        if label not in baseline or not len(series) or not len(baseline[label]):
+            logging.debug(f"No baseline samples for {label}; skipped.")
+            continue
+        before, after = baseline[label].values, series.values
+        ratio, low, high = ratio_ci(after, before)
+        _, p_value = mann_whitney_u(before, after)
+        comparisons.append(
+            Comparison(
+                label=label,
+                baseline_median=float(np.median(before)),
+                current_median=float(np.median(after)),
+                ratio=ratio,
+                ratio_ci=(low, high),
+                p_value=p_value,
+                regressed=p_value < alpha and ratio > 1 + threshold,
+            )
+        )
+    return comparisons
+
+
+def format_comparison(comparison: Comparison) -> str:
+    """
+    Formats a comparison as a summary line.
+    """
+    low, high = comparison.ratio_ci
+    return (
+        f"{comparison.label}: {comparison.baseline_median:.3f}s -> "
+        f"{comparison.current_median:.3f}s ({(comparison.ratio - 1) * 100:+.1f}%, "
+        f"CI {(low - 1) * 100:+.1f}%..{(high - 1) * 100:+.1f}%, "
+        f"p={comparison.p_value:.3g})" + (" REGRESSION" if comparison.regressed else "")
+    )
+
+
+def trend(history_dir: str = HISTORY_DIR) -> dict:
+    """
+    Collects each series' median and bootstrap CI across the archived runs.
+
+    Returns:
+        dict: Series label to a list of ``(started, median, low, high)`` tuples,
+            oldest run first.
+    """
+    points = {}
+    for path in list_runs(history_dir):
+        started = read_run(path).get("started", os.path.basename(path))
+        for label, series in comparable_series(path).items():
+            if not len(series):
+                continue
+            values = series.values
+            low, high = bootstrap_ci(values)
+            points.setdefault(label, []).append(
+                (started, float(np.median(values)), low, high)
+            )
+    return points
+
+
+def plot_trend(points: dict, filename: str = TREND_FILENAME):
+    """
+    Plots each series' median and CI band across runs.
+
+    Args:
+        points (dict): Output of ``trend``.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    runs = sorted({started for series in points.values() for started, *_ in series})
+    positions = {started: i for i, started in enumerate(runs)}
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for label, series in points.items():
+        x = [positions[started] for started, *_ in series]
+        medians = [median for _, median, _, _ in series]
+        ax.plot(x, medians, marker="o", label=label)
+        ax.fill_between(
+            x, [low for *_, low, _ in series], [high for *_, high in series], alpha=0.2
+        )
+    ax.set_xticks(range(len(runs)))
+    ax.set_xticklabels([started[:16] for started in runs], rotation=30, ha="right")
+    ax.set_xlabel("Run")
+    ax.set_ylabel("Median time (seconds)")
+    ax.set_title("Benchmark History")
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the ``compare``, ``trend`` or ``baseline`` subcommand.
+
+    Returns:
+        int: Exit code; 1 if ``compare`` found a regression, 2 if a result
+            file or the baseline is missing or no series could be compared.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="selenium_v_requests_comparison",
+        description="Compare benchmark runs against stored baselines.",
+    )
+    parser.add_argument(
+        "--history", default=HISTORY_DIR, help="Directory of archived runs"
+    )
+    # Also accepted after the subcommand, where the comparison CLI passes it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--history", default=argparse.SUPPRESS, help="Directory of archived runs"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compare = subparsers.add_parser(
+        "compare",
+        parents=[common],
+        help="Compare a run against a baseline; exit 1 on regression",
+    )
+    compare.add_argument("results", help="Result file of the run under test")
+    compare.add_argument(
+        "--baseline", required=True, help="Baseline name or result file"
+    )
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative median increase tolerated per series (default 0.1)",
+    )
+    compare.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help="Significance level of the Mann-Whitney U test (default 0.05)",
+    )
+
+    trend_parser = subparsers.add_parser(
+        "trend", parents=[common], help="Plot every series across archived runs"
+    )
+    trend_parser.add_argument("--output", default=TREND_FILENAME)
+
+    baseline = subparsers.add_parser(
+        "baseline", parents=[common], help="Save a run as a baseline"
+    )
+    baseline.add_argument("results", help="Result file to save")
+    baseline.add_argument("--name", required=True, help="Baseline name")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command in ("baseline", "compare") and not os.path.isfile(args.results):
+        logging.error(f"No result file {args.results}.")
+        return 2
+
+    if args.command == "baseline":
+        path = save_baseline(args.results, args.name, args.history)
+        logging.info(f"Saved baseline {args.name} to {path}")
+        return 0
+
+    if args.command == "trend":
+        points = trend(args.history)
+        if not points:
+            logging.error(f"No archived runs in {args.history}.")
+            return 1
+        plot_trend(points, args.output)
+        logging.info(f"Saved trend of {len(points)} series to {args.output}")
+        return 0
+
+    try:
+        baseline_path = resolve_baseline(args.baseline, args.history)
+    except FileNotFoundError as e:
+        logging.error(e)
+        return 2
+    comparisons = compare_runs(
+        baseline_path,
+        args.results,
+        args.threshold,
+        args.alpha,
+    )
+    for comparison in comparisons:
+        log = logging.error if comparison.regressed else logging.info
+        log(format_comparison(comparison))
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        logging.error(
+            f"{len(regressions)} of {len(comparisons)} series regressed by more "
+            f"than {args.threshold:.0%}."
+        )
+        return 1
+    if not comparisons:
+        # An empty comparison must not pass the gate
+        logging.error(f"No series of {args.results} are in the baseline.")
+        return 2
+    logging.info(f"No regressions in {len(comparisons)} series.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
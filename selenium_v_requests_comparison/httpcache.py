@@ -0,0 +1,423 @@
+"""
+Conditional-Request HTTP Cache
+------------------------------
+A private HTTP cache in front of the requests fetch path, so the benchmark can
+show what caching is worth next to the browser's own cache.
+
+Responses are kept in an in-memory LRU bounded by total bytes (and optionally
+by entry count), with an optional on-disk tier that survives restarts. Each
+fetch ends in one of three outcomes:
+
+    hit: a fresh entry is returned without touching the network.
+    revalidated: a stale entry is revalidated with ``If-None-Match`` /
+        ``If-Modified-Since`` and the server answers ``304 Not Modified``.
+    miss: the full response is downloaded, and stored if cacheable.
+
+Freshness follows ``Cache-Control`` (``max-age``, ``no-cache``, ``no-store``),
+then ``Expires``, then the usual heuristic of 10% of the time since
+``Last-Modified``. Entries are keyed by URL only, so ``Vary: *`` responses are
+never stored.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CACHE_OUTCOMES = ("hit", "revalidated", "miss")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Share of the time since Last-Modified a response is assumed fresh for
+HEURISTIC_FRACTION = 0.1
+# Resource Timing reports a fixed header size instead of the real one, so a
+# revalidated navigation transfers exactly this many bytes
+REVALIDATED_TRANSFER_BYTES = 300
+# Headers describing the transfer rather than the stored body
+_BODY_HEADERS = {"content-length", "content-encoding", "transfer-encoding"}
+
+
+def parse_cache_control(value: str | None) -> dict:
+    """
+    Parses a ``Cache-Control`` header into directives.
+
+    Args:
+        value (str): e.g. ``"public, max-age=60"``.
+
+    Returns:
+        dict: Lowercase directive to its value, or True if it has none.
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CacheEntry:
+    """
+    A stored response.
+
+    Attributes:
+        url (str): Request URL, the cache key.
+        status (int): Response status code.
+        headers (dict): Response headers.
+        body (bytes): Response body.
+        stored_at (float): Wall-clock time the response was stored or last
+            revalidated.
+    """
+
+    url: str
+    status: int
+    headers: dict
+    body: bytes
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def size(self) -> int:
+        """int: Approximate bytes held, body plus headers."""
+        return len(self.body) + sum(
+            len(name) + len(value) for name, value in self.headers.items()
+        )
+
+    def _header(self, name: str) -> str | None:
+        return CaseInsensitiveDict(self.headers).get(name)
+
+    def lifetime(self) -> float:
+        """
+        Returns how many seconds after storing the entry stays fresh.
+        """
+        directives = parse_cache_control(self._header("Cache-Control"))
+        if "no-cache" in directives:
+            return 0.0
+        if "max-age" in directives:
+            try:
+                return max(float(directives["max-age"]), 0.0)
+            except ValueError:
+                return 0.0
+        date = _http_date(self._header("Date")) or self.stored_at
+        expires = _http_date(self._header("Expires"))
+        if self._header("Expires") is not None:
+            return max(expires - date, 0.0) if expires is not None else 0.0
+        last_modified = _http_date(self._header("Last-Modified"))
+        if last_modified is not None:
+            return max(date - last_modified, 0.0) * HEURISTIC_FRACTION
+        return 0.0
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """
+        Returns True if the entry can be served without revalidation.
+        """
+        now = time.time() if now is None else now
+        try:
+            age = float(self._header("Age") or 0)
+        except ValueError:
+            age = 0.0
+        return now - self.stored_at + age < self.lifetime()
+
+    def validators(self) -> dict:
+        """
+        Returns the conditional request headers that revalidate the entry.
+        """
+        headers = {}
+        if self._header("ETag"):
+            headers["If-None-Match"] = self._header("ETag")
+        if self._header("Last-Modified"):
+            headers["If-Modified-Since"] = self._header("Last-Modified")
+        return headers
+
+    def refresh(self, headers, now: float | None = None) -> None:
+        """
+        Updates the entry from a ``304 Not Modified`` response's headers.
+        """
+        merged = CaseInsensitiveDict(self.headers)
+        for name, value in headers.items():
+            if name.lower() not in _BODY_HEADERS:
+                merged[name] = value
+        self.headers = dict(merged)
+        self.stored_at = time.time() if now is None else now
+
+    def to_response(self) -> requests.Response:
+        """
+        Builds a ``requests.Response`` serving the stored body.
+        """
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.url = self.url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+
+def is_storable(response) -> bool:
+    """
+    Returns True if a response may be stored by a private cache.
+    """
+    directives = parse_cache_control(response.headers.get("Cache-Control"))
+    return (
+        response.request is not None
+        and response.request.method == "GET"
+        and response.status_code == 200
+        and "no-store" not in directives
+        and response.headers.get("Vary", "").strip() != "*"
+    )
+
+
+class LRUCache:
+    """
+    An in-memory cache evicting the least recently used entries.
+
+    Args:
+        max_bytes (int): Total ``CacheEntry.size`` allowed.
+        max_entries (int, optional): Number of entries allowed.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.evictions = 0
+        # URL to (entry, size at insertion); entries can change size on refresh
+        self._entries = collections.OrderedDict()
+
+    def get(self, url: str) -> CacheEntry | None:
+        """
+        Returns the entry for a URL, marking it most recently used.
+        """
+        if url not in self._entries:
+            return None
+        self._entries.move_to_end(url)
+        return self._entries[url][0]
+
+    def put(self, entry: CacheEntry) -> list:
+        """
+        Stores an entry, evicting older ones to stay within the bounds.
+
+        Entries larger than ``max_bytes`` are not stored.
+
+        Returns:
+            list of CacheEntry: The evicted entries.
+        """
+        self.remove(entry.url)
+        size = entry.size
+        if size > self.max_bytes:
+            return []
+        self._entries[entry.url] = (entry, size)
+        self.bytes += size
+        evicted = []
+        while self.bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            _, (oldest, oldest_size) = self._entries.popitem(last=False)
+            self.bytes -= oldest_size
+            evicted.append(oldest)
+        self.evictions += len(evicted)
+        return evicted
+
+    def remove(self, url: str) -> None:
+        _, size = self._entries.pop(url, (None, 0))
+        self.bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+
+class DiskCache:
+    """
+    An on-disk cache tier, one file per URL, evicting the least recently read.
+
+    Each file holds a JSON line of metadata followed by the raw body.
+
+    Args:
+        directory (str): Cache directory; created if missing.
+        max_bytes (int): Total file size allowed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+
+    def get(self, url: str) -> CacheEntry | None:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return CacheEntry(url, meta["status"], meta["headers"], body, meta["stored_at"])
+
+    def put(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url)
+        meta = {
+            "url": entry.url,
+            "status": entry.status,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+        }
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n")
+                f.write(entry.body)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.debug(f"Could not write cache entry {path}: {e}")
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+class HTTPCache:
+    """
+    A two-tier private HTTP cache used through ``fetch``.
+
+    Args:
+        max_bytes (int): Memory tier bound in bytes.
+        max_entries (int, optional): Memory tier bound in entries.
+        directory (str, optional): Enables the disk tier in this directory.
+        disk_max_bytes (int): Disk tier bound in bytes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries=None,
+        directory: str | None = None,
+        disk_max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.memory = LRUCache(max_bytes, max_entries)
+        self.disk = DiskCache(directory, disk_max_bytes) if directory else None
+        self.outcomes = collections.Counter()
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """
+        Returns the stored entry for a URL, fresh or not, promoting disk entries.
+        """
+        entry = self.memory.get(url)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(url)
+            if entry is not None:
+                self.memory.put(entry)
+        return entry
+
+    def store(self, entry: CacheEntry) -> None:
+        """
+        Stores an entry in memory and, when enabled, on disk.
+        """
+        self.memory.put(entry)
+        if self.disk is not None:
+            self.disk.put(entry)
+
+    def fetch(self, session, url: str, **kwargs) -> tuple:
+        """
+        GETs a URL through the cache.
+
+        Args:
+            session (requests.Session): Session used on a revalidation or miss.
+            url (str): URL to fetch.
+            **kwargs: Passed to ``session.get``.
+
+        Returns:
+            tuple: ``(response, outcome)`` with the outcome one of
+                ``CACHE_OUTCOMES``. The response body is always read.
+        """
+        entry = self.lookup(url)
+        if entry is not None and entry.is_fresh():
+            self.outcomes["hit"] += 1
+            return entry.to_response(), "hit"
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            headers.update(entry.validators())
+        response = session.get(url, headers=headers, **kwargs)
+        if entry is not None and response.status_code == 304:
+            entry.refresh(response.headers)
+            self.store(entry)
+            self.outcomes["revalidated"] += 1
+            return entry.to_response(), "revalidated"
+        if is_storable(response):
+            # The stored body is already decoded
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in _BODY_HEADERS
+            }
+            self.store(CacheEntry(url, response.status_code, headers, response.content))
+        elif entry is not None:
+            self.memory.remove(url)
+        self.outcomes["miss"] += 1
+        return response, "miss"
+
+
+def browser_cache_outcome(entry) -> str | None:
+    """
+    Classifies a browser navigation by how its HTTP cache served it.
+
+    Uses the Navigation Timing entry: nothing transferred means the cache
+    served the page. The page was revalidated if the entry's response status
+    is ``304``, or if only headers crossed the network: fewer bytes than the
+    body holds, or no more than the fixed header size browsers report. A
+    full response adds its body on top of that, so small bodies are told
+    apart too.
+
+    Args:
+        entry (dict): Navigation Timing entry, e.g. from ``NAVIGATION_TIMING_SCRIPT``.
+
+    Returns:
+        str: One of ``CACHE_OUTCOMES``, or None if the entry lacks sizes.
+    """
+    if not isinstance(entry, dict) or "transferSize" not in entry:
+        return None
+    transfer = entry["transferSize"] or 0
+    if transfer == 0 and (entry.get("decodedBodySize") or 0) > 0:
+        return "hit"
+    if entry.get("responseStatus") == 304:
+        return "revalidated"
+    encoded = entry.get("encodedBodySize") or 0
+    if (
+        encoded > 0
+        and transfer > 0
+        and (transfer < encoded or transfer <= REVALIDATED_TRANSFER_BYTES)
+    ):
+        return "revalidated"
+    return "miss"
@@ -0,0 +1,167 @@
+"""
+Concurrent Load Generation
+--------------------------
+Drives a URL through the requests path at increasing concurrency levels using
+a thread pool and a shared keep-alive session, and reports the achieved
+throughput and latency percentiles at each level.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from selenium_v_requests_comparison.session import KeepAliveSession
+
+DEFAULT_CONCURRENCY_LEVELS = (1, 8, 64, 256)
+DEFAULT_LOAD_DURATION = 10.0
+PERCENTILES = (50, 90, 99, 99.9)
+LOAD_CURVE_FILENAME = "load_curve.png"
+
+
+@dataclass
+class LoadResult:
+    """
+    Outcome of driving a URL at one concurrency level.
+
+    Attributes:
+        concurrency (int): Number of concurrent workers.
+        elapsed (float): Wall time of the level in seconds.
+        latencies (numpy.ndarray): Latency of every completed request, in seconds.
+        errors (int): Requests that raised or returned a non-200 status.
+    """
+
+    concurrency: int
+    elapsed: float
+    latencies: np.ndarray
+    errors: int = 0
+    percentiles: dict = field(init=False)
+
+    def __post_init__(self):
+        if len(self.latencies):
+            values = np.percentile(self.latencies, PERCENTILES)
+        else:
+            values = [float("nan")] * len(PERCENTILES)
+        self.percentiles = dict(zip(PERCENTILES, values))
+
+    @property
+    def throughput(self) -> float:
+        """float: Completed requests per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+
+def _worker(session, url: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.get(url)
+            ok = response.status_code == 200
+        except Exception:
+            logging.debug("Load request failed.", exc_info=True)
+            ok = False
+        end = time.perf_counter()
+        if ok:
+            latencies.append(end - start)
+        else:
+            errors.append(end - start)
+
+
+def run_load_level(
+    url: str, concurrency: int, duration: float = DEFAULT_LOAD_DURATION
+) -> LoadResult:
+    """
+    Sends requests to ``url`` from ``concurrency`` threads for ``duration`` seconds.
+
+    All workers share one keep-alive session with a connection pool as large as
+    the concurrency level, so no worker waits on another for a connection.
+
+    Args:
+        url (str): Target URL.
+        concurrency (int): Number of concurrent workers.
+        duration (float): How long to keep the load running, in seconds.
+
+    Returns:
+        LoadResult: Latencies and error count for the level.
+    """
+    latencies, errors = [], []
+    with KeepAliveSession(pool_size=concurrency) as session:
+        start = time.perf_counter()
+        deadline = start + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(_worker, session, url, deadline, latencies, errors)
+        elapsed = time.perf_counter() - start
+    return LoadResult(concurrency, elapsed, np.array(latencies), len(errors))
+
+
+def run_load_curve(
+    url: str,
+    levels=DEFAULT_CONCURRENCY_LEVELS,
+    duration: float = DEFAULT_LOAD_DURATION,
+) -> list:
+    """
+    Runs ``run_load_level`` for each concurrency level in turn.
+
+    Args:
+        url (str): Target URL.
+        levels (iterable of int): Concurrency levels to test.
+        duration (float): Seconds to spend at each level.
+
+    Returns:
+        list of LoadResult: One result per level, in order.
+    """
+    results = []
+    for concurrency in levels:
+        logging.debug(f"Running load level with concurrency {concurrency}...")
+        result = run_load_level(url, concurrency, duration)
+        logging.info(format_load_result(result))
+        results.append(result)
+    return results
+
+
+def format_load_result(result: LoadResult) -> str:
+    """
+    Formats a load result as a single summary line.
+    """
+    percentiles = " ".join(
+        f"p{p:g}={value * 1000:.1f}ms" for p, value in result.percentiles.items()
+    )
+    return (
+        f"concurrency={result.concurrency} rps={result.throughput:.1f} "
+        f"errors={result.errors} {percentiles}"
+    )
+
+
+def plot_load_curve(results, filename: str = LOAD_CURVE_FILENAME, reference=None):
+    """
+    Plots throughput and p99 latency against concurrency.
+
+    Args:
+        results (list of LoadResult): Results from ``run_load_curve``.
+        filename (str): Where to save the figure.
+        reference (dict, optional): Label to throughput (requests/s) of other
+            methods, drawn as horizontal lines for comparison.
+    """
+    import matplotlib.pyplot as plt
+
+    levels = [result.concurrency for result in results]
+    fig, throughput_ax = plt.subplots()
+    throughput_ax.plot(levels, [r.throughput for r in results], "o-", label="Requests")
+    for label, value in (reference or {}).items():
+        throughput_ax.axhline(value, linestyle="--", color="gray", label=label)
+    throughput_ax.set_xscale("log", base=2)
+    throughput_ax.set_xlabel("Concurrency")
+    throughput_ax.set_ylabel("Throughput (requests/second)")
+    throughput_ax.legend(loc="upper left")
+
+    latency_ax = throughput_ax.twinx()
+    latency_ax.plot(
+        levels, [r.percentiles[99] * 1000 for r in results], "s:", color="red"
+    )
+    latency_ax.set_ylabel("p99 latency (ms)", color="red")
+
+    throughput_ax.set_title("Throughput vs Concurrency")
+    fig.savefig(filename)
+    plt.close(fig)
@@ -0,0 +1,380 @@
+"""
+Live Metrics Export
+-------------------
+Exposes a running benchmark in the Prometheus / OpenMetrics text format, so
+dashboards can follow a long campaign while it runs instead of waiting for
+the final report.
+
+``MetricsRegistry`` is fed every sample as it completes (alongside the result
+store) and keeps, per series:
+
+    benchmark_sample_duration_seconds: latency histogram of measured samples.
+    benchmark_samples_total: samples taken, warmup included.
+    benchmark_responses_total: samples by HTTP status code.
+    benchmark_errors_total: samples whose measurement raised.
+    benchmark_wire_bytes_total: bytes received on the wire.
+    benchmark_resource_*: latest memory, CPU and process gauges of the
+        process tree behind the sample, e.g. chromedriver and Chrome.
+
+``MetricsServer`` serves the registry on ``/metrics`` from a background
+thread. ``ErrorBudget`` aborts a run early once too many of a series'
+samples fail.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PATH = "/metrics"
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Samples a series needs before its failure rate can abort the run
+DEFAULT_ABORT_MIN_SAMPLES = 10
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Per-sample resource metrics exported as gauges, see ``resources``
+_RESOURCE_GAUGES = {
+    "peak_rss_bytes": "Peak resident memory of the sampled process tree.",
+    "mean_rss_bytes": "Mean resident memory of the sampled process tree.",
+    "cpu_seconds": "CPU time used by the sampled process tree.",
+    "process_count": "Processes in the sampled process tree.",
+}
+
+
+class RunAborted(RuntimeError):
+    """
+    Raised when a run is stopped early because its samples keep failing.
+    """
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def is_failure(status) -> bool:
+    """
+    Returns True for a status that means the fetch did not succeed.
+
+    Unknown statuses, e.g. a browser that did not report one, are not failures.
+    """
+    return bool(status) and not 200 <= status < 400
+
+
+class _SeriesMetrics:
+    def __init__(self, method: str, buckets):
+        self.method = method
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.duration_sum = 0.0
+        self.measured = 0
+        self.samples = 0
+        self.statuses = {}
+        self.errors = 0
+        self.failures = 0
+        self.wire_bytes = 0
+        self.resources = {}
+
+
+class MetricsRegistry:
+    """
+    Thread-safe live counters, histograms and gauges of a run.
+
+    Args:
+        buckets (iterable of float): Histogram bucket upper bounds in seconds.
+        run_id (str, optional): Exported as a label of ``benchmark_run_info``.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, run_id: str | None = None):
+        self.buckets = tuple(sorted(buckets))
+        self.run_id = run_id
+        self.started = time.time()
+        self.last_sample = None
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _get(self, label: str, method: str) -> _SeriesMetrics:
+        series = self._series.get(label)
+        if series is None:
+            series = self._series[label] = _SeriesMetrics(method, self.buckets)
+        return series
+
+    def observe(self, label: str, record, warmup: bool = False) -> None:
+        """
+        Records one completed sample.
+
+        Args:
+            label (str): Series label.
+            record: A ``FetchRecord``, or a duration in seconds.
+            warmup (bool): Whether the sample was discarded as warmup; it is
+                counted but kept out of the latency histogram.
+        """
+        duration = getattr(record, "duration", record)
+        metrics = getattr(record, "metrics", {})
+        status = getattr(record, "status", None)
+        with self._lock:
+            series = self._get(label, getattr(record, "method", ""))
+            series.samples += 1
+            if status is not None:
+                series.statuses[status] = series.statuses.get(status, 0) + 1
+                series.failures += is_failure(status)
+            series.wire_bytes += metrics.get("wire_bytes", 0)
+            for name in _RESOURCE_GAUGES:
+                if name in metrics:
+                    series.resources[name] = metrics[name]
+            if not warmup:
+                series.bucket_counts[bisect.bisect_left(self.buckets, duration)] += 1
+                series.duration_sum += duration
+                series.measured += 1
+            self.last_sample = time.time()
+
+    def observe_error(self, label: str, method: str = "") -> None:
+        """
+        Records a sample whose measurement raised instead of returning.
+        """
+        with self._lock:
+            series = self._get(label, method)
+            series.samples += 1
+            series.errors += 1
+            series.failures += 1
+            self.last_sample = time.time()
+
+    def track(self, label: str, measure, method: str = "", on_error=None):
+        """
+        Wraps a measurement callable so exceptions it raises are counted.
+
+        Args:
+            label (str): Series the measurement belongs to.
+            measure (callable): Performs one measurement.
+            method (str): Method label of the series.
+            on_error (callable, optional): Called with ``label`` after an
+                error is counted, e.g. ``ErrorBudget.check``; whatever it
+                raises ends the run.
+
+        Returns:
+            callable: Calls ``measure`` and returns its result, or None if it
+                raised, so the sample is skipped and sampling carries on.
+        """
+
+        def tracked():
+            try:
+                return measure()
+            except Exception as e:
+                self.observe_error(label, method)
+                logging.warning(f"{label}: measurement failed: {e!r}")
+                if on_error is not None:
+                    on_error(label)
+                return None
+
+        return tracked
+
+    def failure_rate(self, label: str) -> tuple:
+        """
+        Returns a series' failures and samples so far.
+
+        Returns:
+            tuple: ``(failures, samples)``; ``(0, 0)`` for an unknown series.
+        """
+        with self._lock:
+            series = self._series.get(label)
+            return (series.failures, series.samples) if series else (0, 0)
+
+    def render(self, openmetrics: bool = True) -> str:
+        """
+        Renders every metric in the exposition text format.
+
+        Args:
+            openmetrics (bool): OpenMetrics 1.0 if True, otherwise the
+                Prometheus 0.0.4 text format.
+
+        Returns:
+            str: The exposition, ending in a newline.
+        """
+
+        def family(name, kind, help_text):
+            # OpenMetrics names the family without the sample suffix; the
+            # Prometheus format has no info type and names counters with it
+            if not openmetrics and kind == "counter":
+                name += "_total"
+            elif not openmetrics and kind == "info":
+                name, kind = name + "_info", "gauge"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        lines = []
+        with self._lock:
+            series = dict(self._series)
+            family("benchmark_run", "info", "The running benchmark.")
+            lines.append(f"benchmark_run_info{{{_labels(run_id=self.run_id or '')}}} 1")
+            family(
+                "benchmark_run_start_timestamp_seconds",
+                "gauge",
+                "When the run started.",
+            )
+            lines.append(f"benchmark_run_start_timestamp_seconds {self.started}")
+            if self.last_sample is not None:
+                family(
+                    "benchmark_last_sample_timestamp_seconds",
+                    "gauge",
+                    "When the latest sample completed.",
+                )
+                lines.append(
+                    f"benchmark_last_sample_timestamp_seconds {self.last_sample}"
+                )
+
+            name = "benchmark_sample_duration_seconds"
+            family(name, "histogram", "Duration of measured samples.")
+            for label, metrics in series.items():
+                labels = _labels(series=label, method=metrics.method)
+                cumulative = 0
+                bounds = [*map(str, self.buckets), "+Inf"]
+                for bound, count in zip(bounds, metrics.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {metrics.duration_sum}")
+                lines.append(f"{name}_count{{{labels}}} {metrics.measured}")
+
+            counters = (
+                ("benchmark_samples", "Samples taken, warmup included.", "samples"),
+                ("benchmark_errors", "Samples whose measurement raised.", "errors"),
+                ("benchmark_wire_bytes", "Bytes received on the wire.", "wire_bytes"),
+            )
+            for name, help_text, attribute in counters:
+                family(name, "counter", help_text)
+                for label, metrics in series.items():
+                    labels = _labels(series=label, method=metrics.method)
+                    lines.append(
+                        f"{name}_total{{{labels}}} {getattr(metrics, attribute)}"
+                    )
+
+            family("benchmark_responses", "counter", "Samples by HTTP status code.")
+            for label, metrics in series.items():
+                for status, count in sorted(metrics.statuses.items()):
+                    labels = _labels(series=label, method=metrics.method, code=status)
+                    lines.append(f"benchmark_responses_total{{{labels}}} {count}")
+
+            for resource, help_text in _RESOURCE_GAUGES.items():
+                name = f"benchmark_resource_{resource}"
+                family(name, "gauge", help_text)
+                for label, metrics in series.items():
+                    if resource in metrics.resources:
+                        labels = _labels(series=label, method=metrics.method)
+                        lines.append(
+                            f"{name}{{{labels}}} {metrics.resources[resource]}"
+                        )
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class ErrorBudget:
+    """
+    Aborts a run once a series' failure rate exceeds a limit.
+
+    Failures are samples that raised or returned an error status.
+
+    Args:
+        registry (MetricsRegistry): Source of the failure counts.
+        max_rate (float): Largest tolerated fraction of failed samples.
+        min_samples (int): Samples a series needs before it is checked.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        max_rate: float,
+        min_samples: int = DEFAULT_ABORT_MIN_SAMPLES,
+    ):
+        self.registry = registry
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+
+    def check(self, label: str) -> None:
+        """
+        Raises:
+            RunAborted: If the series has failed too often.
+        """
+        failures, samples = self.registry.failure_rate(label)
+        if samples >= self.min_samples and failures / samples > self.max_rate:
+            raise RunAborted(
+                f"{label}: {failures} of {samples} samples failed, "
+                f"over the {self.max_rate:.0%} limit."
+            )
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's ``MetricsRegistry`` on ``METRICS_PATH``.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.split("?")[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.registry.render(openmetrics).encode()
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics server: {format % args}")
+
+
+class MetricsServer:
+    """
+    Serves a ``MetricsRegistry`` over HTTP on a background thread.
+
+    Args:
+        registry (MetricsRegistry): Metrics to expose.
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port=0):
+        self._httpd = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.registry = registry
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """str: URL of the metrics endpoint."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{METRICS_PATH}"
+
+    def start(self) -> None:
+        """
+        Starts serving on a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.debug(f"Metrics server listening on {self.url}")
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the listening socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
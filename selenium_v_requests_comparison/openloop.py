@@ -0,0 +1,353 @@
+"""
+Open-Loop Load Generation
+-------------------------
+Sends requests on a fixed arrival schedule instead of waiting for each one to
+finish before starting the next.
+
+A closed loop slows down with the system under test, so queueing delay never
+shows up in its latencies (coordinated omission). Here every request has an
+intended send time taken from a constant or Poisson arrival process at the
+target rate, and its latency is measured from that intended time. A request
+that waits for a free worker is charged for the wait.
+
+Latencies go into ``LatencyHistogram``, an HDR-style histogram with
+log-bucketed magnitudes and linear sub-buckets, so percentiles keep a fixed
+relative precision at any scale with constant memory.
+
+Stepping through increasing rates gives the sustainable rate: the highest
+rate whose p99 stays under a latency SLO.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+ARRIVAL_DISTRIBUTIONS = ("constant", "poisson")
+DEFAULT_RATES = (1, 2, 5, 10, 20, 50, 100)
+DEFAULT_OPEN_LOOP_DURATION = 10.0
+DEFAULT_SLO_P99 = 0.5
+DEFAULT_WORKERS = 64
+# Requests in flight or queued, per worker, before a rate counts as saturated
+DEFAULT_MAX_BACKLOG = 4
+PERCENTILES = (50, 90, 99, 99.9)
+OPEN_LOOP_FILENAME = "open_loop.png"
+# Binary digits of precision in each magnitude: 2**-7 is under 1% error
+DEFAULT_SUB_BUCKET_BITS = 7
+
+
+class LatencyHistogram:
+    """
+    A log-bucketed latency histogram in the style of HdrHistogram.
+
+    Values are recorded in whole microseconds. Values below
+    ``2**sub_bucket_bits`` are exact; above that, each power of two is split
+    into ``2**(sub_bucket_bits - 1)`` equal sub-buckets, bounding the relative
+    error of any reported percentile.
+
+    Args:
+        sub_bucket_bits (int): Binary digits of precision per magnitude.
+    """
+
+    def __init__(self, sub_bucket_bits: int = DEFAULT_SUB_BUCKET_BITS):
+        if sub_bucket_bits < 1:
+            raise ValueError("sub_bucket_bits must be at least 1.")
+        self.sub_bucket_bits = sub_bucket_bits
+        self._half = 1 << (sub_bucket_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value: int) -> int:
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return shift * self._half + (value >> shift)
+
+    def _bucket_range(self, index: int) -> tuple:
+        shift = max(index // self._half - 1, 0)
+        low = (index - shift * self._half) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """
+        Records one latency.
+
+        Args:
+            seconds (float): Latency in seconds; negative values count as 0.
+        """
+        seconds = max(seconds, 0.0)
+        index = self._index(int(seconds * 1e6))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Adds another histogram's counts to this one.
+
+        Raises:
+            ValueError: If the histograms have different precision.
+        """
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different precision.")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns the latency at a percentile, in seconds.
+
+        The highest value of the bucket holding the percentile is returned, so
+        the result never understates the latency by more than one bucket.
+
+        Returns:
+            float: The latency, or NaN if nothing was recorded.
+        """
+        if not self.count:
+            return float("nan")
+        target = max(int(np.ceil(percentile / 100 * self.count)), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._bucket_range(index)[1] / 1e6, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """float: Mean latency in seconds, or NaN if nothing was recorded."""
+        return self.total / self.count if self.count else float("nan")
+
+
+def arrival_times(
+    rate: float, duration: float, distribution: str = "constant", rng=None
+) -> np.ndarray:
+    """
+    Returns intended send times, in seconds from the start of a run.
+
+    Args:
+        rate (float): Target arrivals per second.
+        duration (float): Length of the schedule in seconds.
+        distribution (str): ``constant`` spacing or ``poisson`` arrivals.
+        rng (numpy.random.Generator, optional): Random generator for Poisson arrivals.
+
+    Raises:
+        ValueError: If the rate is not positive or the distribution is unknown.
+    """
+    if rate <= 0:
+        raise ValueError("Rate must be positive.")
+    if distribution == "constant":
+        return np.arange(0, duration, 1 / rate)
+    if distribution == "poisson":
+        rng = rng or np.random.default_rng()
+        # Enough exponential gaps to cover the duration with overwhelming probability
+        count = int(rate * duration + 6 * np.sqrt(rate * duration) + 10)
+        times = np.cumsum(rng.exponential(1 / rate, count))
+        return times[times < duration]
+    raise ValueError(f"Unknown arrival distribution: {distribution}")
+
+
+@dataclass
+class OpenLoopResult:
+    """
+    Outcome of one open-loop run at a target rate.
+
+    Attributes:
+        rate (float): Target arrivals per second.
+        distribution (str): Arrival distribution used.
+        duration (float): Length of the arrival schedule in seconds.
+        elapsed (float): Wall time until the last request finished.
+        histogram (LatencyHistogram): Latencies from intended send time.
+        sent (int): Requests issued.
+        errors (int): Requests that raised or reported failure.
+        saturated (bool): Whether the backlog limit stopped the run early.
+    """
+
+    rate: float
+    distribution: str
+    duration: float
+    elapsed: float = 0.0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    sent: int = 0
+    errors: int = 0
+    saturated: bool = False
+
+    @property
+    def achieved_rate(self) -> float:
+        """float: Successful requests per second of wall time."""
+        return self.histogram.count / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def percentiles(self) -> dict:
+        """dict: Percentile to latency in seconds, for ``PERCENTILES``."""
+        return {p: self.histogram.percentile(p) for p in PERCENTILES}
+
+    def meets_slo(self, slo_p99: float) -> bool:
+        """
+        Returns True if the run finished unsaturated, without errors, under the SLO.
+        """
+        return (
+            not self.saturated
+            and not self.errors
+            and self.histogram.count > 0
+            and self.histogram.percentile(99) <= slo_p99
+        )
+
+
+def run_open_loop(
+    fetch,
+    rate: float,
+    duration: float = DEFAULT_OPEN_LOOP_DURATION,
+    distribution: str = "constant",
+    workers: int = DEFAULT_WORKERS,
+    max_backlog: int | None = None,
+    rng=None,
+) -> OpenLoopResult:
+    """
+    Issues ``fetch`` calls on an arrival schedule and records their latencies.
+
+    A dispatcher sleeps until each intended send time and hands the call to a
+    worker pool; latency runs from the intended time to completion. If more
+    than ``max_backlog`` calls are outstanding the rate is unsustainable, and
+    the run stops issuing and is marked saturated.
+
+    Args:
+        fetch (callable): Performs one request; returns a truthy value on success.
+        rate (float): Target arrivals per second.
+        duration (float): Length of the arrival schedule in seconds.
+        distribution (str): One of ``ARRIVAL_DISTRIBUTIONS``.
+        workers (int): Calls that may run at once.
+        max_backlog (int, optional): Outstanding calls allowed; defaults to
+            ``DEFAULT_MAX_BACKLOG`` per worker.
+        rng (numpy.random.Generator, optional): Random generator for Poisson arrivals.
+
+    Returns:
+        OpenLoopResult: The latencies and counts of the run.
+    """
+    schedule = arrival_times(rate, duration, distribution, rng)
+    max_backlog = max_backlog or DEFAULT_MAX_BACKLOG * workers
+    result = OpenLoopResult(rate, distribution, duration)
+    lock = threading.Lock()
+    outstanding = [0]
+
+    def call(intended: float) -> None:
+        try:
+            ok = fetch()
+        except Exception:
+            logging.debug("Open-loop request failed.", exc_info=True)
+            ok = False
+        latency = time.perf_counter() - intended
+        with lock:
+            outstanding[0] -= 1
+            if ok:
+                result.histogram.record(latency)
+            else:
+                result.errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for offset in schedule:
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                if outstanding[0] >= max_backlog:
+                    result.saturated = True
+                    break
+                outstanding[0] += 1
+            executor.submit(call, intended)
+            result.sent += 1
+    result.elapsed = time.perf_counter() - start
+    if result.saturated:
+        logging.debug(f"Open loop saturated at {rate:g}/s after {result.sent} sends.")
+    return result
+
+
+def find_sustainable_rate(
+    fetch,
+    rates=DEFAULT_RATES,
+    slo_p99: float = DEFAULT_SLO_P99,
+    duration: float = DEFAULT_OPEN_LOOP_DURATION,
+    distribution: str = "constant",
+    workers: int = DEFAULT_WORKERS,
+    rng=None,
+) -> tuple:
+    """
+    Runs increasing rates until one misses the p99 SLO.
+
+    Args:
+        fetch (callable): Performs one request; returns a truthy value on success.
+        rates (iterable of float): Target rates to try; tried in ascending order.
+        slo_p99 (float): p99 latency objective in seconds.
+        duration (float): Seconds per rate.
+        distribution (str): One of ``ARRIVAL_DISTRIBUTIONS``.
+        workers (int): Calls that may run at once.
+        rng (numpy.random.Generator, optional): Random generator for Poisson arrivals.
+
+    Returns:
+        tuple: ``(sustainable_rate, results)``; the rate is 0 if even the
+            lowest rate missed the SLO.
+    """
+    sustainable, results = 0.0, []
+    for rate in sorted(rates):
+        result = run_open_loop(fetch, rate, duration, distribution, workers, rng=rng)
+        logging.info(format_open_loop_result(result))
+        results.append(result)
+        if not result.meets_slo(slo_p99):
+            break
+        sustainable = rate
+    return sustainable, results
+
+
+def format_open_loop_result(result: OpenLoopResult) -> str:
+    """
+    Formats an open-loop result as a single summary line.
+    """
+    percentiles = " ".join(
+        f"p{p:g}={value * 1000:.1f}ms" for p, value in result.percentiles.items()
+    )
+    return (
+        f"rate={result.rate:g}/s ({result.distribution}) "
+        f"achieved={result.achieved_rate:.1f}/s errors={result.errors}"
+        f"{' saturated' if result.saturated else ''} {percentiles}"
+    )
+
+
+def plot_open_loop(
+    results_by_method: dict, slo_p99: float, filename: str = OPEN_LOOP_FILENAME
+):
+    """
+    Plots p99 latency against target rate for each method, with the SLO line.
+
+    Args:
+        results_by_method (dict): Method label to its list of ``OpenLoopResult``.
+        slo_p99 (float): p99 latency objective in seconds.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    for label, results in results_by_method.items():
+        ax.plot(
+            [result.rate for result in results],
+            [result.histogram.percentile(99) * 1000 for result in results],
+            "o-",
+            label=label,
+        )
+    ax.axhline(slo_p99 * 1000, linestyle="--", color="gray", label="p99 SLO")
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Target rate (requests/second)")
+    ax.set_ylabel("p99 latency from intended send (ms)")
+    ax.set_title("Open-Loop Latency vs Rate")
+    ax.legend()
+    fig.savefig(filename)
+    plt.close(fig)
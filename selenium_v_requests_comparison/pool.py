@@ -0,0 +1,152 @@
+"""
+WebDriver Session Pool
+----------------------
+Keeps a fixed number of warm Chrome sessions alive across experiment
+iterations so Selenium measurements reflect navigation cost rather than
+browser start-up. Each session is reset (cookies, storage, extra tabs)
+before it is handed out again.
+"""
+
+import logging
+import queue
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# JavaScript run before a session is returned to the pool. Storage access can
+# throw on opaque origins (about:blank, data: URLs), so failures are ignored.
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+BLANK_PAGE_URL = "about:blank"
+# Per-origin storage cleared through CDP; the HTTP cache is kept warm
+CLEARED_STORAGE_TYPES = (
+    "local_storage,indexeddb,websql,file_systems,cache_storage,service_workers"
+)
+
+
+def _origin(url: str) -> str | None:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class WebDriverPool:
+    """
+    A fixed-size pool of warm WebDriver sessions.
+
+    Sessions are launched when the pool is started and the launch durations are
+    recorded in ``cold_start_times`` so they can be reported separately from the
+    warm navigation timings.
+
+    Args:
+        size (int): Number of sessions to keep alive.
+        driver_factory (callable): Called with a profile directory path and
+            returns a new WebDriver instance.
+    """
+
+    def __init__(self, size: int, driver_factory):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.driver_factory = driver_factory
+        self.cold_start_times = []
+        self._idle = queue.Queue()
+        self._sessions = []
+
+    def start(self) -> None:
+        """
+        Launches every session in the pool, recording each cold-start duration.
+
+        If a launch fails, the sessions already started are quit before the
+        error is raised.
+        """
+        while len(self._sessions) < self.size:
+            profile_dir = tempfile.TemporaryDirectory()
+            start_time = time.perf_counter()
+            try:
+                driver = self.driver_factory(profile_dir.name)
+            except BaseException:
+                profile_dir.cleanup()
+                self.close()
+                raise
+            end_time = time.perf_counter()
+            self.cold_start_times.append(end_time - start_time)
+            self._sessions.append((driver, profile_dir))
+            self._idle.put(driver)
+            logging.debug(
+                f"Pool session {len(self._sessions)}/{self.size} started in "
+                f"{end_time - start_time:.2f}s."
+            )
+
+    @contextmanager
+    def session(self):
+        """
+        Borrows a warm session, resetting it when it is given back.
+
+        Yields:
+            WebDriver: An idle driver from the pool.
+        """
+        if not self._sessions:
+            self.start()
+        driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            try:
+                self.reset(driver)
+            except Exception:
+                logging.exception("Failed to reset pooled session.")
+            self._idle.put(driver)
+
+    @staticmethod
+    def reset(driver) -> None:
+        """
+        Returns a driver to a clean state: one blank tab, no cookies or storage.
+
+        Cookies are cleared for every site. Storage is cleared for the origin
+        of each open tab, which is the page a sample loaded; storage written
+        by frames of other origins is not tracked and survives.
+
+        Args:
+            driver (WebDriver): The driver to reset.
+        """
+        handles = driver.window_handles
+        origins = set()
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            origins.add(_origin(driver.current_url))
+            driver.close()
+        driver.switch_to.window(handles[0])
+        origins.add(_origin(driver.current_url))
+        # Session storage belongs to the tab and has no CDP equivalent
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        for origin in sorted(origins - {None}):
+            driver.execute_cdp_cmd(
+                "Storage.clearDataForOrigin",
+                {"origin": origin, "storageTypes": CLEARED_STORAGE_TYPES},
+            )
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get(BLANK_PAGE_URL)
+
+    def close(self) -> None:
+        """
+        Quits every session and removes its temporary profile directory.
+        """
+        while self._sessions:
+            driver, profile_dir = self._sessions.pop()
+            try:
+                driver.quit()
+            finally:
+                profile_dir.cleanup()
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
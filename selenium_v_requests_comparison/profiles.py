@@ -0,0 +1,259 @@
+"""
+Selenium Load Profiles
+----------------------
+Configures how much of a page Chrome actually loads: the WebDriver page-load
+strategy (``normal``, ``eager`` or ``none``) and which resources are blocked
+through the DevTools ``Network.setBlockedURLs`` command.
+
+``Network.setBlockedURLs`` matches URL patterns, not resource types, so each
+resource type is blocked through the file extensions it is served with.
+
+Running a matrix of profiles against the same page reports, for each one, the
+latency and transferred bytes saved compared with the ``baseline`` profile.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+BASELINE_PROFILE = "baseline"
+PROFILE_MATRIX_FILENAME = "load_profiles.png"
+
+# URL patterns that block each resource type
+RESOURCE_TYPE_PATTERNS = {
+    "Image": [
+        "*.png",
+        "*.jpg",
+        "*.jpeg",
+        "*.gif",
+        "*.webp",
+        "*.svg",
+        "*.ico",
+        "*.avif",
+    ],
+    "Font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "Stylesheet": ["*.css"],
+    "Media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a"],
+    "Script": ["*.js"],
+}
+
+
+def blocked_url_patterns(resource_types=(), urls=()) -> list:
+    """
+    Returns the ``Network.setBlockedURLs`` patterns for resource types and URLs.
+
+    Args:
+        resource_types (iterable of str): Keys of ``RESOURCE_TYPE_PATTERNS``.
+        urls (iterable of str): Extra URL patterns, e.g. ``"*google-analytics*"``.
+
+    Returns:
+        list of str: Patterns with duplicates removed, in order.
+
+    Raises:
+        ValueError: If a resource type is unknown.
+    """
+    patterns = []
+    for resource_type in resource_types:
+        if resource_type not in RESOURCE_TYPE_PATTERNS:
+            raise ValueError(f"Unknown resource type: {resource_type}")
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    patterns.extend(urls)
+    return list(dict.fromkeys(patterns))
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """
+    A page-load strategy combined with a set of blocked resources.
+
+    Attributes:
+        name (str): Profile name used in logs and plots.
+        page_load_strategy (str): One of ``PAGE_LOAD_STRATEGIES``.
+        blocked_types (tuple of str): Resource types to block.
+        blocked_urls (tuple of str): Extra URL patterns to block.
+    """
+
+    name: str
+    page_load_strategy: str = "normal"
+    blocked_types: tuple = ()
+    blocked_urls: tuple = ()
+
+    def __post_init__(self):
+        if self.page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"Unknown page load strategy: {self.page_load_strategy}")
+        blocked_url_patterns(self.blocked_types)
+
+    @property
+    def patterns(self) -> list:
+        """list of str: URL patterns passed to ``Network.setBlockedURLs``."""
+        return blocked_url_patterns(self.blocked_types, self.blocked_urls)
+
+
+_STATIC_TYPES = ("Image", "Font", "Media")
+
+LOAD_PROFILES = {
+    profile.name: profile
+    for profile in (
+        LoadProfile(BASELINE_PROFILE),
+        LoadProfile("eager", "eager"),
+        LoadProfile("none", "none"),
+        LoadProfile("block-static", blocked_types=_STATIC_TYPES),
+        LoadProfile("block-static-css", blocked_types=_STATIC_TYPES + ("Stylesheet",)),
+        LoadProfile("eager-block-static", "eager", _STATIC_TYPES + ("Stylesheet",)),
+    )
+}
+
+
+def apply_blocking(driver, patterns) -> None:
+    """
+    Blocks requests matching URL patterns for the rest of the driver's life.
+
+    Args:
+        driver (WebDriver): A started Chrome driver.
+        patterns (list of str): Patterns from ``blocked_url_patterns``.
+    """
+    if not patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    logging.debug(f"Blocking {len(patterns)} URL patterns.")
+
+
+@dataclass
+class ProfileResult:
+    """
+    Samples collected for one load profile.
+
+    Attributes:
+        profile (LoadProfile): The profile measured.
+        records (list of FetchRecord): Samples taken with the profile.
+    """
+
+    profile: LoadProfile
+    records: list = field(default_factory=list)
+
+    @property
+    def median_latency(self) -> float:
+        """float: Median sample duration in seconds."""
+        return float(np.median([record.duration for record in self.records]))
+
+    @property
+    def mean_bytes(self) -> float:
+        """float: Mean bytes on the wire per sample; NaN if never reported."""
+        values = [
+            record.metrics["wire_bytes"]
+            for record in self.records
+            if "wire_bytes" in record.metrics
+        ]
+        return float(np.mean(values)) if values else float("nan")
+
+
+def run_profile_matrix(
+    url: str, profiles, samples: int, driver_factory, measure
+) -> list:
+    """
+    Measures a page with each load profile, using one warm browser per profile.
+
+    Args:
+        url (str): Page to load.
+        profiles (iterable of LoadProfile): Profiles to measure.
+        samples (int): Samples per profile.
+        driver_factory (callable): Called with a profile directory and the
+            ``page_load_strategy`` and ``blocked_urls`` keyword arguments.
+        measure (callable): Called with ``url`` and ``pool=`` to take one
+            sample, e.g. ``measure_selenium``.
+
+    Returns:
+        list of ProfileResult: One result per profile, in order.
+    """
+    from selenium_v_requests_comparison.pool import WebDriverPool
+
+    results = []
+    for profile in profiles:
+        logging.debug(f"Measuring load profile {profile.name}...")
+
+        def factory(profile_dir, profile=profile):
+            return driver_factory(
+                profile_dir,
+                page_load_strategy=profile.page_load_strategy,
+                blocked_urls=profile.patterns,
+            )
+
+        result = ProfileResult(profile)
+        with WebDriverPool(1, factory) as pool:
+            for _ in range(samples):
+                result.records.append(measure(url, pool=pool))
+        results.append(result)
+    return results
+
+
+def compare_to_baseline(results) -> list:
+    """
+    Computes the latency and bytes each profile saves over the baseline.
+
+    Args:
+        results (list of ProfileResult): Results including the baseline profile.
+
+    Returns:
+        list of dict: Per profile ``name``, ``median_latency``, ``mean_bytes``,
+            ``latency_saved`` and ``bytes_saved``; savings are NaN without a baseline.
+    """
+    baseline = next(
+        (result for result in results if result.profile.name == BASELINE_PROFILE), None
+    )
+    rows = []
+    for result in results:
+        latency, size = result.median_latency, result.mean_bytes
+        rows.append(
+            {
+                "name": result.profile.name,
+                "median_latency": latency,
+                "mean_bytes": size,
+                "latency_saved": (
+                    baseline.median_latency - latency if baseline else float("nan")
+                ),
+                "bytes_saved": baseline.mean_bytes - size if baseline else float("nan"),
+            }
+        )
+    return rows
+
+
+def format_profile_row(row: dict) -> str:
+    """
+    Formats one row of ``compare_to_baseline`` as a summary line.
+    """
+    return (
+        f"{row['name']}: median={row['median_latency']:.3f}s "
+        f"({row['latency_saved'] * 1000:+.0f}ms saved) "
+        f"bytes={row['mean_bytes'] / 1024:.1f}KiB "
+        f"({row['bytes_saved'] / 1024:+.1f}KiB saved)"
+    )
+
+
+def plot_profile_matrix(rows, filename: str = PROFILE_MATRIX_FILENAME):
+    """
+    Plots median latency and transferred KiB per load profile as bar charts.
+
+    Args:
+        rows (list of dict): Output of ``compare_to_baseline``.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    names = [row["name"] for row in rows]
+    positions = range(len(rows))
+    fig, (latency_ax, bytes_ax) = plt.subplots(1, 2, figsize=(12, 5))
+    latency_ax.bar(positions, [row["median_latency"] for row in rows])
+    latency_ax.set_ylabel("Median latency (seconds)")
+    latency_ax.set_title("Latency")
+    bytes_ax.bar(positions, [row["mean_bytes"] / 1024 for row in rows])
+    bytes_ax.set_ylabel("Transferred (KiB)")
+    bytes_ax.set_title("Bytes")
+    for ax in (latency_ax, bytes_ax):
+        ax.set_xticks(list(positions))
+        ax.set_xticklabels(names, rotation=30, ha="right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
@@ -0,0 +1,328 @@
+"""
+Profiling Hooks
+---------------
+Finds hot spots in the fetch stack without outside tooling.
+
+On the Python side, each phase of a sample (e.g. the requests ``fetch`` and
+``body``, or the Selenium ``navigate`` and ``extract``) runs under its own
+``cProfile.Profile``, accumulated over every sample of a method. At the end
+of the run each phase is written as ``<method>.<phase>.pstats`` and all
+phases of a method are merged into ``<method>.pstats``. The files load with
+``pstats``, snakeviz or similar, and ``merge_stats`` combines files from
+several runs or machines.
+
+On the browser side, ``--trace-every`` samples also record a Chrome trace
+through the DevTools ``Tracing`` domain, written as
+``traces/<method>-<n>.json`` for chrome://tracing or Perfetto.
+
+Hooks are no-ops unless a ``Profiler`` is active on the current thread, so
+samples taken by load or open-loop worker threads are never profiled.
+Profiling and tracing slow samples down; compare timings from profiled runs
+with each other only.
+"""
+
+import collections
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+
+DEFAULT_PROFILE_DIR = "profiling"
+TRACES_DIRNAME = "traces"
+# Trace a browser sample every this many iterations per method; 0 disables
+DEFAULT_TRACE_EVERY = 1
+TRACE_CATEGORIES = (
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "v8.execute",
+    "blink.user_timing",
+    "loading",
+    "netlog",
+)
+# Functions logged per method at the end of a profiled run
+TOP_FUNCTIONS = 10
+
+_local = threading.local()
+
+
+class ChromeTracer:
+    """
+    Records a Chrome trace over a DevTools connection.
+
+    Args:
+        connection (CDPConnection): Connection to the browser target.
+        close (bool): Close the connection once the trace is collected.
+    """
+
+    def __init__(self, connection, close: bool = False):
+        self.connection = connection
+        self.close = close
+
+    def start(self, categories=TRACE_CATEGORIES) -> None:
+        self.connection.send(
+            "Tracing.start",
+            {
+                "transferMode": "ReportEvents",
+                "traceConfig": {"includedCategories": list(categories)},
+            },
+        )
+
+    def stop(self, timeout: float = 30.0) -> list:
+        """
+        Ends the trace and collects its events.
+
+        Returns:
+            list of dict: Trace events in the Trace Event Format.
+
+        Raises:
+            TimeoutError: If Chrome does not finish the trace in time.
+        """
+        self.connection.send("Tracing.end")
+        events = []
+        try:
+            while True:
+                message = self.connection.wait_for_event(
+                    lambda m: m["method"].startswith("Tracing."), timeout
+                )
+                if message["method"] == "Tracing.tracingComplete":
+                    return events
+                events.extend(message.get("params", {}).get("value", []))
+        finally:
+            if self.close:
+                self.connection.close()
+
+
+def driver_debugging_port(driver) -> int | None:
+    """
+    Returns the remote debugging port of a Selenium Chrome driver, if known.
+    """
+    options = (driver.capabilities or {}).get("goog:chromeOptions", {})
+    address = options.get("debuggerAddress")
+    try:
+        return int(address.rsplit(":", 1)[1]) if address else None
+    except (IndexError, ValueError):
+        return None
+
+
+def connect_browser(port: int):
+    """
+    Opens a new DevTools connection to the browser target on a port.
+    """
+    from selenium_v_requests_comparison.cdp import (
+        CDPConnection,
+        browser_websocket_url,
+    )
+
+    return CDPConnection(browser_websocket_url(port))
+
+
+class Profiler:
+    """
+    Collects cProfile statistics per method and phase, and Chrome traces.
+
+    Args:
+        directory (str): Where statistics and traces are written.
+        trace_every (int): Trace every n-th browser sample of each method;
+            0 disables tracing.
+        trace_categories (iterable of str): Chrome trace categories to record.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_PROFILE_DIR,
+        trace_every: int = DEFAULT_TRACE_EVERY,
+        trace_categories=TRACE_CATEGORIES,
+    ):
+        self.directory = directory
+        self.trace_every = trace_every
+        self.trace_categories = tuple(trace_categories)
+        # (method, phase) to its profile, in first-use order
+        self.profiles = {}
+        self.traces = []
+        self._iterations = collections.Counter()
+        self._active = False
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def section(self, method: str, phase: str):
+        """
+        Profiles a block as one phase of a method.
+
+        cProfile allows one active profiler per thread, so a section opened
+        inside another is not profiled separately; it counts toward the outer one.
+        """
+        if self._active:
+            yield
+            return
+        key = (method, phase)
+        profile = self.profiles.get(key)
+        if profile is None:
+            profile = self.profiles[key] = cProfile.Profile()
+        self._active = True
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active = False
+
+    @contextmanager
+    def trace(self, method: str, connect):
+        """
+        Records a Chrome trace of a block, if this iteration is due one.
+
+        Args:
+            method (str): Method the sample belongs to.
+            connect (callable): Returns a ``(connection, close)`` pair for the
+                browser target; only called when a trace is due.
+
+        Yields:
+            ChromeTracer: The running tracer, or None if not tracing.
+        """
+        self._iterations[method] += 1
+        iteration = self._iterations[method]
+        tracer = None
+        if self.trace_every and (iteration - 1) % self.trace_every == 0:
+            try:
+                tracer = ChromeTracer(*connect())
+                tracer.start(self.trace_categories)
+            except Exception as e:
+                logging.warning(f"Could not start a Chrome trace for {method}: {e}")
+                if tracer is not None and tracer.close:
+                    tracer.connection.close()
+                tracer = None
+        try:
+            yield tracer
+        finally:
+            if tracer is not None:
+                self._save_trace(method, iteration, tracer)
+
+    def _save_trace(self, method: str, iteration: int, tracer: ChromeTracer) -> None:
+        try:
+            events = tracer.stop()
+        except Exception as e:
+            logging.warning(f"Could not collect the Chrome trace for {method}: {e}")
+            return
+        directory = os.path.join(self.directory, TRACES_DIRNAME)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{method}-{iteration:04d}.json")
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events}, f)
+        self.traces.append(path)
+        logging.debug(f"Saved {len(events)} trace events to {path}")
+
+    def write_stats(self) -> list:
+        """
+        Writes one ``.pstats`` file per method and phase, and one per method.
+
+        Returns:
+            list of str: Paths written.
+        """
+        paths = []
+        by_method = collections.defaultdict(list)
+        for (method, phase), profile in self.profiles.items():
+            path = os.path.join(self.directory, f"{method}.{phase}.pstats")
+            profile.dump_stats(path)
+            by_method[method].append(path)
+            paths.append(path)
+        for method, phase_paths in by_method.items():
+            paths.append(
+                merge_stats(
+                    phase_paths, os.path.join(self.directory, f"{method}.pstats")
+                )
+            )
+        return paths
+
+
+def merge_stats(paths, output: str) -> str:
+    """
+    Merges ``.pstats`` files, e.g. from several runs or phases, into one.
+
+    Args:
+        paths (iterable of str): Files to merge.
+        output (str): File to write.
+
+    Returns:
+        str: The output path.
+    """
+    stats = pstats.Stats(*paths)
+    stats.dump_stats(output)
+    return output
+
+
+def top_functions(path: str, count: int = TOP_FUNCTIONS) -> list:
+    """
+    Returns the functions with the most time spent in their own code.
+
+    Args:
+        path (str): A ``.pstats`` file.
+        count (int): Functions to return.
+
+    Returns:
+        list of str: Lines such as ``"12.3ms recv (socket.py:123)"``.
+    """
+    entries = pstats.Stats(path).stats
+    ranked = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        f"{total * 1000:.1f}ms {function} ({os.path.basename(filename)}:{line})"
+        for (filename, line, function), (_, _, total, _, _) in ranked[:count]
+    ]
+
+
+@contextmanager
+def profiling(profiler: Profiler | None):
+    """
+    Activates a ``Profiler`` for samples taken on the current thread.
+
+    Args:
+        profiler (Profiler, optional): The profiler; None leaves hooks inactive.
+    """
+    previous = getattr(_local, "profiler", None)
+    _local.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _local.profiler = previous
+
+
+def current_profiler() -> Profiler | None:
+    """
+    Returns the active ``Profiler`` for this thread, if any.
+    """
+    return getattr(_local, "profiler", None)
+
+
+@contextmanager
+def profile_section(method: str, phase: str):
+    """
+    Profiles a block under the active profiler; does nothing without one.
+    """
+    profiler = current_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(method, phase):
+        yield
+
+
+@contextmanager
+def trace_section(method: str, port):
+    """
+    Records a Chrome trace of a block under the active profiler, if due.
+
+    Args:
+        method (str): Method the sample belongs to.
+        port (callable): Returns the browser's remote debugging port.
+
+    Yields:
+        ChromeTracer: The running tracer, or None if not tracing.
+    """
+    profiler = current_profiler()
+    if profiler is None:
+        yield None
+        return
+    with profiler.trace(method, lambda: (connect_browser(port()), True)) as tracer:
+        yield tracer
@@ -0,0 +1,142 @@
+"""
+Page Readiness Strategies
+-------------------------
+Decides when a page loaded through Selenium is ready to be scraped, replacing
+a fixed sleep with an explicit condition and timeout.
+
+Strategies:
+    ready-state: ``document.readyState`` is ``complete``.
+    selector: an element matching a CSS selector is present.
+    network-idle: no network requests have been in flight for a quiet period,
+        tracked through Chrome DevTools Protocol ``Network`` events in the
+        performance log (requires ``goog:loggingPrefs`` performance logging).
+    js: a custom JavaScript predicate returns a truthy value.
+"""
+
+import json
+import logging
+import time
+
+STRATEGIES = ("ready-state", "selector", "network-idle", "js")
+DEFAULT_STRATEGY = "ready-state"
+DEFAULT_TIMEOUT = 10.0
+# Selector for the elements scraped by measure_selenium
+DEFAULT_SELECTOR = ".job-card-list__title"
+# Quiet period without network activity before the page counts as idle
+DEFAULT_IDLE_TIME = 0.5
+POLL_INTERVAL = 0.05
+
+REQUEST_STARTED_EVENTS = ("Network.requestWillBeSent",)
+REQUEST_FINISHED_EVENTS = ("Network.loadingFinished", "Network.loadingFailed")
+
+
+class Readiness:
+    """
+    A readiness strategy with its timeout.
+
+    Args:
+        strategy (str): One of ``STRATEGIES``.
+        timeout (float): Seconds to wait before giving up.
+        selector (str): CSS selector for the ``selector`` strategy.
+        script (str): JavaScript predicate for the ``js`` strategy, e.g.
+            ``"return window.appReady === true"``.
+        idle_time (float): Quiet period in seconds for the ``network-idle`` strategy.
+    """
+
+    def __init__(
+        self,
+        strategy: str = DEFAULT_STRATEGY,
+        timeout: float = DEFAULT_TIMEOUT,
+        selector: str = DEFAULT_SELECTOR,
+        script: str | None = None,
+        idle_time: float = DEFAULT_IDLE_TIME,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy: {strategy}")
+        if strategy == "js" and not script:
+            raise ValueError("The js readiness strategy requires a script.")
+        self.strategy = strategy
+        self.timeout = timeout
+        self.selector = selector
+        self.script = script
+        self.idle_time = idle_time
+
+    @property
+    def needs_performance_log(self) -> bool:
+        """bool: Whether the driver must be started with performance logging."""
+        return self.strategy == "network-idle"
+
+    def prepare(self, driver) -> None:
+        """
+        Called before navigation; discards network events from earlier pages.
+
+        Args:
+            driver (WebDriver): The driver about to navigate.
+        """
+        if self.needs_performance_log:
+            driver.get_log("performance")
+
+    def wait(self, driver) -> bool:
+        """
+        Blocks until the page is ready or the timeout expires.
+
+        Args:
+            driver (WebDriver): The driver that has just navigated.
+
+        Returns:
+            bool: True if the page became ready, False on timeout.
+        """
+        if self.strategy == "network-idle":
+            ready = self._wait_for_network_idle(driver)
+        else:
+            # Selenium is imported on first use to keep module import cheap
+            from selenium.common.exceptions import TimeoutException
+            from selenium.webdriver.support.ui import WebDriverWait
+
+            try:
+                WebDriverWait(driver, self.timeout, POLL_INTERVAL).until(
+                    self._condition()
+                )
+                ready = True
+            except TimeoutException:
+                ready = False
+        if not ready:
+            logging.warning(
+                f"Page not ready after {self.timeout}s ({self.strategy} strategy)."
+            )
+        return ready
+
+    def _condition(self):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
+        if self.strategy == "ready-state":
+            return (
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        if self.strategy == "selector":
+            return EC.presence_of_element_located((By.CSS_SELECTOR, self.selector))
+        return lambda d: bool(d.execute_script(self.script))
+
+    def _wait_for_network_idle(self, driver) -> bool:
+        deadline = time.perf_counter() + self.timeout
+        in_flight = set()
+        last_activity = time.perf_counter()
+        while True:
+            for entry in driver.get_log("performance"):
+                message = json.loads(entry["message"])["message"]
+                request_id = message.get("params", {}).get("requestId")
+                if message["method"] in REQUEST_STARTED_EVENTS:
+                    in_flight.add(request_id)
+                elif message["method"] in REQUEST_FINISHED_EVENTS:
+                    in_flight.discard(request_id)
+                else:
+                    continue
+                last_activity = time.perf_counter()
+            now = time.perf_counter()
+            if not in_flight and now - last_activity >= self.idle_time:
+                return True
+            if now >= deadline:
+                logging.debug(f"{len(in_flight)} requests still in flight.")
+                return False
+            time.sleep(POLL_INTERVAL)
@@ -0,0 +1,324 @@
+"""
+HTML Report
+-----------
+Renders a stored run as a single self-contained HTML file: a box plot, ECDF,
+latency histogram, per-phase stacked bars and a summary table, with every
+chart embedded as inline SVG.
+
+Each series is reduced to fixed-size summaries first (quantiles, Tukey
+whiskers, an ECDF sampled at ``ECDF_POINTS`` probabilities and a
+``HISTOGRAM_BINS``-bin histogram) with vectorized NumPy calls over its
+array-backed durations. Charts are drawn from those summaries only, on
+``Figure`` objects rendered by the non-interactive Agg backend, so rendering
+time does not grow with the number of samples and no pyplot state is shared.
+"""
+
+import html
+import io
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+
+REPORT_FILENAME = "report.html"
+# Quantiles reported in the summary table, as percentiles
+QUANTILES = (50, 90, 99, 99.9)
+ECDF_POINTS = 200
+HISTOGRAM_BINS = 50
+# Tukey whisker reach, in interquartile ranges
+WHISKER_IQR = 1.5
+
+
+@dataclass
+class SeriesStats:
+    """
+    Fixed-size summary of one series, enough to draw every chart.
+
+    Attributes:
+        label (str): Series label.
+        n (int): Number of samples.
+        mean (float): Mean duration in seconds.
+        minimum (float): Fastest sample in seconds.
+        maximum (float): Slowest sample in seconds.
+        q1 (float): First quartile in seconds.
+        median (float): Median in seconds.
+        q3 (float): Third quartile in seconds.
+        whisker_low (float): Lowest sample within the lower Tukey fence.
+        whisker_high (float): Highest sample within the upper Tukey fence.
+        quantiles (dict): Percentile to duration for ``QUANTILES``.
+        ecdf (tuple): ``(durations, probabilities)`` at ``ECDF_POINTS`` levels.
+        histogram (tuple): ``(counts, edges)`` over log-spaced bins.
+        phases (dict): Mean duration of each phase in seconds.
+        stop_reason (str): Why sampling of the group stopped, if recorded.
+    """
+
+    label: str
+    n: int
+    mean: float
+    minimum: float
+    maximum: float
+    q1: float
+    median: float
+    q3: float
+    whisker_low: float
+    whisker_high: float
+    quantiles: dict = field(default_factory=dict)
+    ecdf: tuple = ((), ())
+    histogram: tuple = ((), ())
+    phases: dict = field(default_factory=dict)
+    stop_reason: str = ""
+
+
+def summarize_series(series) -> SeriesStats:
+    """
+    Reduces a series to a ``SeriesStats`` in a few vectorized passes.
+
+    Args:
+        series: A ``store.Series``, or any object with ``label`` and ``values``.
+
+    Returns:
+        SeriesStats: The summary; None for an empty series.
+    """
+    values = series.values
+    if not len(values):
+        return None
+    probabilities = np.linspace(0, 1, ECDF_POINTS)
+    levels = np.concatenate([[0.25, 0.5, 0.75], np.array(QUANTILES) / 100])
+    q1, median, q3, *quantiles = np.quantile(values, levels)
+    iqr = q3 - q1
+    inside = values[
+        (values >= q1 - WHISKER_IQR * iqr) & (values <= q3 + WHISKER_IQR * iqr)
+    ]
+    low, high = float(values.min()), float(values.max())
+    # Log-spaced bins suit latencies spanning milliseconds to seconds
+    edges = np.geomspace(max(low, 1e-6), max(high, low * 1.001, 2e-6), HISTOGRAM_BINS)
+    counts, edges = np.histogram(values, bins=edges)
+    phases = series.mean_phases() if hasattr(series, "mean_phases") else {}
+    return SeriesStats(
+        label=series.label,
+        n=len(values),
+        mean=float(values.mean()),
+        minimum=low,
+        maximum=high,
+        q1=float(q1),
+        median=float(median),
+        q3=float(q3),
+        whisker_low=float(inside.min()),
+        whisker_high=float(inside.max()),
+        quantiles=dict(zip(QUANTILES, map(float, quantiles))),
+        ecdf=(np.quantile(values, probabilities), probabilities),
+        histogram=(counts, edges),
+        phases=phases,
+        stop_reason=getattr(series, "stop_reason", ""),
+    )
+
+
+def _figure(width: float = 10, height: float = 5):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width, height))
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _to_svg(fig) -> str:
+    import matplotlib
+
+    buffer = io.StringIO()
+    # Text stays text, keeping the SVG small and searchable
+    with matplotlib.rc_context({"svg.fonttype": "none"}):
+        fig.savefig(buffer, format="svg", bbox_inches="tight")
+    svg = buffer.getvalue()
+    return svg[svg.index("<svg") :]
+
+
+def draw_boxplot(ax, stats, annotations=None) -> None:
+    """
+    Draws one box per series from its summary, without the raw samples.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        stats (list of SeriesStats): Series to draw.
+        annotations (list of str, optional): Text drawn above each median.
+    """
+    ax.bxp(
+        [
+            {
+                "label": s.label,
+                "med": s.median,
+                "q1": s.q1,
+                "q3": s.q3,
+                "whislo": s.whisker_low,
+                "whishi": s.whisker_high,
+                "mean": s.mean,
+                "fliers": [],
+            }
+            for s in stats
+        ],
+        showfliers=False,
+        showmeans=True,
+        patch_artist=True,
+    )
+    ax.set_xticks(range(1, len(stats) + 1))
+    ax.set_xticklabels([s.label for s in stats], rotation=20, ha="right", fontsize=8)
+    for i, text in enumerate(annotations or [], start=1):
+        ax.text(
+            i,
+            stats[i - 1].median,
+            text,
+            horizontalalignment="center",
+            verticalalignment="bottom",
+            fontsize=8,
+            color="blue",
+        )
+
+
+def save_boxplot(stats, filename: str, annotations=None) -> None:
+    """
+    Saves the box plot of a run as an image.
+
+    Args:
+        stats (list of SeriesStats): Series to draw.
+        filename (str): Where to save the figure.
+        annotations (list of str, optional): Text drawn above each median.
+    """
+    fig = _figure()
+    ax = fig.add_subplot()
+    draw_boxplot(ax, stats, annotations)
+    ax.set_title("Comparison of Performance Metrics")
+    ax.set_xlabel("Method")
+    ax.set_ylabel("Time (seconds)")
+    fig.tight_layout()
+    fig.savefig(filename)
+
+
+def _ecdf_svg(stats) -> str:
+    fig = _figure()
+    ax = fig.add_subplot()
+    for s in stats:
+        durations, probabilities = s.ecdf
+        ax.step(durations, probabilities, where="post", label=s.label)
+    ax.set_xscale("log")
+    ax.set_xlabel("Time (seconds)")
+    ax.set_ylabel("Fraction of samples")
+    ax.set_title("Empirical CDF")
+    ax.legend(fontsize=8)
+    return _to_svg(fig)
+
+
+def _histogram_svg(stats) -> str:
+    fig = _figure()
+    ax = fig.add_subplot()
+    for s in stats:
+        counts, edges = s.histogram
+        ax.stairs(counts / max(s.n, 1), edges, label=s.label)
+    ax.set_xscale("log")
+    ax.set_xlabel("Time (seconds)")
+    ax.set_ylabel("Fraction of samples")
+    ax.set_title("Latency Distribution")
+    ax.legend(fontsize=8)
+    return _to_svg(fig)
+
+
+def _phases_svg(stats) -> str:
+    with_phases = [s for s in stats if s.phases]
+    if not with_phases:
+        return ""
+    phases = list(dict.fromkeys(p for s in with_phases for p in s.phases))
+    fig = _figure(10, 1 + 0.5 * len(with_phases))
+    ax = fig.add_subplot()
+    left = np.zeros(len(with_phases))
+    for phase in phases:
+        widths = np.array([s.phases.get(phase, 0) * 1000 for s in with_phases])
+        ax.barh(range(len(with_phases)), widths, left=left, label=phase)
+        left += widths
+    ax.set_yticks(range(len(with_phases)))
+    ax.set_yticklabels([s.label for s in with_phases], fontsize=8)
+    ax.invert_yaxis()
+    ax.set_xlabel("Mean time (ms)")
+    ax.set_title("Phases")
+    ax.legend(fontsize=8, ncol=len(phases))
+    return _to_svg(fig)
+
+
+def _summary_table(stats) -> str:
+    headers = ["Series", "n", "Stop reason", "Mean", "Min"]
+    headers += [f"p{p:g}" for p in QUANTILES] + ["Max"]
+    rows = []
+    for s in stats:
+        cells = [html.escape(s.label), str(s.n), html.escape(s.stop_reason or "")]
+        seconds = [s.mean, s.minimum, *s.quantiles.values(), s.maximum]
+        cells += [f"{value * 1000:.1f} ms" for value in seconds]
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    head = "".join(f"<th>{header}</th>" for header in headers)
+    return (
+        f"<table><thead><tr>{head}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+    )
+
+
+_STYLE = (
+    "body{font-family:sans-serif;margin:2em;max-width:1100px}"
+    "table{border-collapse:collapse}"
+    "th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+    "td:first-child,th:first-child{text-align:left}"
+    "svg{max-width:100%;height:auto}"
+)
+
+
+def render_report(stats, title: str = "Benchmark Report", run=None) -> str:
+    """
+    Renders series summaries as a self-contained HTML page.
+
+    Args:
+        stats (list of SeriesStats): Series to report.
+        title (str): Page title.
+        run (dict, optional): Run description from ``store.read_run``.
+
+    Returns:
+        str: The HTML document.
+    """
+    run = run or {}
+    details = ", ".join(
+        f"{name}: {html.escape(str(run[name]))}"
+        for name in ("run_id", "started")
+        if name in run
+    )
+    box = _figure()
+    ax = box.add_subplot()
+    draw_boxplot(ax, stats)
+    ax.set_ylabel("Time (seconds)")
+    ax.set_title("Box Plot")
+    sections = [
+        ("Summary", _summary_table(stats)),
+        ("Box plot", _to_svg(box)),
+        ("Empirical CDF", _ecdf_svg(stats)),
+        ("Distribution", _histogram_svg(stats)),
+        ("Phases", _phases_svg(stats)),
+    ]
+    body = "".join(
+        f"<h2>{heading}</h2>{content}" for heading, content in sections if content
+    )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><style>{_STYLE}</style></head>"
+        f"<body><h1>{html.escape(title)}</h1><p>{details}</p>{body}</body></html>"
+    )
+
+
+def write_report(stats, filename: str = REPORT_FILENAME, run=None) -> str:
+    """
+    Writes the HTML report of a run.
+
+    Args:
+        stats (list of SeriesStats): Series to report.
+        filename (str): Output path.
+        run (dict, optional): Run description from ``store.read_run``.
+
+    Returns:
+        str: The output path.
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(render_report(stats, run=run))
+    logging.debug(f"Wrote report of {len(stats)} series to {filename}")
+    return filename
@@ -0,0 +1,229 @@
+"""
+Process Resource Sampling
+-------------------------
+Samples memory and CPU usage of a process tree from ``/proc`` on a background
+thread while a measurement runs. For Selenium the tree is rooted at
+chromedriver and covers every Chrome process it spawned; for requests it is
+the Python process itself. That process also hosts ``--local-server`` and the
+metrics endpoint when they run, so requests' memory includes theirs; its CPU
+time is taken from the measuring thread instead.
+
+Recorded per measurement: peak and mean resident set size (RSS), user plus
+system CPU seconds, and the largest number of processes seen. On systems
+without ``/proc`` sampling is skipped and no metrics are recorded.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+PROC_ROOT = "/proc"
+DEFAULT_INTERVAL = 0.05
+RESOURCE_METRICS = ("peak_rss_bytes", "mean_rss_bytes", "cpu_seconds", "process_count")
+RESOURCES_FILENAME = "resource_usage.png"
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def resources_available() -> bool:
+    """
+    Returns True if process statistics can be read from ``/proc``.
+    """
+    return os.path.exists(os.path.join(PROC_ROOT, "self", "stat"))
+
+
+def parse_stat(line: str) -> tuple:
+    """
+    Extracts the parent pid, CPU seconds and RSS from a ``/proc/<pid>/stat`` line.
+
+    Args:
+        line (str): Contents of the stat file.
+
+    Returns:
+        tuple: ``(ppid, cpu_seconds, rss_bytes)``.
+    """
+    # The command name may contain spaces and parentheses, so split after it
+    fields = line[line.rindex(")") + 2 :].split()
+    ppid = int(fields[1])
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    rss_bytes = int(fields[21]) * _PAGE_SIZE
+    return ppid, cpu_seconds, rss_bytes
+
+
+def _read_all_stats() -> dict:
+    stats = {}
+    for name in os.listdir(PROC_ROOT):
+        if not name.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC_ROOT, name, "stat")) as f:
+                stats[int(name)] = parse_stat(f.read())
+        except (OSError, ValueError, IndexError):
+            # The process exited between listing and reading
+            continue
+    return stats
+
+
+def process_tree(root_pid: int, include_children: bool = True) -> dict:
+    """
+    Reads the statistics of a process and, optionally, all of its descendants.
+
+    Args:
+        root_pid (int): Process at the root of the tree.
+        include_children (bool): Whether to include descendant processes.
+
+    Returns:
+        dict: pid to ``(ppid, cpu_seconds, rss_bytes)``.
+    """
+    if not include_children:
+        try:
+            with open(os.path.join(PROC_ROOT, str(root_pid), "stat")) as f:
+                return {root_pid: parse_stat(f.read())}
+        except OSError:
+            return {}
+    stats = _read_all_stats()
+    children = {}
+    for pid, (ppid, _, _) in stats.items():
+        children.setdefault(ppid, []).append(pid)
+    tree, pending = {}, [root_pid]
+    while pending:
+        pid = pending.pop()
+        if pid in stats and pid not in tree:
+            tree[pid] = stats[pid]
+            pending.extend(children.get(pid, []))
+    return tree
+
+
+class ResourceSampler:
+    """
+    Samples a process tree on a background thread while used as a context manager.
+
+    Args:
+        root_pid (int): Process at the root of the tree.
+        include_children (bool): Whether to include descendant processes.
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(
+        self,
+        root_pid: int,
+        include_children: bool = True,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.root_pid = root_pid
+        self.include_children = include_children
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._baseline_cpu = {}
+        self._latest_cpu = {}
+        self._rss_samples = []
+        self._max_processes = 0
+
+    def _sample(self) -> None:
+        tree = process_tree(self.root_pid, self.include_children)
+        for pid, (_, cpu_seconds, _) in tree.items():
+            self._latest_cpu[pid] = cpu_seconds
+        self._rss_samples.append(sum(rss for _, _, rss in tree.values()))
+        self._max_processes = max(self._max_processes, len(tree))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        tree = process_tree(self.root_pid, self.include_children)
+        self._baseline_cpu = {pid: cpu for pid, (_, cpu, _) in tree.items()}
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def usage(self) -> dict:
+        """
+        Returns the resource usage observed while sampling.
+
+        Returns:
+            dict: ``peak_rss_bytes``, ``mean_rss_bytes``, ``cpu_seconds`` and
+                ``process_count``.
+        """
+        cpu_seconds = sum(
+            cpu - self._baseline_cpu.get(pid, 0.0)
+            for pid, cpu in self._latest_cpu.items()
+        )
+        return {
+            "peak_rss_bytes": max(self._rss_samples, default=0),
+            "mean_rss_bytes": (
+                sum(self._rss_samples) / len(self._rss_samples)
+                if self._rss_samples
+                else 0
+            ),
+            "cpu_seconds": cpu_seconds,
+            "process_count": self._max_processes,
+        }
+
+
+@contextmanager
+def sample_resources(pid: int | None, include_children: bool = True):
+    """
+    Samples a process tree if possible.
+
+    Args:
+        pid (int, optional): Process at the root of the tree.
+        include_children (bool): Whether to include descendant processes.
+
+    Yields:
+        ResourceSampler: The running sampler, or None when ``pid`` is unknown
+            or ``/proc`` is unavailable.
+    """
+    if pid is None or not resources_available():
+        yield None
+        return
+    with ResourceSampler(pid, include_children) as sampler:
+        yield sampler
+
+
+def driver_pid(driver) -> int | None:
+    """
+    Returns the pid of a driver's chromedriver process, if it can be found.
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    pid = getattr(process, "pid", None)
+    return pid if isinstance(pid, int) else None
+
+
+def plot_resource_usage(usage_by_label, filename: str = RESOURCES_FILENAME):
+    """
+    Plots mean peak RSS and mean CPU seconds per series as bar charts.
+
+    Args:
+        usage_by_label (dict): Series label to its mean metrics, in plot order,
+            e.g. from ``Series.mean_metrics``.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    labels = list(usage_by_label)
+    fig, (rss_ax, cpu_ax) = plt.subplots(1, 2, figsize=(12, 5))
+    positions = range(len(labels))
+    rss_ax.bar(
+        positions,
+        [usage_by_label[l].get("peak_rss_bytes", 0.0) / 2**20 for l in labels],
+    )
+    rss_ax.set_ylabel("Peak RSS (MiB)")
+    rss_ax.set_title("Memory")
+    cpu_ax.bar(positions, [usage_by_label[l].get("cpu_seconds", 0.0) for l in labels])
+    cpu_ax.set_ylabel("CPU time (seconds)")
+    cpu_ax.set_title("CPU")
+    for ax in (rss_ax, cpu_ax):
+        ax.set_xticks(list(positions))
+        ax.set_xticklabels(labels, rotation=30, ha="right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
@@ -0,0 +1,378 @@
+"""
+Adaptive Sampling Engine
+------------------------
+Replaces a fixed sample count with a sampler that discards warmup iterations
+and keeps measuring each method until the bootstrap confidence interval of its
+median is narrow enough, or until its time budget or sample cap is reached.
+
+Outliers beyond Tukey fences are excluded from the mean; the median is
+already robust to them. Confidence intervals are computed with a vectorized
+NumPy bootstrap, for the median and mean of each method and for the speedup
+ratio between two methods. Beyond ``MAX_BOOTSTRAP_SAMPLES`` samples the
+bootstrap draws that many per replicate and rescales the spread (an
+m-out-of-n bootstrap), so an interval costs the same for any sample count.
+"""
+
+import logging
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import numpy as np
+
+DEFAULT_WARMUP = 1
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_MAX_SAMPLES = 50
+# Stop once (CI high - CI low) / median falls below this
+DEFAULT_CI_WIDTH = 0.1
+# Seconds of measurement time allowed per method
+DEFAULT_TIME_BUDGET = 120.0
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2000
+# Draws per bootstrap replicate; larger samples are bootstrapped m-out-of-n
+MAX_BOOTSTRAP_SAMPLES = 1000
+# Tukey fence multiplier: values beyond Q1 - k*IQR or Q3 + k*IQR are outliers
+DEFAULT_OUTLIER_K = 3.0
+
+STOP_CONVERGED = "converged"
+STOP_MAX_SAMPLES = "max-samples"
+STOP_TIME_BUDGET = "time-budget"
+
+
+def _replicates(values: np.ndarray, statistic, resamples: int, rng) -> np.ndarray:
+    size = min(len(values), MAX_BOOTSTRAP_SAMPLES)
+    # One row per bootstrap replicate
+    indices = rng.integers(0, len(values), size=(resamples, size))
+    replicates = statistic(values[indices], axis=1)
+    if size < len(values):
+        # The spread of a statistic shrinks with the square root of the sample size
+        center = statistic(values)
+        replicates = center + (replicates - center) * math.sqrt(size / len(values))
+    return replicates
+
+
+def _interval(replicates: np.ndarray, confidence: float) -> tuple:
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(replicates, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def bootstrap_ci(
+    values,
+    statistic=np.median,
+    confidence: float = DEFAULT_CONFIDENCE,
+    resamples: int = DEFAULT_RESAMPLES,
+    rng=None,
+) -> tuple:
+    """
+    Computes a percentile bootstrap confidence interval for a statistic.
+
+    Args:
+        values (array-like): Samples.
+        statistic (callable): NumPy reduction accepting an ``axis`` argument,
+            e.g. ``np.median`` or ``np.mean``.
+        confidence (float): Confidence level of the interval.
+        resamples (int): Number of bootstrap replicates.
+        rng (numpy.random.Generator, optional): Random generator to use.
+
+    Returns:
+        tuple: ``(low, high)`` bounds of the interval.
+    """
+    values = np.asarray(values, dtype=float)
+    rng = rng or np.random.default_rng()
+    return _interval(_replicates(values, statistic, resamples, rng), confidence)
+
+
+def ratio_ci(
+    numerator,
+    denominator,
+    statistic=np.median,
+    confidence: float = DEFAULT_CONFIDENCE,
+    resamples: int = DEFAULT_RESAMPLES,
+    rng=None,
+) -> tuple:
+    """
+    Computes the ratio of a statistic between two samples with a bootstrap CI.
+
+    Each sample is resampled independently, so the interval reflects the
+    uncertainty of both methods.
+
+    Args:
+        numerator (array-like): Samples of the slower method.
+        denominator (array-like): Samples of the faster method.
+        statistic (callable): NumPy reduction accepting an ``axis`` argument.
+        confidence (float): Confidence level of the interval.
+        resamples (int): Number of bootstrap replicates.
+        rng (numpy.random.Generator, optional): Random generator to use.
+
+    Returns:
+        tuple: ``(ratio, low, high)``.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    rng = rng or np.random.default_rng()
+    replicates = _replicates(numerator, statistic, resamples, rng) / _replicates(
+        denominator, statistic, resamples, rng
+    )
+    ratio = float(statistic(numerator) / statistic(denominator))
+    return (ratio, *_interval(replicates, confidence))
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    # Ranks starting at 1, with ties given the average of their positions
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return ((ends - counts + 1 + ends) / 2)[inverse]
+
+
+def mann_whitney_u(baseline, current) -> tuple:
+    """
+    One-sided Mann-Whitney U test that ``current`` tends to be larger than ``baseline``.
+
+    Uses the normal approximation with tie and continuity corrections, which
+    is adequate from roughly eight samples per side.
+
+    Args:
+        baseline (array-like): Reference samples.
+        current (array-like): Samples tested for being larger.
+
+    Returns:
+        tuple: ``(u, p_value)`` where ``u`` is the U statistic of ``current``.
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    current = np.asarray(current, dtype=float)
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        return float("nan"), 1.0
+    ranks = _ranks(np.concatenate([baseline, current]))
+    u = float(ranks[n1:].sum() - n2 * (n2 + 1) / 2)
+    _, counts = np.unique(ranks, return_counts=True)
+    n = n1 + n2
+    tie_term = float((counts**3 - counts).sum()) / (n * (n - 1)) if n > 1 else 0.0
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclass
+class SampleSet:
+    """
+    Samples collected for one method.
+
+    Durations are kept in a compact array; the results themselves are only
+    kept when ``keep_records`` is set, e.g. when they are not streamed to a
+    ``ResultStore``.
+
+    Attributes:
+        label (str): Method label.
+        records (list): Measurement results kept after warmup.
+        warmup (int): Number of warmup results discarded.
+        errors (int): Measurements that failed and returned no result.
+        elapsed (float): Seconds spent measuring, warmup included.
+        stop_reason (str): Why sampling stopped, one of the ``STOP_*`` values.
+        keep_records (bool): Whether ``add`` keeps results in ``records``.
+        durations (array): Durations in seconds of the results kept after warmup.
+    """
+
+    label: str
+    records: list = field(default_factory=list)
+    warmup: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    stop_reason: str = ""
+    keep_records: bool = True
+    durations: array = field(default_factory=lambda: array("d"))
+
+    def __post_init__(self):
+        if self.records and not self.durations:
+            self.durations.extend(_duration(record) for record in self.records)
+
+    def add(self, result) -> None:
+        """
+        Adds a measurement result kept after warmup.
+        """
+        self.durations.append(_duration(result))
+        if self.keep_records:
+            self.records.append(result)
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    @property
+    def values(self) -> np.ndarray:
+        """numpy.ndarray: Sample durations in seconds."""
+        return np.array(self.durations, dtype=float)
+
+    def inlier_mask(self, k: float | None = DEFAULT_OUTLIER_K) -> np.ndarray:
+        """
+        Returns a boolean mask of samples within the Tukey fences.
+
+        Args:
+            k (float, optional): Fence multiplier; None keeps every sample.
+        """
+        values = self.values
+        if k is None or len(values) < 4:
+            return np.ones(len(values), dtype=bool)
+        q1, q3 = np.percentile(values, [25, 75])
+        spread = k * (q3 - q1)
+        return (values >= q1 - spread) & (values <= q3 + spread)
+
+
+def _duration(result) -> float:
+    # Measurements are FetchRecords; plain numbers are accepted as seconds
+    return getattr(result, "duration", result)
+
+
+class AdaptiveSampler:
+    """
+    Samples several methods in turn until each one's estimate is precise enough.
+
+    Methods are measured round-robin so slow drift affects all of them alike.
+    A method stops once, after ``min_samples``, the bootstrap CI of its median
+    is narrower than ``ci_width`` relative to the median, or when it reaches
+    ``max_samples`` or spends ``time_budget`` seconds.
+
+    Args:
+        warmup (int): Leading results discarded per method.
+        min_samples (int): Samples required before checking convergence.
+        max_samples (int): Hard cap on samples per method.
+        ci_width (float): Target relative width of the median's CI.
+        time_budget (float): Seconds of measurement allowed per method.
+        confidence (float): Confidence level of the intervals.
+        resamples (int): Number of bootstrap replicates.
+        outlier_k (float, optional): Tukey fence multiplier for excluding
+            outliers from the mean; None keeps every sample.
+        seed (int, optional): Seed for the bootstrap random generator.
+    """
+
+    def __init__(
+        self,
+        warmup: int = DEFAULT_WARMUP,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+        ci_width: float = DEFAULT_CI_WIDTH,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+        confidence: float = DEFAULT_CONFIDENCE,
+        resamples: int = DEFAULT_RESAMPLES,
+        outlier_k: float | None = DEFAULT_OUTLIER_K,
+        seed: int | None = None,
+    ):
+        if min_samples < 2 or max_samples < min_samples:
+            raise ValueError("Require 2 <= min_samples <= max_samples.")
+        self.warmup = warmup
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.ci_width = ci_width
+        self.time_budget = time_budget
+        self.confidence = confidence
+        self.resamples = resamples
+        self.outlier_k = outlier_k
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, methods: dict, on_result=None, keep_records: bool = True) -> dict:
+        """
+        Samples every method until it meets a stopping condition.
+
+        Args:
+            methods (dict): Label to a zero-argument callable performing one
+                measurement and returning a ``FetchRecord`` (or seconds), or
+                None if it failed; failed attempts count toward ``max_samples``.
+            on_result (callable, optional): Called with the label, the result
+                and whether it was discarded as warmup, as each one completes.
+            keep_records (bool): Keep every result in memory as well as its duration.
+
+        Returns:
+            dict: Label to ``SampleSet``, in the order of ``methods``.
+        """
+        sample_sets = {
+            label: SampleSet(label, keep_records=keep_records) for label in methods
+        }
+        active = list(methods)
+        while active:
+            for label in list(active):
+                sample_set = sample_sets[label]
+                start = time.perf_counter()
+                result = methods[label]()
+                sample_set.elapsed += time.perf_counter() - start
+                if result is None:
+                    sample_set.errors += 1
+                else:
+                    warmup = sample_set.warmup < self.warmup
+                    if warmup:
+                        sample_set.warmup += 1
+                    else:
+                        sample_set.add(result)
+                    if on_result is not None:
+                        on_result(label, result, warmup)
+                reason = self.stop_reason(sample_set)
+                if reason:
+                    sample_set.stop_reason = reason
+                    active.remove(label)
+                    logging.debug(
+                        f"{label}: stopped after {len(sample_set)} samples ({reason})."
+                    )
+        return sample_sets
+
+    def stop_reason(self, sample_set: SampleSet) -> str:
+        """
+        Returns why a method should stop sampling, or an empty string.
+        """
+        count = len(sample_set)
+        if count >= self.min_samples:
+            values = sample_set.values
+            median = np.median(values)
+            low, high = bootstrap_ci(
+                values, np.median, self.confidence, self.resamples, self.rng
+            )
+            if median > 0 and (high - low) / median <= self.ci_width:
+                return STOP_CONVERGED
+        # Failed attempts count too, so a method that always fails still stops
+        if count + sample_set.errors >= self.max_samples:
+            return STOP_MAX_SAMPLES
+        if sample_set.elapsed >= self.time_budget:
+            return STOP_TIME_BUDGET
+        return ""
+
+    def summarize(self, sample_set: SampleSet) -> dict:
+        """
+        Computes the median and mean of a sample set with their bootstrap CIs.
+
+        The median uses every sample; the mean excludes outliers.
+
+        Returns:
+            dict: ``n``, ``outliers``, ``median``, ``median_ci``, ``mean`` and
+                ``mean_ci``.
+        """
+        values = sample_set.values
+        inliers = values[sample_set.inlier_mask(self.outlier_k)]
+        return {
+            "n": len(values),
+            "outliers": len(values) - len(inliers),
+            "median": float(np.median(values)),
+            "median_ci": bootstrap_ci(
+                values, np.median, self.confidence, self.resamples, self.rng
+            ),
+            "mean": float(np.mean(inliers)),
+            "mean_ci": bootstrap_ci(
+                inliers, np.mean, self.confidence, self.resamples, self.rng
+            ),
+        }
+
+    def speedup(self, slower: SampleSet, faster: SampleSet) -> tuple:
+        """
+        Returns the median speedup of ``faster`` over ``slower`` with its CI.
+
+        Returns:
+            tuple: ``(ratio, low, high)``.
+        """
+        return ratio_ci(
+            slower.values,
+            faster.values,
+            np.median,
+            self.confidence,
+            self.resamples,
+            self.rng,
+        )
@@ -0,0 +1,398 @@
+"""
+Local Benchmark Server
+----------------------
+A hermetic HTTP server that replaces the public benchmark targets, so requests
+and Selenium can be compared reproducibly and offline (e.g. in CI).
+
+Endpoints:
+    /api/fact: JSON API response.
+    /static: static HTML page listing job titles.
+    /rendered: HTML page whose ``.job-card-list__title`` elements are injected
+        by JavaScript after a delay.
+
+Injected latency, payload size and chunked responses are set on the server
+and can be overridden per request with the ``latency``, ``size``, ``chunked``
+and ``delay`` query parameters.
+
+Responses are ``no-store`` unless a cache lifetime is set (``max_age``), in
+which case they carry ``Cache-Control: max-age``, an ``ETag`` and a
+``Last-Modified`` date, and conditional requests are answered with ``304``.
+
+With compression on (``compress``), bodies are sent ``gzip`` or ``deflate``
+encoded when the request's ``Accept-Encoding`` allows it. Padding is made of
+pseudo-random words, so it compresses about as well as real markup does.
+
+Usage:
+    python -m selenium_v_requests_comparison.server [--port PORT]
+"""
+
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, replace
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PATH = "/api/fact"
+STATIC_PATH = "/static"
+RENDERED_PATH = "/rendered"
+JOB_TITLE_CLASS = "job-card-list__title"
+# Content codings the server can apply, in order of preference
+CONTENT_ENCODINGS = ("gzip", "deflate")
+_FILLER_WORDS = (
+    "senior engineer data remote hybrid python analyst manager team product "
+    "platform cloud backend frontend design lead staff junior contract salary"
+).split()
+
+
+@dataclass
+class ServerConfig:
+    """
+    Response shaping applied by the benchmark server.
+
+    Attributes:
+        latency (float): Seconds to wait before sending each response.
+        payload_size (int): Minimum response body size in bytes; bodies are padded.
+        chunked (bool): Stream bodies with chunked transfer encoding.
+        chunk_size (int): Bytes per chunk when streaming.
+        chunk_delay (float): Seconds to wait between chunks when streaming.
+        render_delay (float): Seconds before the rendered page injects its elements.
+        item_count (int): Number of job titles on the HTML pages.
+        cache_max_age (int, optional): ``max-age`` in seconds for cacheable,
+            validatable responses; None sends ``no-store``.
+        compression (bool): Encode bodies as the client's ``Accept-Encoding`` allows.
+    """
+
+    latency: float = 0.0
+    payload_size: int = 0
+    chunked: bool = False
+    chunk_size: int = 1024
+    chunk_delay: float = 0.0
+    render_delay: float = 0.5
+    item_count: int = 10
+    cache_max_age: int | None = None
+    compression: bool = False
+
+
+@functools.lru_cache(maxsize=16)
+def _filler(size: int) -> str:
+    # Seeded, so every response of a size is identical and keeps its ETag
+    rng = random.Random(size)
+    words, length = [], 0
+    while length < size:
+        words.append(rng.choice(_FILLER_WORDS))
+        length += len(words[-1]) + 1
+    return " ".join(words)[:size]
+
+
+def _job_titles(config: ServerConfig) -> list:
+    return [f"Job {index}" for index in range(config.item_count)]
+
+
+def _pad_html(html: str, size: int) -> str:
+    padding = size - len(html.encode())
+    if padding <= 0:
+        return html
+    return html.replace("</body>", f"<!-- {_filler(max(padding - 9, 0))} --></body>")
+
+
+def render_api(config: ServerConfig) -> bytes:
+    """
+    Builds the JSON API body, padded to ``config.payload_size``.
+    """
+    fact = "Cats sleep for around thirteen to sixteen hours a day."
+    body = {"fact": fact, "length": len(fact), "padding": ""}
+    padding = config.payload_size - len(json.dumps(body).encode())
+    if padding > 0:
+        body["padding"] = _filler(padding)
+    return json.dumps(body).encode()
+
+
+def render_static(config: ServerConfig) -> bytes:
+    """
+    Builds a static HTML page containing the job titles.
+    """
+    items = "".join(
+        f'<li><a class="{JOB_TITLE_CLASS}">{title}</a></li>'
+        for title in _job_titles(config)
+    )
+    html = f"<!DOCTYPE html><html><head><title>Jobs</title></head><body><ul>{items}</ul></body></html>"
+    return _pad_html(html, config.payload_size).encode()
+
+
+def render_rendered(config: ServerConfig) -> bytes:
+    """
+    Builds an HTML page whose job titles are injected by JavaScript.
+    """
+    script = (
+        "setTimeout(function () {"
+        "var list = document.getElementById('jobs');"
+        f"{json.dumps(_job_titles(config))}.forEach(function (title) {{"
+        "var item = document.createElement('li');"
+        "var link = document.createElement('a');"
+        f"link.className = '{JOB_TITLE_CLASS}';"
+        "link.textContent = title;"
+        "item.appendChild(link);"
+        "list.appendChild(item);"
+        "});"
+        "window.jobsRendered = true;"
+        f"}}, {int(config.render_delay * 1000)});"
+    )
+    html = (
+        "<!DOCTYPE html><html><head><title>Jobs</title></head><body>"
+        f'<ul id="jobs"></ul><script>{script}</script></body></html>'
+    )
+    return _pad_html(html, config.payload_size).encode()
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Picks the content coding to send for an ``Accept-Encoding`` header.
+
+    Returns:
+        str: The preferred acceptable entry of ``CONTENT_ENCODINGS``, or None
+            to send the body as is.
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    return next((coding for coding in CONTENT_ENCODINGS if coding in accepted), None)
+
+
+@functools.lru_cache(maxsize=32)
+def encode_body(body: bytes, encoding: str) -> bytes:
+    """
+    Compresses a body with a content coding; repeated bodies are cached.
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)
+    return zlib.compress(body)
+
+
+ROUTES = {
+    API_PATH: ("application/json", render_api),
+    STATIC_PATH: ("text/html; charset=utf-8", render_static),
+    RENDERED_PATH: ("text/html; charset=utf-8", render_rendered),
+}
+
+
+class BenchmarkRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the benchmark endpoints using the server's ``ServerConfig``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle enabled the body waits
+    # for the client's delayed ACK, adding ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path not in ROUTES:
+            self.send_error(404)
+            return
+        config = self._request_config(parse_qs(url.query))
+        content_type, render = ROUTES[url.path]
+        body = render(config)
+        encoding = None
+        if config.compression:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if encoding:
+                body = encode_body(body, encoding)
+        if config.latency:
+            time.sleep(config.latency)
+        if config.cache_max_age is None:
+            cache_headers = {"Cache-Control": "no-store"}
+        else:
+            cache_headers = {
+                "Cache-Control": f"max-age={config.cache_max_age}",
+                "ETag": f'"{hashlib.sha1(body).hexdigest()[:16]}"',
+                "Last-Modified": formatdate(self.server.started, usegmt=True),
+            }
+            if self._not_modified(cache_headers["ETag"]):
+                self.send_response(304)
+                for name, value in cache_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        for name, value in cache_headers.items():
+            self.send_header(name, value)
+        if config.compression:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if config.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), config.chunk_size):
+                chunk = body[start : start + config.chunk_size]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.flush()
+                if config.chunk_delay:
+                    time.sleep(config.chunk_delay)
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _not_modified(self, etag: str) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(","))
+        try:
+            since = parsedate_to_datetime(self.headers.get("If-Modified-Since"))
+        except (TypeError, ValueError):
+            return False
+        return since.timestamp() >= int(self.server.started)
+
+    def _request_config(self, query: dict) -> ServerConfig:
+        overrides = {}
+        if "latency" in query:
+            overrides["latency"] = float(query["latency"][0])
+        if "size" in query:
+            overrides["payload_size"] = int(query["size"][0])
+        if "chunked" in query:
+            overrides["chunked"] = query["chunked"][0] not in ("0", "false")
+        if "delay" in query:
+            overrides["render_delay"] = float(query["delay"][0])
+        if "max_age" in query:
+            overrides["cache_max_age"] = int(query["max_age"][0])
+        if "compress" in query:
+            overrides["compression"] = query["compress"][0] not in ("0", "false")
+        return replace(self.server.config, **overrides)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Benchmark server: {format % args}")
+
+
+class BenchmarkServer:
+    """
+    Runs the benchmark endpoints on a background thread.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port.
+        config (ServerConfig, optional): Response shaping for every request.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config=None):
+        self._httpd = ThreadingHTTPServer((host, port), BenchmarkRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.config = config or ServerConfig()
+        # Reported as the Last-Modified date of every cacheable response
+        self._httpd.started = time.time()
+        self._thread = None
+
+    @property
+    def config(self) -> ServerConfig:
+        """ServerConfig: Response shaping applied to every request."""
+        return self._httpd.config
+
+    @property
+    def base_url(self) -> str:
+        """str: Root URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url + API_PATH
+
+    @property
+    def static_url(self) -> str:
+        return self.base_url + STATIC_PATH
+
+    @property
+    def rendered_url(self) -> str:
+        return self.base_url + RENDERED_PATH
+
+    def start(self) -> None:
+        """
+        Starts serving on a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.debug(f"Benchmark server listening on {self.base_url}")
+
+    def serve_forever(self) -> None:
+        """
+        Serves on the calling thread until interrupted.
+        """
+        logging.debug(f"Benchmark server listening on {self.base_url}")
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the listening socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local benchmark server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay")
+    parser.add_argument("--payload-size", type=int, default=0, help="Body size")
+    parser.add_argument("--chunked", action="store_true", help="Stream bodies")
+    parser.add_argument(
+        "--render-delay", type=float, default=0.5, help="JS injection delay"
+    )
+    parser.add_argument(
+        "--cache-max-age", type=int, help="Make responses cacheable for N seconds"
+    )
+    parser.add_argument(
+        "--compression", action="store_true", help="Send gzip or deflate bodies"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG)
+
+    config = ServerConfig(
+        latency=args.latency,
+        payload_size=args.payload_size,
+        chunked=args.chunked,
+        render_delay=args.render_delay,
+        cache_max_age=args.cache_max_age,
+        compression=args.compression,
+    )
+    server = BenchmarkServer(args.host, args.port, config)
+    print(f"Serving on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
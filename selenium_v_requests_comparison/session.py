@@ -0,0 +1,72 @@
+"""
+Keep-Alive Requests Session
+---------------------------
+A ``requests.Session`` with a configurable connection pool and retry policy
+that records, for every request, whether it was served over a reused
+keep-alive connection or had to open a new (cold) one. Connections are
+instrumented for per-phase timing (see ``timing``).
+"""
+
+import requests
+from urllib3.util.retry import Retry
+
+from selenium_v_requests_comparison.timing import TimedHTTPAdapter
+
+# Status codes that are retried when a retry policy is configured
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+DEFAULT_POOL_SIZE = 10
+
+
+class KeepAliveSession(requests.Session):
+    """
+    A pooled session that tags each request as cold or reused.
+
+    Args:
+        pool_size (int): Maximum number of connections kept alive per host.
+        max_retries (int): Number of retries for failed connections and
+            retryable status codes. 0 disables retrying.
+        backoff_factor (float): Backoff factor between retries, in seconds.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = 0,
+        backoff_factor: float = 0.0,
+    ):
+        super().__init__()
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES if max_retries else (),
+            raise_on_status=False,
+        )
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        # None until the first request has been sent
+        self.last_connection_reused = None
+
+    def connection_count(self, url: str) -> int:
+        """
+        Returns how many connections the adapter serving ``url`` has opened.
+
+        requests keys connection pools by TLS settings as well as host, so the
+        count is summed over every pool the adapter holds.
+
+        Args:
+            url (str): A URL served by the adapter of interest.
+
+        Returns:
+            int: Number of connections created so far.
+        """
+        pools = self.get_adapter(url).poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def send(self, request, **kwargs):
+        before = self.connection_count(request.url)
+        response = super().send(request, **kwargs)
+        self.last_connection_reused = self.connection_count(request.url) == before
+        return response
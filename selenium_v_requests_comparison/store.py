@@ -0,0 +1,314 @@
+"""
+Streaming Result Store
+----------------------
+Appends every sample to a JSON Lines file as soon as it completes, so a crash
+loses at most the sample in flight and the raw data can be re-analyzed later.
+Files ending in ``.gz`` are written gzip-compressed. A ``{run_id}`` in the
+file name is replaced by the run's id, so every run gets a file of its own; an
+existing file is never overwritten.
+
+The first line describes the run (id, start time, host and arguments). Each
+following line is one entry:
+
+    sample: a ``FetchRecord`` with its group label, target and method, and
+        whether it was a discarded warmup sample.
+    cold-start: a browser launch duration, reported as its own series.
+    group: the final state of a sample group (stop reason, warmup count).
+    agent: a host that measured samples of a distributed run, with its clock
+        offset from the coordinator.
+
+Reading is streaming as well: ``load_series`` folds the entries into
+array-backed ``Series`` that keep one float per sample plus running phase and
+metric sums, so summaries and plots of very large runs use constant memory
+per sample.
+"""
+
+import gzip
+import json
+import os
+import platform
+import socket
+import sys
+import uuid
+import zlib
+from array import array
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+
+from selenium_v_requests_comparison.timing import PHASES
+
+# One file per run; "{run_id}" is replaced by the run's id
+RESULTS_FILENAME = "results_{run_id}.jsonl"
+COLD_START = "cold-start"
+
+
+def host_info() -> dict:
+    """
+    Describes the machine a run was measured on.
+    """
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+def split_label(label: str, tags: dict) -> str:
+    """
+    Returns the plot label of a sample, split by how it was taken.
+
+    Samples taken through an HTTP cache are split by cache outcome, pooled
+    requests samples by whether keep-alive reused a connection, and browser
+    samples by whether the session was warm.
+    """
+    if "cache" in tags:
+        return f"{label} (cache {tags['cache']})"
+    if "connection" in tags:
+        return f"{label} ({tags['connection']})"
+    if "session" in tags:
+        return f"{label} ({tags['session']})"
+    return label
+
+
+class ResultStore:
+    """
+    Writes a run's samples to a new append-only JSON Lines file.
+
+    Args:
+        path (str): Output file; ``.gz`` files are gzip-compressed and
+            ``{run_id}`` is replaced by the run's id.
+        metadata (dict, optional): Extra run-level fields, e.g. arguments.
+
+    Raises:
+        FileExistsError: If the file already exists, e.g. from an earlier run.
+    """
+
+    def __init__(self, path: str = RESULTS_FILENAME, metadata: dict | None = None):
+        self.run_id = uuid.uuid4().hex
+        self.path = path.replace("{run_id}", self.run_id)
+        self.count = 0
+        # Exclusive creation, so an interrupted run's samples are never truncated
+        self._file = _open(self.path, "x")
+        self._write(
+            {
+                "type": "run",
+                "run_id": self.run_id,
+                "started": datetime.now(timezone.utc).isoformat(),
+                "host": host_info(),
+                "argv": sys.argv[1:],
+                **(metadata or {}),
+            }
+        )
+
+    def _write(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry) + "\n")
+        # Flushed per entry so a crash loses at most the sample in flight
+        self._file.flush()
+
+    def append(
+        self, label: str, record, warmup: bool = False, agent: dict | None = None
+    ) -> None:
+        """
+        Streams one sample to the file.
+
+        Args:
+            label (str): Group label, e.g. ``"API - Requests"``.
+            record (FetchRecord): The sample.
+            warmup (bool): Whether the sampler discarded it as warmup.
+            agent (dict, optional): For distributed runs, the ``id`` of the
+                agent that took the sample and when it ``finished_ns`` on the
+                coordinator's clock.
+        """
+        target = label.split(" - ", 1)[0]
+        entry = {
+            "type": "sample",
+            "label": label,
+            "target": target,
+            "method": record.method,
+            "warmup": warmup,
+            "record": asdict(record),
+        }
+        if agent is not None:
+            entry["agent"] = agent
+        self._write(entry)
+        self.count += 1
+
+    def append_agent(self, agent_id: str, info: dict) -> None:
+        """
+        Records an agent of a distributed run, e.g. its host and clock offset.
+        """
+        self._write({"type": "agent", "agent": agent_id, **info})
+
+    def append_cold_start(self, label: str, seconds: float) -> None:
+        """
+        Streams one browser launch duration, reported as the series ``label``.
+        """
+        self._write({"type": COLD_START, "label": label, "seconds": seconds})
+
+    def append_group(self, sample_set) -> None:
+        """
+        Records the final state of a sample group once sampling has stopped.
+        """
+        self._write(
+            {
+                "type": "group",
+                "label": sample_set.label,
+                "stop_reason": sample_set.stop_reason,
+                "warmup": sample_set.warmup,
+                "elapsed": sample_set.elapsed,
+            }
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_entries(path: str):
+    """
+    Yields every entry of a result file in order.
+
+    A final line cut short by a crash is skipped, as is the unterminated end of
+    a gzip file whose writer was killed.
+    """
+    with _open(path, "r") as f:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except (StopIteration, EOFError, zlib.error):
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def read_run(path: str) -> dict:
+    """
+    Returns the run description from the first line of a result file.
+    """
+    for entry in read_entries(path):
+        if entry.get("type") == "run":
+            return entry
+        break
+    return {}
+
+
+@dataclass
+class Series:
+    """
+    Array-backed aggregate of one series of samples.
+
+    Attributes:
+        label (str): Series label.
+        durations (array): Sample durations in seconds.
+        stop_reason (str): Why sampling of the group stopped, if recorded.
+        warmup (int): Warmup samples discarded from the group.
+    """
+
+    label: str
+    durations: array = field(default_factory=lambda: array("d"))
+    stop_reason: str = ""
+    warmup: int = 0
+    _phase_sums: dict = field(default_factory=dict, repr=False)
+    _phase_counts: dict = field(default_factory=dict, repr=False)
+    _metric_sums: dict = field(default_factory=dict, repr=False)
+    _metric_counts: dict = field(default_factory=dict, repr=False)
+
+    def add(self, record: dict) -> None:
+        """
+        Folds one stored record into the series.
+
+        Args:
+            record (dict): A ``FetchRecord`` as stored, i.e. ``asdict(record)``.
+        """
+        self.durations.append(record["total_ns"] / 1e9)
+        for phase, duration_ns in record.get("phases_ns", {}).items():
+            self._phase_sums[phase] = self._phase_sums.get(phase, 0) + duration_ns
+            self._phase_counts[phase] = self._phase_counts.get(phase, 0) + 1
+        for metric, value in record.get("metrics", {}).items():
+            if isinstance(value, (int, float)):
+                self._metric_sums[metric] = self._metric_sums.get(metric, 0) + value
+                self._metric_counts[metric] = self._metric_counts.get(metric, 0) + 1
+
+    @property
+    def values(self) -> np.ndarray:
+        """numpy.ndarray: Sample durations in seconds."""
+        return np.array(self.durations, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def mean_phases(self) -> dict:
+        """
+        Returns the mean duration of each phase in seconds, in ``PHASES`` order.
+        """
+        order = list(PHASES) + sorted(set(self._phase_sums) - set(PHASES))
+        return {
+            phase: self._phase_sums[phase] / self._phase_counts[phase] / 1e9
+            for phase in order
+            if phase in self._phase_sums
+        }
+
+    def mean_metrics(self) -> dict:
+        """
+        Returns the mean of each metric recorded by every sample of the series.
+        """
+        return {
+            metric: total / self._metric_counts[metric]
+            for metric, total in self._metric_sums.items()
+            if self._metric_counts[metric] == len(self)
+        }
+
+
+def load_series(path: str, split: bool = True, include_warmup: bool = False) -> dict:
+    """
+    Folds a result file into one ``Series`` per label, streaming.
+
+    Args:
+        path (str): Result file written by ``ResultStore``.
+        split (bool): Split groups by connection reuse or session warmth, and
+            include cold-start series. Otherwise one series per group.
+        include_warmup (bool): Keep samples discarded as warmup.
+
+    Returns:
+        dict: Label to ``Series``, in first-seen order.
+    """
+    series = {}
+    groups = {}
+    for entry in read_entries(path):
+        kind = entry.get("type")
+        if kind == "sample":
+            if entry["warmup"] and not include_warmup:
+                continue
+            record = entry["record"]
+            label = entry["label"]
+            if split:
+                label = split_label(label, record.get("tags", {}))
+            series.setdefault(label, Series(label)).add(record)
+        elif kind == COLD_START and split:
+            label = entry["label"]
+            series.setdefault(label, Series(label)).durations.append(entry["seconds"])
+        elif kind == "group":
+            groups[entry["label"]] = entry
+    for label, entry in groups.items():
+        if label in series:
+            series[label].stop_reason = entry["stop_reason"]
+            series[label].warmup = entry["warmup"]
+    return series
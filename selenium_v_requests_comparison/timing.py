@@ -0,0 +1,240 @@
+"""
+Per-Phase Latency Instrumentation
+---------------------------------
+Breaks a fetch down into DNS resolution, TCP connect, TLS handshake, time to
+first byte and body download.
+
+For the requests path the phases are measured with ``time.perf_counter_ns``
+inside urllib3 connection subclasses, mounted through ``TimedHTTPAdapter``.
+For the Selenium path they are read from the browser's Navigation Timing
+entry. Either way each sample is emitted as a ``FetchRecord``.
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from selenium_v_requests_comparison.transfer import CountingSocket, count_response
+
+# Phases in the order they happen during a fetch
+PHASES = ("dns", "connect", "tls", "ttfb", "body")
+# Browser-only phase: from the end of the response to the load event
+RENDER_PHASE = "render"
+# Pulling the job titles out of the loaded page, timed on every path
+EXTRACT_PHASE = "extract"
+# Decompressing a content-encoded body, timed apart from downloading it
+DECODE_PHASE = "decode"
+
+# Returns the navigation entry of the current page as a plain object
+NAVIGATION_TIMING_SCRIPT = (
+    "const entries = performance.getEntriesByType('navigation');"
+    "return entries.length ? entries[0].toJSON() : null;"
+)
+
+_local = threading.local()
+
+
+@dataclass
+class FetchRecord:
+    """
+    A single timed fetch.
+
+    Attributes:
+        method (str): Fetch path that produced the sample ("requests" or "selenium").
+        url (str): The URL that was fetched.
+        total_ns (int): End-to-end duration in nanoseconds.
+        phases_ns (dict): Duration of each measured phase in nanoseconds. Phases
+            that did not happen (e.g. connect on a reused connection) are absent.
+        status (int, optional): HTTP status code, when known.
+        tags (dict): Free-form labels describing how the sample was taken.
+        metrics (dict): Additional numeric measurements, such as time to ready.
+    """
+
+    method: str
+    url: str
+    total_ns: int
+    phases_ns: dict = field(default_factory=dict)
+    status: int | None = None
+    tags: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """float: End-to-end duration in seconds."""
+        return self.total_ns / 1e9
+
+
+class PhaseTimer:
+    """
+    Accumulates phase durations for the fetch running on the current thread.
+    """
+
+    def __init__(self):
+        self.phases_ns = {}
+
+    def add(self, phase: str, duration_ns: int) -> None:
+        """
+        Adds time to a phase. Retries and redirects accumulate into the same phase.
+
+        Args:
+            phase (str): Phase name, one of ``PHASES``.
+            duration_ns (int): Duration in nanoseconds.
+        """
+        self.phases_ns[phase] = self.phases_ns.get(phase, 0) + duration_ns
+
+
+@contextmanager
+def phase_timer():
+    """
+    Activates a ``PhaseTimer`` for requests made on the current thread.
+
+    Yields:
+        PhaseTimer: The timer receiving phase durations.
+    """
+    timer = PhaseTimer()
+    previous = getattr(_local, "timer", None)
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+def current_timer() -> PhaseTimer | None:
+    """
+    Returns the active ``PhaseTimer`` for this thread, if any.
+    """
+    return getattr(_local, "timer", None)
+
+
+class TimedConnectionMixin:
+    """
+    Times DNS, TCP connect and time to first byte on a urllib3 connection.
+
+    DNS is resolved up front so it can be timed on its own, then each resolved
+    address is tried in turn, preserving urllib3's address fallback. The
+    connected socket is wrapped so its bytes reach the active
+    ``transfer.TransferCounter``.
+    """
+
+    def connect(self) -> None:
+        super().connect()
+        self.sock = CountingSocket(self.sock)
+
+    def _new_conn(self) -> socket.socket:
+        timer = current_timer()
+        if timer is None:
+            return super()._new_conn()
+        host = self._dns_host
+        start = time.perf_counter_ns()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            # Let urllib3 raise its own NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter_ns()
+        timer.add("dns", resolved - start)
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError:
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+        timer.add("connect", time.perf_counter_ns() - resolved)
+        return sock
+
+    def getresponse(self):
+        timer = current_timer()
+        start = time.perf_counter_ns()
+        response = super().getresponse()
+        if timer is not None:
+            timer.add("ttfb", time.perf_counter_ns() - start)
+        count_response()
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        timer = current_timer()
+        if timer is None:
+            return super().connect()
+        before = dict(timer.phases_ns)
+        start = time.perf_counter_ns()
+        super().connect()
+        elapsed = time.perf_counter_ns() - start
+        # Whatever connect() spent outside DNS and TCP connect is the handshake
+        socket_ns = sum(
+            timer.phases_ns.get(phase, 0) - before.get(phase, 0)
+            for phase in ("dns", "connect")
+        )
+        timer.add("tls", elapsed - socket_ns)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    An ``HTTPAdapter`` whose connections report phase timings.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def navigation_phases(entry) -> dict:
+    """
+    Converts a Navigation Timing entry into phase durations.
+
+    Args:
+        entry (dict): The result of ``PerformanceNavigationTiming.toJSON()``,
+            with timestamps in milliseconds.
+
+    Returns:
+        dict: Phase durations in nanoseconds; empty if ``entry`` is unusable.
+    """
+    if not isinstance(entry, dict):
+        return {}
+
+    def span(start_key, end_key):
+        start, end = entry.get(start_key) or 0, entry.get(end_key) or 0
+        return int(max(end - start, 0) * 1_000_000)
+
+    phases = {
+        "dns": span("domainLookupStart", "domainLookupEnd"),
+        "ttfb": span("requestStart", "responseStart"),
+        "body": span("responseStart", "responseEnd"),
+    }
+    if entry.get("secureConnectionStart"):
+        phases["connect"] = span("connectStart", "secureConnectionStart")
+        phases["tls"] = span("secureConnectionStart", "connectEnd")
+    else:
+        phases["connect"] = span("connectStart", "connectEnd")
+    if entry.get("loadEventEnd"):
+        phases[RENDER_PHASE] = span("responseEnd", "loadEventEnd")
+    return phases
@@ -0,0 +1,359 @@
+"""
+Transfer-Size Accounting
+------------------------
+Records what each sample costs in bandwidth, next to what it costs in time.
+
+For the requests path, bytes are counted at the socket: every connection
+opened through ``TimedHTTPAdapter`` is wrapped in a ``CountingSocket`` that
+attributes sent and received bytes to the ``TransferCounter`` active on the
+current thread, the same way phase timings reach the ``PhaseTimer``. Counts
+include HTTP headers and chunk framing; on HTTPS they are taken above TLS, so
+record and handshake overhead is not included.
+
+For the browser paths, sizes come from Resource Timing: the navigation entry
+and every subresource report ``transferSize`` (headers plus encoded body),
+``encodedBodySize`` and ``decodedBodySize``. Cross-origin resources served
+without ``Timing-Allow-Origin`` report zero.
+
+``run_encoding_comparison`` fetches a URL with each ``Accept-Encoding``
+variant, with decompression timed as its own phase, so bytes saved can be
+weighed against decode CPU.
+"""
+
+import gzip
+import io
+import logging
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+
+ENCODINGS = ("identity", "gzip", "deflate")
+DEFAULT_ENCODING_SAMPLES = 10
+ENCODINGS_FILENAME = "encodings.png"
+# Sizes of the document and every subresource, as [type, transfer, encoded, decoded]
+RESOURCE_SIZES_SCRIPT = (
+    "return performance.getEntriesByType('navigation')"
+    ".concat(performance.getEntriesByType('resource'))"
+    ".map(entry => [entry.initiatorType, entry.transferSize || 0,"
+    " entry.encodedBodySize || 0, entry.decodedBodySize || 0]);"
+)
+
+_local = threading.local()
+
+
+@dataclass
+class TransferCounter:
+    """
+    Bytes and requests sent on the current thread while the counter is active.
+
+    Attributes:
+        bytes_sent (int): Bytes written to sockets, request lines and headers included.
+        bytes_received (int): Bytes read from sockets, response headers included.
+        requests (int): Responses received, so redirects and retries count.
+    """
+
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    requests: int = 0
+
+    def metrics(self) -> dict:
+        """
+        Returns the counts as ``FetchRecord`` metrics.
+        """
+        return {
+            "wire_bytes": self.bytes_received,
+            "wire_bytes_sent": self.bytes_sent,
+            "request_count": self.requests,
+        }
+
+
+@contextmanager
+def transfer_counter():
+    """
+    Activates a ``TransferCounter`` for requests made on the current thread.
+
+    Yields:
+        TransferCounter: The counter receiving byte counts.
+    """
+    counter = TransferCounter()
+    previous = getattr(_local, "counter", None)
+    _local.counter = counter
+    try:
+        yield counter
+    finally:
+        _local.counter = previous
+
+
+def current_counter() -> TransferCounter | None:
+    """
+    Returns the active ``TransferCounter`` for this thread, if any.
+    """
+    return getattr(_local, "counter", None)
+
+
+class _CountingReader(io.RawIOBase):
+    def __init__(self, raw):
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int | None:
+        count = self._raw.readinto(buffer)
+        counter = current_counter()
+        if counter is not None and count:
+            counter.bytes_received += count
+        return count
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+class CountingSocket:
+    """
+    Wraps a connected socket, counting the bytes that cross it.
+
+    Only the calls ``http.client`` makes are intercepted: ``sendall`` for
+    requests and ``makefile`` for responses. Everything else is delegated.
+
+    Args:
+        sock (socket.socket): A connected socket, possibly TLS-wrapped.
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+    def sendall(self, data, *args) -> None:
+        counter = current_counter()
+        if counter is not None:
+            counter.bytes_sent += memoryview(data).nbytes
+        return self._sock.sendall(data, *args)
+
+    def makefile(self, mode: str = "r", buffering=None, **kwargs):
+        if mode != "rb":
+            return self._sock.makefile(mode, buffering, **kwargs)
+        # Count below the buffer, so read-ahead is counted when it arrives
+        raw = _CountingReader(self._sock.makefile("rb", buffering=0))
+        return io.BufferedReader(raw, buffering or io.DEFAULT_BUFFER_SIZE)
+
+
+def count_response() -> None:
+    """
+    Counts one response against the active counter, if any.
+    """
+    counter = current_counter()
+    if counter is not None:
+        counter.requests += 1
+
+
+def resource_sizes(entries) -> dict:
+    """
+    Totals Resource Timing sizes into ``FetchRecord`` metrics.
+
+    Args:
+        entries (list): Output of ``RESOURCE_SIZES_SCRIPT``.
+
+    Returns:
+        dict: ``wire_bytes``, ``encoded_bytes``, ``decoded_bytes`` and
+            ``request_count`` over every entry, plus ``wire_bytes.<type>`` per
+            initiator type; empty if ``entries`` is unusable.
+    """
+    if not isinstance(entries, list):
+        return {}
+    metrics = {"wire_bytes": 0, "encoded_bytes": 0, "decoded_bytes": 0}
+    by_type = {}
+    for initiator, transfer, encoded, decoded in entries:
+        metrics["wire_bytes"] += transfer
+        metrics["encoded_bytes"] += encoded
+        metrics["decoded_bytes"] += decoded
+        by_type[initiator] = by_type.get(initiator, 0) + transfer
+    metrics["request_count"] = len(entries)
+    metrics.update({f"wire_bytes.{name}": size for name, size in by_type.items()})
+    return metrics
+
+
+def format_transfer(metrics: dict) -> str:
+    """
+    Formats the transfer metrics of a series' means as a summary.
+
+    Returns:
+        str: e.g. ``"wire=12.3KiB decoded=40.1KiB requests=3.0"``; empty
+            without transfer metrics.
+    """
+    parts = []
+    if "wire_bytes" in metrics:
+        parts.append(f"wire={metrics['wire_bytes'] / 1024:.1f}KiB")
+    if "wire_bytes_sent" in metrics:
+        parts.append(f"sent={metrics['wire_bytes_sent'] / 1024:.1f}KiB")
+    if "decoded_bytes" in metrics:
+        parts.append(f"decoded={metrics['decoded_bytes'] / 1024:.1f}KiB")
+    if "request_count" in metrics:
+        parts.append(f"requests={metrics['request_count']:.1f}")
+    return " ".join(parts)
+
+
+def decode_body(body: bytes, encoding: str) -> bytes:
+    """
+    Decodes a body sent with a ``Content-Encoding``.
+
+    Raises:
+        ValueError: For encodings other than ``ENCODINGS``.
+    """
+    if encoding in ("", "identity"):
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        # Servers disagree on whether deflate carries the zlib wrapper
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+@dataclass
+class EncodingResult:
+    """
+    Samples collected with one ``Accept-Encoding`` value.
+
+    Attributes:
+        encoding (str): The requested encoding.
+        records (list of FetchRecord): Samples taken with it.
+    """
+
+    encoding: str
+    records: list = field(default_factory=list)
+
+    @property
+    def median_latency(self) -> float:
+        """float: Median sample duration in seconds."""
+        return float(np.median([record.duration for record in self.records]))
+
+    def mean(self, metric: str) -> float:
+        """
+        Returns the mean of a metric over the samples; NaN if never reported.
+        """
+        values = [r.metrics[metric] for r in self.records if metric in r.metrics]
+        return float(np.mean(values)) if values else float("nan")
+
+
+def run_encoding_comparison(url: str, encodings, samples: int, measure) -> list:
+    """
+    Fetches a URL with each encoding in turn over one keep-alive session.
+
+    Encodings are interleaved sample by sample, so drift in the network or
+    server affects them alike. The first round is discarded as warmup.
+
+    Args:
+        url (str): URL to fetch.
+        encodings (iterable of str): ``Accept-Encoding`` values to compare.
+        samples (int): Samples per encoding.
+        measure (callable): Called with ``url``, an encoding and the session
+            to take one sample, e.g. ``measure_encoding``.
+
+    Returns:
+        list of EncodingResult: One result per encoding, in order.
+    """
+    from selenium_v_requests_comparison.session import KeepAliveSession
+
+    results = [EncodingResult(encoding) for encoding in encodings]
+    with KeepAliveSession(pool_size=1) as session:
+        for round_index in range(samples + 1):
+            for result in results:
+                record = measure(url, result.encoding, session)
+                if round_index:
+                    result.records.append(record)
+    return results
+
+
+def compare_encodings(results) -> list:
+    """
+    Computes the bytes each encoding saves over ``identity`` and its decode cost.
+
+    Args:
+        results (list of EncodingResult): Results, usually including ``identity``.
+
+    Returns:
+        list of dict: Per encoding ``name``, ``used`` (what the server sent),
+            ``median_latency``, ``wire_bytes``, ``decoded_bytes``, ``ratio``,
+            ``decode_ms``, ``decode_cpu_ms`` and ``bytes_saved``; savings are
+            NaN without an identity result, and the ratio is NaN for empty or
+            unmeasured bodies.
+    """
+    identity = next((r for r in results if r.encoding == "identity"), None)
+    rows = []
+    for result in results:
+        wire, decoded = result.mean("wire_bytes"), result.mean("decoded_bytes")
+        encoded = result.mean("encoded_bytes")
+        decode_ns = np.mean(
+            [record.phases_ns.get("decode", 0) for record in result.records]
+        )
+        rows.append(
+            {
+                "name": result.encoding,
+                "used": ",".join(
+                    sorted({r.tags.get("encoding", "") for r in result.records})
+                ),
+                "median_latency": result.median_latency,
+                "wire_bytes": wire,
+                "decoded_bytes": decoded,
+                # An empty body has no compression ratio
+                "ratio": decoded / encoded if encoded else float("nan"),
+                "decode_ms": decode_ns / 1e6,
+                "decode_cpu_ms": result.mean("decode_cpu_ns") / 1e6,
+                "bytes_saved": (
+                    identity.mean("wire_bytes") - wire if identity else float("nan")
+                ),
+            }
+        )
+    return rows
+
+
+def format_encoding_row(row: dict) -> str:
+    """
+    Formats one row of ``compare_encodings`` as a summary line.
+    """
+    used = f" (server sent {row['used']})" if row["used"] != row["name"] else ""
+    return (
+        f"{row['name']}{used}: median={row['median_latency'] * 1000:.1f}ms "
+        f"wire={row['wire_bytes'] / 1024:.1f}KiB "
+        f"({row['bytes_saved'] / 1024:+.1f}KiB saved, {row['ratio']:.1f}x) "
+        f"decode={row['decode_ms']:.2f}ms ({row['decode_cpu_ms']:.2f}ms CPU)"
+    )
+
+
+def plot_encodings(rows, filename: str = ENCODINGS_FILENAME):
+    """
+    Plots median latency, wire KiB and decode CPU per encoding as bar charts.
+
+    Args:
+        rows (list of dict): Output of ``compare_encodings``.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    names = [row["name"] for row in rows]
+    positions = range(len(rows))
+    fig, axes = plt.subplots(1, 3, figsize=(14, 5))
+    panels = (
+        ("Median latency (ms)", [row["median_latency"] * 1000 for row in rows]),
+        ("On the wire (KiB)", [row["wire_bytes"] / 1024 for row in rows]),
+        ("Decode CPU (ms)", [row["decode_cpu_ms"] for row in rows]),
+    )
+    for ax, (title, values) in zip(axes, panels):
+        ax.bar(positions, values)
+        ax.set_title(title)
+        ax.set_xticks(list(positions))
+        ax.set_xticklabels(names)
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
+    logging.debug(f"Saved encoding comparison to {filename}")
@@ -0,0 +1,326 @@
+"""
+Parallel Selenium Workers
+-------------------------
+Spreads Selenium samples across several worker processes, each keeping its
+own warm Chrome session with an isolated ``--user-data-dir``. The debugging
+and chromedriver ports come from a per-worker block so concurrently launched
+browsers never race for the same port.
+
+Running the same workload at increasing worker counts shows where adding
+Chrome instances stops improving pages per minute.
+"""
+
+import logging
+import multiprocessing
+import queue
+import socket
+import time
+from dataclasses import dataclass, field
+
+DEFAULT_WORKER_LEVELS = (1, 2, 4)
+DEFAULT_WORKER_SAMPLES = 20
+# Worker N allocates debugging ports from [base + N * block, base + (N + 1) * block)
+DEFAULT_BASE_PORT = 9300
+DEFAULT_PORT_BLOCK = 50
+WORKER_SCALING_FILENAME = "worker_scaling.png"
+
+
+class PortAllocator:
+    """
+    Hands out debugging ports from a block reserved for a single worker.
+
+    Blocks never overlap between workers, so two workers cannot pick the same
+    port even when their browsers start at the same moment. Within the block,
+    ports still in use by other programs are skipped.
+
+    Args:
+        worker_index (int): Index of the worker owning the block.
+        base_port (int): First port of worker 0's block.
+        block_size (int): Number of ports reserved per worker.
+    """
+
+    def __init__(
+        self,
+        worker_index: int,
+        base_port: int = DEFAULT_BASE_PORT,
+        block_size: int = DEFAULT_PORT_BLOCK,
+    ):
+        self.first_port = base_port + worker_index * block_size
+        self.block_size = block_size
+        self._offset = 0
+
+    @property
+    def ports(self) -> range:
+        """range: Every port in this allocator's block."""
+        return range(self.first_port, self.first_port + self.block_size)
+
+    def next_port(self) -> int:
+        """
+        Returns the next port in the block that is currently free.
+
+        Raises:
+            RuntimeError: If every port in the block is in use.
+        """
+        for _ in range(self.block_size):
+            port = self.first_port + self._offset
+            self._offset = (self._offset + 1) % self.block_size
+            if _port_is_free(port):
+                return port
+        raise RuntimeError(f"No free port in {self.ports}.")
+
+
+def _port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("127.0.0.1", port))
+        except OSError:
+            return False
+    return True
+
+
+@dataclass
+class ParallelResult:
+    """
+    Outcome of running Selenium samples across a number of worker processes.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        elapsed (float): Wall time from the first sample to the last, in seconds.
+        records (list of FetchRecord): Every sample, tagged with its worker index.
+        errors (int): Samples or browser start-ups that raised inside a worker.
+    """
+
+    workers: int
+    elapsed: float
+    records: list = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def pages_per_minute(self) -> float:
+        """float: Completed samples per minute across all workers."""
+        return len(self.records) / self.elapsed * 60 if self.elapsed else 0.0
+
+    def per_worker_latency(self) -> dict:
+        """
+        Returns each worker's mean sample duration in seconds.
+        """
+        durations = {}
+        for record in self.records:
+            durations.setdefault(record.tags["worker"], []).append(record.duration)
+        return {
+            worker: sum(values) / len(values)
+            for worker, values in sorted(durations.items())
+        }
+
+
+def _selenium_worker(
+    worker_index, base_port, chrome_path, readiness, driver_options, tasks, results
+) -> None:
+    # Imported here so worker processes started with "spawn" resolve it themselves
+    from selenium_v_requests_comparison import comparison
+    from selenium_v_requests_comparison.pool import WebDriverPool
+
+    if chrome_path:
+        comparison.CHROME_EXECUTABLE_PATH = chrome_path
+        comparison.IS_CHROME_INSTALLED = True
+    allocator = PortAllocator(worker_index, base_port)
+    performance_log = readiness is not None and readiness.needs_performance_log
+
+    def driver_factory(profile_dir):
+        return comparison.start_chrome(
+            profile_dir,
+            performance_log=performance_log,
+            debugging_port=allocator.next_port(),
+            service_port=allocator.next_port(),
+            **(driver_options or {}),
+        )
+
+    pool = WebDriverPool(1, driver_factory)
+    try:
+        pool.start()
+        results.put(("ready", worker_index, None))
+        while (url := tasks.get()) is not None:
+            try:
+                record = comparison.measure_selenium(
+                    url, pool=pool, readiness=readiness
+                )
+            except Exception as e:
+                logging.exception(f"Worker {worker_index} failed to fetch {url}.")
+                results.put(("error", worker_index, repr(e)))
+                continue
+            record.tags["worker"] = worker_index
+            results.put(("record", worker_index, record))
+    except Exception as e:
+        logging.exception(f"Worker {worker_index} failed to start.")
+        results.put(("error", worker_index, repr(e)))
+    finally:
+        pool.close()
+        results.put(("done", worker_index, None))
+
+
+def _next_message(results, processes):
+    # Returns None once every worker has died without reporting back
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                return None
+
+
+def run_parallel_selenium(
+    urls,
+    workers: int,
+    readiness=None,
+    base_port: int = DEFAULT_BASE_PORT,
+    chrome_path: str = "",
+    driver_options: dict | None = None,
+) -> ParallelResult:
+    """
+    Measures every URL with Selenium, spread over ``workers`` processes.
+
+    Each worker launches its browser before the clock starts, so the result
+    reflects steady-state capacity rather than start-up cost.
+
+    Args:
+        urls (list of str): URLs to load, one sample each.
+        workers (int): Number of worker processes.
+        readiness (Readiness, optional): When to consider a page loaded.
+        base_port (int): First debugging port of worker 0's block.
+        chrome_path (str): Chrome binary for workers to use.
+        driver_options (dict, optional): Extra ``start_chrome`` arguments,
+            e.g. ``page_load_strategy`` and ``blocked_urls``.
+
+    Returns:
+        ParallelResult: Records from every worker and the achieved rate.
+    """
+    tasks, results = multiprocessing.Queue(), multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_selenium_worker,
+            args=(
+                index,
+                base_port,
+                chrome_path,
+                readiness,
+                driver_options,
+                tasks,
+                results,
+            ),
+            daemon=True,
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    result = ParallelResult(workers, 0.0)
+    running = workers
+    ready = 0
+    # Wait until every browser is up before handing out work
+    while ready + result.errors < workers:
+        message = _next_message(results, processes)
+        if message is None:
+            break
+        kind, index, payload = message
+        if kind == "ready":
+            ready += 1
+        elif kind == "error":
+            result.errors += 1
+        elif kind == "done":
+            running -= 1
+
+    start = time.perf_counter()
+    for url in urls:
+        tasks.put(url)
+    for _ in processes:
+        tasks.put(None)
+    while running:
+        message = _next_message(results, processes)
+        if message is None:
+            break
+        kind, index, payload = message
+        if kind == "record":
+            result.records.append(payload)
+        elif kind == "error":
+            result.errors += 1
+        elif kind == "done":
+            running -= 1
+    result.elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    return result
+
+
+def run_worker_scaling(
+    url: str,
+    levels=DEFAULT_WORKER_LEVELS,
+    samples: int = DEFAULT_WORKER_SAMPLES,
+    readiness=None,
+    chrome_path: str = "",
+    driver_options: dict | None = None,
+) -> list:
+    """
+    Runs ``run_parallel_selenium`` on the same workload at each worker count.
+
+    Args:
+        url (str): URL to load.
+        levels (iterable of int): Worker counts to test.
+        samples (int): Number of page loads per level.
+        readiness (Readiness, optional): When to consider a page loaded.
+        chrome_path (str): Chrome binary for workers to use.
+        driver_options (dict, optional): Extra ``start_chrome`` arguments.
+
+    Returns:
+        list of ParallelResult: One result per worker count, in order.
+    """
+    results = []
+    for workers in levels:
+        logging.debug(f"Running Selenium with {workers} worker processes...")
+        result = run_parallel_selenium(
+            [url] * samples,
+            workers,
+            readiness,
+            chrome_path=chrome_path,
+            driver_options=driver_options,
+        )
+        logging.info(format_parallel_result(result))
+        results.append(result)
+    return results
+
+
+def format_parallel_result(result: ParallelResult) -> str:
+    """
+    Formats a parallel run as a single summary line.
+    """
+    latencies = " ".join(
+        f"w{worker}={seconds:.2f}s"
+        for worker, seconds in result.per_worker_latency().items()
+    )
+    return (
+        f"workers={result.workers} pages/min={result.pages_per_minute:.1f} "
+        f"errors={result.errors} mean latency {latencies or 'n/a'}"
+    )
+
+
+def plot_worker_scaling(results, filename: str = WORKER_SCALING_FILENAME):
+    """
+    Plots pages per minute against the number of worker processes.
+
+    Args:
+        results (list of ParallelResult): Results from ``run_worker_scaling``.
+        filename (str): Where to save the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    ax.plot(
+        [result.workers for result in results],
+        [result.pages_per_minute for result in results],
+        "o-",
+    )
+    ax.set_xlabel("Worker processes")
+    ax.set_ylabel("Pages per minute")
+    ax.set_title("Selenium Worker Scaling")
+    fig.savefig(filename)
+    plt.close(fig)
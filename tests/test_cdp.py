@@ -0,0 +1,161 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from unittest.mock import patch, MagicMock
+import pytest
+
+from selenium_v_requests_comparison.cdp import (
+    DEVTOOLS_PORT_FILENAME,
+    CDPBrowser,
+    CDPConnection,
+    CDPError,
+    as_expression,
+    read_devtools_port,
+)
+from selenium_v_requests_comparison.comparison import measure_cdp
+
+
+class FakeWebSocket:
+    """Answers commands with canned results and emits queued events."""
+
+    def __init__(self, results=None, events=None):
+        self.results = results or {}
+        self.events = events or {}
+        self.sent = []
+        self.incoming = []
+
+    def send(self, data):
+        message = json.loads(data)
+        self.sent.append(message)
+        self.incoming.extend(self.events.get(message["method"], []))
+        result = self.results.get(message["method"], {})
+        if isinstance(result, Exception):
+            self.incoming.append(
+                {"id": message["id"], "error": {"message": str(result)}}
+            )
+        else:
+            self.incoming.append({"id": message["id"], "result": result})
+
+    def recv(self):
+        if not self.incoming:
+            import websocket
+
+            raise websocket.WebSocketTimeoutException()
+        return json.dumps(self.incoming.pop(0))
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        pass
+
+
+def lifecycle(name, loader_id):
+    return {
+        "method": "Page.lifecycleEvent",
+        "params": {"name": name, "loaderId": loader_id},
+    }
+
+
+def connect(ws, timeout=1.0):
+    with patch("websocket.create_connection", return_value=ws):
+        return CDPConnection("ws://127.0.0.1:9222/devtools/page/1", timeout)
+
+
+def test_send_buffers_events_until_response():
+    ws = FakeWebSocket(
+        results={"Page.enable": {}}, events={"Page.enable": [lifecycle("load", "x")]}
+    )
+    connection = connect(ws)
+    assert connection.send("Page.enable") == {}
+    event = connection.wait_for_event(lambda m: m["method"] == "Page.lifecycleEvent")
+    assert event["params"]["name"] == "load"
+
+
+def test_send_raises_on_error():
+    connection = connect(FakeWebSocket(results={"Page.navigate": ValueError("boom")}))
+    with pytest.raises(CDPError):
+        connection.send("Page.navigate", {"url": "x"})
+
+
+def test_wait_for_event_times_out():
+    connection = connect(FakeWebSocket())
+    with pytest.raises(TimeoutError):
+        connection.wait_for_event(lambda m: True, timeout=0.01)
+
+
+def test_navigate_waits_for_lifecycle_of_new_document():
+    ws = FakeWebSocket(
+        results={"Page.navigate": {"frameId": "f", "loaderId": "new"}},
+        events={
+            "Page.navigate": [
+                lifecycle("load", "old"),
+                lifecycle("DOMContentLoaded", "new"),
+                lifecycle("load", "new"),
+            ]
+        },
+    )
+    browser = CDPBrowser("chrome", profile_dir="/tmp")
+    browser.connection = connect(ws)
+    assert browser.navigate("http://example.com", "load", timeout=1.0) is True
+    assert browser.navigate("http://example.com", "networkIdle", timeout=0.01) is False
+
+
+def test_evaluate_returns_value_and_raises_on_exception():
+    ws = FakeWebSocket(results={"Runtime.evaluate": {"result": {"value": [1, 2]}}})
+    browser = CDPBrowser("chrome", profile_dir="/tmp")
+    browser.connection = connect(ws)
+    assert browser.evaluate("[1, 2]") == [1, 2]
+    ws.results["Runtime.evaluate"] = {"exceptionDetails": {"text": "Uncaught"}}
+    with pytest.raises(CDPError):
+        browser.evaluate("throw 1")
+
+
+def test_read_devtools_port(tmp_path):
+    assert read_devtools_port(str(tmp_path)) is None
+    (tmp_path / DEVTOOLS_PORT_FILENAME).write_text("40123\n/devtools/browser/abc\n")
+    assert read_devtools_port(str(tmp_path)) == 40123
+
+
+def test_as_expression_wraps_return_script():
+    assert as_expression("return 1;") == "(() => { return 1; })()"
+
+
+def test_failed_start_removes_temporary_profile():
+    browser = CDPBrowser("/bin/false")
+    profile_dir = browser.profile_dir
+    with pytest.raises(RuntimeError):
+        browser.start()
+    assert not os.path.exists(profile_dir)
+    assert browser.process is None
+
+
+def test_measure_cdp_closes_browser_that_failed_to_start():
+    with patch("selenium_v_requests_comparison.comparison.CDPBrowser") as browser_cls:
+        browser_cls.return_value.start.side_effect = TimeoutError("no page")
+        with pytest.raises(TimeoutError):
+            measure_cdp("http://example.com")
+    browser_cls.return_value.close.assert_called_once()
+
+
+def test_measure_cdp_with_warm_browser():
+    browser = MagicMock()
+    browser.process.pid = None
+    browser.navigate.return_value = True
+    browser.evaluate.side_effect = [
+        ["Job 0", "Job 1"],
+        {"responseStatus": 200},
+        [["navigation", 1300, 1000, 4000], ["script", 500, 200, 600]],
+    ]
+    record = measure_cdp("http://example.com", browser)
+    assert record.method == "cdp"
+    assert record.status == 200
+    assert record.metrics["wire_bytes"] == 1800
+    assert record.metrics["wire_bytes.script"] == 500
+    assert record.metrics["request_count"] == 2
+    assert record.tags == {"readiness": "load", "ready": True, "session": "warm"}
+    assert record.metrics["time_to_ready_ns"] <= record.total_ns
+    browser.navigate.assert_called_once_with("http://example.com", "load", 10.0)
+    browser.close.assert_not_called()
@@ -75,25 +75,29 @@ def test_install_chrome_if_needed_not_found():
             mock_exit.assert_called_once_with(1)
 
 
-@patch("selenium_v_requests_comparison.comparison.webdriver.Chrome")
-@patch("selenium_v_requests_comparison.comparison.ChromeDriverManager")
+@patch("selenium.webdriver.Chrome")
+@patch("selenium_v_requests_comparison.comparison.resolve_chromedriver")
 @patch("selenium_v_requests_comparison.comparison.get_free_port")
 @patch("selenium_v_requests_comparison.comparison.tempfile.TemporaryDirectory")
 def test_measure_selenium(
-    mock_temp_dir, mock_get_free_port, mock_chrome_driver_manager, mock_webdriver_chrome
+    mock_temp_dir, mock_get_free_port, mock_resolve_chromedriver, mock_webdriver_chrome
 ):
     SELENIUM_URL = "https://example.com"
     mock_temp_dir.return_value.__enter__.return_value = "/tmp/fake_profile_dir"
     mock_get_free_port.return_value = 9222
-    mock_service = MagicMock()
-    mock_chrome_driver_manager.return_value.install.return_value = mock_service
+    mock_resolve_chromedriver.return_value = "/usr/bin/chromedriver"
     mock_driver = MagicMock()
     mock_webdriver_chrome.return_value = mock_driver
     mock_driver.find_elements.return_value = [MagicMock(), MagicMock()]
-
-    duration = measure_selenium(SELENIUM_URL)
-    # Assert the duration is roughly equal to the 5-second sleep (with tolerance)
-    assert 4.5 <= duration <= 7.0
+    mock_driver.execute_script.return_value = "complete"
+
+    record = measure_selenium(SELENIUM_URL)
+    # The page is ready immediately, so no fixed sleep should be paid
+    assert 0 <= record.duration < 1.0
+    assert record.method == "selenium"
+    assert record.tags["readiness"] == "ready-state"
+    assert record.tags["ready"] is True
+    assert record.metrics["time_to_ready_ns"] <= record.total_ns
     mock_driver.get.assert_called_once_with(SELENIUM_URL)
     mock_driver.quit.assert_called_once()
     mock_driver.find_elements.assert_called_once_with(
@@ -101,31 +105,45 @@ def test_measure_selenium(
     )
 
 
-@patch("selenium_v_requests_comparison.comparison.requests.get")
-def test_measure_requests_success(mock_get):
+@patch("selenium_v_requests_comparison.comparison.KeepAliveSession")
+def test_measure_requests_success(mock_session_cls):
     API_URL = "https://catfact.ninja/fact"
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_get.return_value = mock_response
+    mock_session = mock_session_cls.return_value
+    mock_session.get.return_value = mock_response
 
     start_time = time.time()
-    duration = measure_requests(API_URL)
+    record = measure_requests(API_URL)
     end_time = time.time()
 
-    assert 0 <= duration <= (end_time - start_time)
-    mock_get.assert_called_once_with(API_URL)
+    assert 0 <= record.duration <= (end_time - start_time)
+    assert record.status == 200
+    assert "body" in record.phases_ns
+    mock_session.get.assert_called_once_with(API_URL, stream=True)
+    mock_session.close.assert_called_once()
 
 
-@patch("selenium_v_requests_comparison.comparison.requests.get")
-def test_measure_requests_failure(mock_get):
+@patch("selenium_v_requests_comparison.comparison.KeepAliveSession")
+def test_measure_requests_failure(mock_session_cls):
     API_URL = "https://catfact.ninja/fact"
     mock_response = MagicMock()
     mock_response.status_code = 404
-    mock_get.return_value = mock_response
+    mock_session = mock_session_cls.return_value
+    mock_session.get.return_value = mock_response
 
     start_time = time.time()
-    duration = measure_requests(API_URL)
+    record = measure_requests(API_URL)
     end_time = time.time()
 
-    assert 0 <= duration <= (end_time - start_time)
-    mock_get.assert_called_once_with(API_URL)
+    assert 0 <= record.duration <= (end_time - start_time)
+    assert record.status == 404
+    mock_session.get.assert_called_once_with(API_URL, stream=True)
+
+
+@patch("selenium_v_requests_comparison.comparison.KeepAliveSession")
+def test_measure_requests_charges_only_its_thread_cpu(mock_session_cls):
+    mock_session_cls.return_value.get.return_value.status_code = 200
+    with patch.object(time, "thread_time", side_effect=[1.0, 1.25]):
+        record = measure_requests("https://catfact.ninja/fact")
+    assert record.metrics["cpu_seconds"] == 0.25
@@ -0,0 +1,174 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import threading
+import pytest
+import requests
+
+from selenium_v_requests_comparison.distributed import (
+    AgentClient,
+    Coordinator,
+    agent_summary,
+    estimate_clock_offset,
+    run_agent,
+)
+from selenium_v_requests_comparison.experiment import Experiment
+from selenium_v_requests_comparison.metrics import (
+    ErrorBudget,
+    MetricsRegistry,
+    RunAborted,
+)
+from selenium_v_requests_comparison.store import ResultStore, load_series
+from selenium_v_requests_comparison.timing import FetchRecord
+
+LABELS = ("API - Requests", "Text - Requests")
+
+
+def experiment(samples=4, warmup=1):
+    return Experiment(
+        name="scale-out",
+        targets={"API": "http://api", "Text": "http://text"},
+        methods={"requests": {}},
+        samples=samples,
+        warmup=warmup,
+        seed=7,
+    )
+
+
+def measures(seconds=0.001):
+    return {
+        label: lambda: FetchRecord(
+            "requests", "http://x", int(seconds * 1e9), status=200
+        )
+        for label in LABELS
+    }
+
+
+def start_agents(url, count, make_measures=measures):
+    results, threads = {}, []
+
+    def agent(name):
+        client = AgentClient(url, name)
+        plan = client.register()
+        results[client.agent_id] = run_agent(client, make_measures(), plan.warmup)
+        client.close()
+
+    for index in range(count):
+        thread = threading.Thread(target=agent, args=(f"agent{index}",))
+        thread.start()
+        threads.append(thread)
+    return results, threads
+
+
+def test_estimate_clock_offset_uses_fastest_round_trip():
+    probes = [(0, 1_000_500, 2_000), (10_000, 1_010_100, 10_200)]
+    assert estimate_clock_offset(probes) == (1_000_000, 200)
+
+
+def test_agents_share_the_campaign(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with (
+        ResultStore(path) as store,
+        Coordinator(
+            experiment(),
+            on_result=lambda label, record, warmup, agent: store.append(
+                label, record, warmup, agent
+            ),
+            on_agent=store.append_agent,
+            port=0,
+        ) as coordinator,
+    ):
+        results, threads = start_agents(coordinator.url, 3)
+        sample_sets = coordinator.wait(timeout=30)
+        assert coordinator.status()["completed"] == coordinator.total == 8
+    for thread in threads:
+        thread.join(timeout=10)
+    assert sorted(results) == ["agent0", "agent1", "agent2"]
+    assert [len(sample_sets[label]) for label in LABELS] == [4, 4]
+    # Every agent warms each cell up once
+    assert [sample_sets[label].warmup for label in LABELS] == [3, 3]
+    assert sum(len(s) for r in results.values() for s in r.values()) == 8
+    assert [len(series) for series in load_series(path, split=False).values()] == [
+        4,
+        4,
+    ]
+    summary = agent_summary(path)
+    assert set(summary) == set(results)
+    assert sum(agent["samples"] for agent in summary.values()) == 8
+
+
+def test_expired_lease_is_requeued():
+    with Coordinator(experiment(samples=1, warmup=0), port=0, lease_timeout=0.2) as c:
+        lost = AgentClient(c.url, "lost")
+        lost.register()
+        unit = lost.lease()
+        assert len(unit["runs"]) == 2
+        results, threads = start_agents(c.url, 1)
+        sample_sets = c.wait(timeout=10)
+        # The lost agent's late sample is a duplicate and is dropped
+        index, label = unit["runs"][0]
+        record = FetchRecord("requests", "http://x", 1, status=200)
+        assert lost.send(label, record, unit=unit["unit"], index=index) is False
+    threads[0].join(timeout=10)
+    assert [len(sample_sets[label]) for label in LABELS] == [1, 1]
+
+
+def broken_text_measures():
+    # The Text method fails on every agent, as if its browser were missing
+    return {**measures(), "Text - Requests": lambda: None}
+
+
+def test_runs_that_keep_failing_are_dropped():
+    with Coordinator(
+        experiment(), port=0, lease_timeout=0.2, max_attempts=2
+    ) as coordinator:
+        results, threads = start_agents(coordinator.url, 2, broken_text_measures)
+        sample_sets = coordinator.wait(timeout=30)
+        status = coordinator.status()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert status["completed"] == 4
+    assert status["dropped"] == 4
+    assert [len(sample_sets[label]) for label in LABELS] == [4, 0]
+    # Two failed attempts per scheduled run plus one failed warmup per agent
+    assert sample_sets["Text - Requests"].errors == 4 * 2 + 2
+
+
+def test_agent_errors_feed_the_error_budget():
+    registry = MetricsRegistry()
+    budget = ErrorBudget(registry, max_rate=0.5, min_samples=2)
+
+    def on_error(label, warmup, agent):
+        registry.observe_error(label)
+        budget.check(label)
+
+    with Coordinator(experiment(), on_error=on_error, port=0) as coordinator:
+        results, threads = start_agents(coordinator.url, 1, broken_text_measures)
+        with pytest.raises(RunAborted):
+            coordinator.wait(timeout=10)
+    for thread in threads:
+        thread.join(timeout=10)
+    assert registry.failure_rate("Text - Requests") == (2, 2)
+
+
+def test_on_result_error_stops_agents_and_is_raised():
+    def abort(label, record, warmup, agent):
+        if not warmup:
+            raise RunAborted("too many failures")
+
+    with Coordinator(experiment(), on_result=abort, port=0) as coordinator:
+        results, threads = start_agents(coordinator.url, 2)
+        with pytest.raises(RunAborted):
+            coordinator.wait(timeout=10)
+    for thread in threads:
+        thread.join(timeout=10)
+    assert sum(len(s) for r in results.values() for s in r.values()) <= 2
+
+
+def test_unknown_agent_and_endpoint_are_rejected():
+    with Coordinator(experiment(), port=0) as coordinator:
+        response = requests.post(coordinator.url + "/lease", json={"agent": "ghost"})
+        assert response.status_code == 400
+        assert requests.get(coordinator.url + "/nope").status_code == 404
+        assert requests.get(coordinator.url + "/status").json()["total"] == 8
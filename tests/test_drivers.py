@@ -0,0 +1,122 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from unittest.mock import patch
+import pytest
+
+from selenium_v_requests_comparison import drivers
+from selenium_v_requests_comparison.drivers import (
+    DRIVER_PATH_ENV,
+    UNKNOWN_VERSION,
+    chrome_version,
+    clear_resolved,
+    find_chrome,
+    load_cache,
+    parse_version,
+    resolve_chromedriver,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_process(monkeypatch):
+    monkeypatch.delenv(DRIVER_PATH_ENV, raising=False)
+    clear_resolved()
+    yield
+    clear_resolved()
+
+
+@pytest.fixture
+def chrome(tmp_path):
+    # A fake Chrome that only answers --version
+    binary = tmp_path / "google-chrome"
+    binary.write_text("#!/bin/sh\necho 'Google Chrome 120.0.6099.109'\n")
+    binary.chmod(0o755)
+    return str(binary)
+
+
+def test_parse_version():
+    assert parse_version("Google Chrome 120.0.6099.109 \n") == "120.0.6099.109"
+    assert parse_version("Chromium 119.0.6045.159 snap") == "119.0.6045.159"
+    assert parse_version("") == UNKNOWN_VERSION
+
+
+def test_find_chrome_checks_linux_commands():
+    with (
+        patch("os.path.exists", return_value=False),
+        patch(
+            "shutil.which",
+            side_effect=lambda c: "/usr/bin/chromium" if c == "chromium" else None,
+        ),
+    ):
+        assert find_chrome([]) == "/usr/bin/chromium"
+
+
+def test_chrome_version_is_cached_by_mtime(chrome):
+    cache = load_cache("/nonexistent")
+    assert chrome_version(chrome, cache) == "120.0.6099.109"
+    with patch("subprocess.run") as mock_run:
+        assert chrome_version(chrome, cache) == "120.0.6099.109"
+    mock_run.assert_not_called()
+
+
+def test_windows_version_read_without_starting_chrome(tmp_path, monkeypatch):
+    binary = tmp_path / "chrome.exe"
+    binary.write_text("")
+    for name in ("119.0.6045.199", "120.0.6099.109", "SetupMetrics"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(sys, "platform", "win32")
+    with patch("subprocess.run") as mock_run:
+        assert chrome_version(str(binary), load_cache("/nonexistent")) == (
+            "120.0.6099.109"
+        )
+    mock_run.assert_not_called()
+
+
+def test_pinned_driver_path_wins(monkeypatch, chrome):
+    monkeypatch.setenv(DRIVER_PATH_ENV, "/opt/chromedriver")
+    with patch.object(drivers, "_download_driver") as mock_download:
+        assert resolve_chromedriver(chrome) == "/opt/chromedriver"
+    mock_download.assert_not_called()
+
+
+def test_download_is_persisted_and_reused(tmp_path, chrome):
+    cache_file = str(tmp_path / "cache.json")
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+    with patch.object(
+        drivers, "_download_driver", return_value=str(driver)
+    ) as mock_download:
+        assert resolve_chromedriver(chrome, cache_file=cache_file) == str(driver)
+        # Resolved once per process
+        assert resolve_chromedriver(chrome, cache_file=cache_file) == str(driver)
+        clear_resolved()
+        # A new process finds the driver in the on-disk cache, even offline
+        assert resolve_chromedriver(chrome, offline=True, cache_file=cache_file) == str(
+            driver
+        )
+    mock_download.assert_called_once_with(chrome)
+    with open(cache_file) as f:
+        assert json.load(f)["drivers"]["120.0.6099.109"] == str(driver)
+
+
+def test_offline_falls_back_to_path(tmp_path, chrome):
+    cache_file = str(tmp_path / "cache.json")
+    with (
+        patch.object(drivers, "_download_driver") as mock_download,
+        patch("shutil.which", return_value="/usr/bin/chromedriver"),
+    ):
+        assert (
+            resolve_chromedriver(chrome, offline=True, cache_file=cache_file)
+            == "/usr/bin/chromedriver"
+        )
+    mock_download.assert_not_called()
+
+
+def test_offline_without_driver_raises(tmp_path, chrome):
+    with patch("shutil.which", return_value=None):
+        with pytest.raises(RuntimeError):
+            resolve_chromedriver(
+                chrome, offline=True, cache_file=str(tmp_path / "c.json")
+            )
@@ -0,0 +1,178 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+from collections import Counter
+import pytest
+
+from selenium_v_requests_comparison.experiment import (
+    apply_to_args,
+    build_schedule,
+    load_experiment,
+    read_progress,
+    run_experiment,
+)
+from selenium_v_requests_comparison.timing import FetchRecord
+
+EXPERIMENT_TOML = """
+[experiment]
+name = "test"
+seed = 7
+samples = 3
+warmup = 1
+progress = "{progress}"
+
+[[targets]]
+name = "API"
+url = "/api/fact"
+
+[[targets]]
+name = "Text"
+url = "https://example.com"
+
+[methods.requests]
+keep_alive = true
+
+[methods.selenium]
+pool_size = 2
+samples = 2
+"""
+
+
+@pytest.fixture
+def experiment(tmp_path):
+    path = tmp_path / "experiment.toml"
+    path.write_text(EXPERIMENT_TOML.format(progress=tmp_path / "progress.jsonl"))
+    return load_experiment(str(path))
+
+
+def measures_for(experiment):
+    def measure(label):
+        return lambda: FetchRecord("requests", label, 1_000_000)
+
+    return {
+        label: measure(label)
+        for label in (
+            "API - Requests",
+            "API - Selenium",
+            "Text - Requests",
+            "Text - Selenium",
+        )
+    }
+
+
+def test_load_experiment(experiment):
+    assert experiment.name == "test"
+    assert experiment.budget("requests") == 3
+    assert experiment.budget("selenium") == 2
+    assert (
+        experiment.urls("http://127.0.0.1:8000")["API"]
+        == "http://127.0.0.1:8000/api/fact"
+    )
+    with pytest.raises(ValueError):
+        experiment.urls()
+
+
+def test_unknown_option_rejected(tmp_path):
+    path = tmp_path / "bad.toml"
+    path.write_text(
+        '[[targets]]\nname = "A"\nurl = "x"\n[methods.requests]\nturbo = true\n'
+    )
+    with pytest.raises(ValueError):
+        load_experiment(str(path))
+
+
+def test_conflicting_shared_option_rejected(tmp_path):
+    path = tmp_path / "conflict.toml"
+    methods = "[methods.selenium]\npool_size = 2\n[methods.cdp]\npool_size = {}\n"
+    path.write_text('[[targets]]\nname = "A"\nurl = "x"\n' + methods.format(1))
+    with pytest.raises(ValueError, match="pool-size"):
+        load_experiment(str(path))
+    path.write_text('[[targets]]\nname = "A"\nurl = "x"\n' + methods.format(2))
+    assert load_experiment(str(path)).methods["cdp"] == {"pool_size": 2}
+
+
+def test_apply_to_args(experiment):
+    args = argparse.Namespace(
+        methods=["cdp"], local_server=False, keep_alive=False, pool_size=0
+    )
+    apply_to_args(experiment, args)
+    assert args.methods == ["requests", "selenium"]
+    assert args.keep_alive is True
+    assert args.pool_size == 2
+
+
+def test_schedule_is_blocked_and_reproducible(experiment):
+    schedule = build_schedule(experiment, seed=1)
+    assert schedule == build_schedule(experiment, seed=1)
+    assert schedule != build_schedule(experiment, seed=2)
+    counts = Counter(run.label for run in schedule if not run.warmup)
+    assert counts == {
+        "API - Requests": 3,
+        "Text - Requests": 3,
+        "API - Selenium": 2,
+        "Text - Selenium": 2,
+    }
+    # Every block holds each remaining cell exactly once
+    for block in {run.block for run in schedule}:
+        labels = [run.label for run in schedule if run.block == block]
+        assert len(labels) == len(set(labels))
+    assert all(run.warmup for run in schedule if run.block == 0)
+
+
+def test_run_experiment_discards_warmup(experiment):
+    sample_sets = run_experiment(experiment, measures_for(experiment))
+    assert len(sample_sets["API - Requests"].records) == 3
+    assert sample_sets["API - Selenium"].warmup == 1
+    header, completed = read_progress(experiment.progress)
+    assert header["seed"] == 7
+    assert len(completed) == 14
+
+
+def test_resume_skips_completed_samples(experiment):
+    measures = measures_for(experiment)
+    calls = Counter()
+
+    def interrupting(label, limit):
+        def measure():
+            if sum(calls.values()) == limit:
+                raise KeyboardInterrupt
+            calls[label] += 1
+            return FetchRecord("requests", label, 1_000_000)
+
+        return measure
+
+    with pytest.raises(KeyboardInterrupt):
+        run_experiment(
+            experiment, {label: interrupting(label, 5) for label in measures}
+        )
+    # Simulate a line cut short by the interruption
+    with open(experiment.progress, "a") as f:
+        f.write('{"type": "sam')
+    calls.clear()
+    sample_sets = run_experiment(
+        experiment, {label: interrupting(label, -1) for label in measures}, resume=True
+    )
+    assert sum(calls.values()) == 14 - 5
+    assert sum(len(s.records) for s in sample_sets.values()) == 10
+    assert len(read_progress(experiment.progress)[1]) == 14
+
+
+def test_failed_samples_are_retried_on_resume(experiment):
+    measures = measures_for(experiment)
+    measures["Text - Selenium"] = lambda: None
+    sample_sets = run_experiment(experiment, measures)
+    failed = sample_sets["Text - Selenium"]
+    assert (len(failed), failed.warmup, failed.errors) == (0, 0, 3)
+    assert len(read_progress(experiment.progress)[1]) == 14 - 3
+    sample_sets = run_experiment(experiment, measures_for(experiment), resume=True)
+    assert len(sample_sets["Text - Selenium"]) == 2
+    assert len(read_progress(experiment.progress)[1]) == 14
+
+
+def test_resume_rejects_other_schedule(experiment):
+    run_experiment(experiment, measures_for(experiment))
+    experiment.seed = 8
+    with pytest.raises(ValueError):
+        run_experiment(experiment, measures_for(experiment), resume=True)
@@ -0,0 +1,131 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import io
+
+import pytest
+import requests
+
+from selenium_v_requests_comparison.comparison import measure_requests
+from selenium_v_requests_comparison.extraction import (
+    Selector,
+    SelectorExtractor,
+    extract_stream,
+)
+from selenium_v_requests_comparison.server import (
+    JOB_TITLE_CLASS,
+    BenchmarkServer,
+    ServerConfig,
+)
+from selenium_v_requests_comparison.session import KeepAliveSession
+
+PAGE = (
+    '<html><body><ul><li><a class="job card">Café <b>lead</b></a></li>'
+    '<li><a class="card">Other</a><br><img src="x.png"></li>'
+    '<li><a class="job" id="last">Engineer</a></li></ul></body></html>'
+).encode()
+
+
+def feed_in_chunks(extractor, data, size):
+    for start in range(0, len(data), size):
+        if extractor.feed_bytes(data[start : start + size]):
+            break
+    extractor.close()
+    return extractor.matches
+
+
+def test_selector_parse():
+    assert Selector.parse(".job") == Selector(classes=frozenset({"job"}))
+    assert Selector.parse("A.job.card#x") == Selector(
+        "a", frozenset({"job", "card"}), "x"
+    )
+    for selector in ("ul > li", "a[href]", "a:hover", ""):
+        with pytest.raises(ValueError):
+            Selector.parse(selector)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(PAGE)])
+def test_extracts_text_across_chunk_boundaries(chunk_size):
+    extractor = SelectorExtractor(".job")
+    assert feed_in_chunks(extractor, PAGE, chunk_size) == ["Café lead", "Engineer"]
+
+
+def test_compound_selectors_and_void_elements():
+    assert feed_in_chunks(SelectorExtractor("a#last"), PAGE, 16) == ["Engineer"]
+    assert feed_in_chunks(SelectorExtractor("li"), PAGE, 16) == [
+        "Café lead",
+        "Other",
+        "Engineer",
+    ]
+
+
+def test_limit_stops_after_enough_matches():
+    extractor = SelectorExtractor(".card", limit=1)
+    assert feed_in_chunks(extractor, PAGE, 8) == ["Café lead"]
+    assert extractor.done
+
+
+def stream_response(body, content_type):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response.raw = io.BytesIO(body)
+    return response
+
+
+@pytest.mark.parametrize(
+    "content_type, encoding",
+    [
+        ("text/html; charset=ISO-8859-1", "latin-1"),
+        ('text/html; charset="windows-1252"', "cp1252"),
+        ("text/html", "utf-8"),
+        ("text/html; charset=no-such-charset", "utf-8"),
+    ],
+)
+def test_extract_stream_decodes_declared_charset(content_type, encoding):
+    body = PAGE.decode().encode(encoding)
+    response = stream_response(body, content_type)
+    result = extract_stream(response, SelectorExtractor(".job"), chunk_size=7)
+    assert result.matches == ["Café lead", "Engineer"]
+
+
+@pytest.fixture
+def server():
+    config = ServerConfig(item_count=5, payload_size=256 * 1024)
+    with BenchmarkServer(config=config) as server:
+        yield server
+
+
+def test_measure_requests_extracts_whole_page(server):
+    record = measure_requests(
+        server.static_url,
+        extractor_factory=lambda: SelectorExtractor("." + JOB_TITLE_CLASS),
+    )
+    assert record.tags["extraction"] == "full"
+    assert record.metrics["matches"] == 5
+    assert record.metrics["bytes_read"] >= 256 * 1024
+    assert record.metrics["bytes_skipped"] == 0
+    assert record.phases_ns["extract"] > 0
+    assert sum(record.phases_ns.values()) <= record.total_ns
+
+
+def test_measure_requests_exits_early(server):
+    with KeepAliveSession() as session:
+        record = measure_requests(
+            server.static_url,
+            session=session,
+            extractor_factory=lambda: SelectorExtractor("." + JOB_TITLE_CLASS, 5),
+        )
+    assert record.tags["extraction"] == "early-exit"
+    assert record.metrics["matches"] == 5
+    assert record.metrics["bytes_skipped"] > 200 * 1024
+    assert record.metrics["bytes_read"] + record.metrics["bytes_skipped"] >= 256 * 1024
+
+
+def test_measure_requests_does_not_parse_json(server):
+    record = measure_requests(
+        server.api_url, extractor_factory=lambda: SelectorExtractor()
+    )
+    assert "extraction" not in record.tags
+    assert "extract" not in record.phases_ns
@@ -0,0 +1,128 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from selenium_v_requests_comparison import history
+from selenium_v_requests_comparison.history import (
+    archive_run,
+    compare_runs,
+    format_comparison,
+    list_runs,
+    resolve_baseline,
+    save_baseline,
+    trend,
+)
+from selenium_v_requests_comparison.store import ResultStore
+from selenium_v_requests_comparison.timing import FetchRecord
+
+
+def write_run(path, api_ms, cold_start_s=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    with ResultStore(str(path)) as store:
+        for ms in rng.normal(api_ms, api_ms * 0.02, 20):
+            record = FetchRecord("requests", "http://example.com", int(ms * 1e6))
+            store.append("API - Requests", record)
+        for seconds in rng.normal(cold_start_s, cold_start_s * 0.02, 10):
+            store.append_cold_start("Selenium cold start", float(seconds))
+    return str(path)
+
+
+def test_unchanged_run_passes(tmp_path):
+    baseline = write_run(tmp_path / "baseline.jsonl", 10, seed=1)
+    current = write_run(tmp_path / "current.jsonl", 10, seed=2)
+    comparisons = compare_runs(baseline, current)
+    assert [c.label for c in comparisons] == ["API - Requests", "Selenium cold start"]
+    assert not any(c.regressed for c in comparisons)
+
+
+def test_doubled_cold_start_regresses(tmp_path):
+    baseline = write_run(tmp_path / "baseline.jsonl", 10, 1.0, seed=1)
+    current = write_run(tmp_path / "current.jsonl", 10, 2.0, seed=2)
+    comparisons = {c.label: c for c in compare_runs(baseline, current)}
+    cold_start = comparisons["Selenium cold start"]
+    assert cold_start.regressed
+    assert cold_start.ratio == pytest.approx(2, rel=0.1)
+    assert "REGRESSION" in format_comparison(cold_start)
+    assert not comparisons["API - Requests"].regressed
+
+
+def test_threshold_tolerates_small_slowdowns(tmp_path):
+    baseline = write_run(tmp_path / "baseline.jsonl", 10, seed=1)
+    current = write_run(tmp_path / "current.jsonl", 10.5, seed=2)
+    api, _ = compare_runs(baseline, current, threshold=0.1)
+    assert api.p_value < 0.05
+    assert not api.regressed
+    api, _ = compare_runs(baseline, current, threshold=0.01)
+    assert api.regressed
+
+
+def test_baselines_and_archive(tmp_path):
+    history_dir = str(tmp_path / "history")
+    first = write_run(tmp_path / "first.jsonl", 10)
+    second = write_run(tmp_path / "second.jsonl.gz", 20)
+    save_baseline(first, "main", history_dir)
+    assert resolve_baseline("main", history_dir).endswith("main.jsonl")
+    save_baseline(second, "main", history_dir)
+    assert resolve_baseline("main", history_dir).endswith("main.jsonl.gz")
+    assert resolve_baseline(first, history_dir) == first
+    with pytest.raises(FileNotFoundError):
+        resolve_baseline("missing", history_dir)
+
+    archived = [archive_run(second, history_dir), archive_run(first, history_dir)]
+    assert list_runs(history_dir) == archived[::-1]
+    points = trend(history_dir)
+    medians = [median for _, median, _, _ in points["API - Requests"]]
+    assert medians == pytest.approx([0.010, 0.020], rel=0.05)
+
+
+def test_compare_subcommand_exit_codes(tmp_path):
+    history_dir = str(tmp_path / "history")
+    baseline = write_run(tmp_path / "baseline.jsonl", 10, seed=1)
+    slower = write_run(tmp_path / "slower.jsonl", 20, seed=2)
+
+    def run(*argv):
+        return history.main([*argv, "--history", history_dir])
+
+    assert run("baseline", baseline, "--name", "main") == 0
+    assert run("compare", baseline, "--baseline", "main") == 0
+    assert run("compare", slower, "--baseline", "main") == 1
+    assert run("compare", slower, "--baseline", "other") == 2
+    assert run("compare", str(tmp_path / "missing.jsonl"), "--baseline", "main") == 2
+    assert run("baseline", str(tmp_path / "missing.jsonl"), "--name", "x") == 2
+    # A run sharing no series with the baseline compares nothing and fails
+    with ResultStore(str(tmp_path / "other.jsonl")) as store:
+        store.append("Text - Requests", FetchRecord("requests", "http://x", 1))
+    assert run("compare", store.path, "--baseline", "main") == 2
+
+
+def test_history_option_before_or_after_subcommand(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    history_dir = str(tmp_path / "history")
+    archive_run(write_run(tmp_path / "run.jsonl", 10), history_dir)
+    with patch.object(history, "plot_trend"):
+        assert history.main(["trend", "--history", history_dir]) == 0
+        assert history.main(["--history", history_dir, "trend"]) == 0
+        assert history.main(["trend"]) == 1
+
+
+def test_trend_subcommand_plots(tmp_path):
+    history_dir = str(tmp_path / "history")
+    assert history.main(["--history", history_dir, "trend"]) == 1
+    archive_run(write_run(tmp_path / "run.jsonl", 10), history_dir)
+    with patch.object(history, "plot_trend") as mock_plot:
+        assert history.main(["--history", history_dir, "trend"]) == 0
+    points, filename = mock_plot.call_args.args
+    assert set(points) == {"API - Requests", "Selenium cold start"}
+    assert filename == history.TREND_FILENAME
+
+
+def test_plot_trend_saves_figure(tmp_path):
+    points = {"API - Requests": [("2026-01-01T00:00", 0.01, 0.009, 0.011)]}
+    filename = tmp_path / "trend.png"
+    history.plot_trend(points, str(filename))
+    assert filename.exists()
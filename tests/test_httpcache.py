@@ -0,0 +1,192 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+import pytest
+import requests
+
+from selenium_v_requests_comparison.comparison import measure_requests
+from selenium_v_requests_comparison.httpcache import (
+    CacheEntry,
+    DiskCache,
+    HTTPCache,
+    LRUCache,
+    browser_cache_outcome,
+    parse_cache_control,
+)
+from selenium_v_requests_comparison.server import BenchmarkServer, ServerConfig
+from selenium_v_requests_comparison.session import KeepAliveSession
+from selenium_v_requests_comparison.store import split_label
+
+
+def entry(url, size=100, **headers):
+    return CacheEntry(url, 200, headers, b"x" * size)
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('public, Max-Age="60", no-cache') == {
+        "public": True,
+        "max-age": "60",
+        "no-cache": True,
+    }
+    assert parse_cache_control(None) == {}
+
+
+def test_lifetime_and_freshness():
+    now = time.time()
+    assert entry("a", **{"Cache-Control": "max-age=60"}).lifetime() == 60
+    assert entry("a", **{"Cache-Control": "no-cache, max-age=60"}).lifetime() == 0
+    expires = entry(
+        "a",
+        Date="Mon, 01 Jan 2024 00:00:00 GMT",
+        Expires="Mon, 01 Jan 2024 00:00:30 GMT",
+    )
+    assert expires.lifetime() == 30
+    heuristic = entry(
+        "a",
+        Date="Mon, 01 Jan 2024 00:00:00 GMT",
+        **{"Last-Modified": "Sun, 31 Dec 2023 23:00:00 GMT"},
+    )
+    assert heuristic.lifetime() == pytest.approx(360)
+    fresh = entry("a", **{"Cache-Control": "max-age=60"})
+    assert fresh.is_fresh(now + 30)
+    assert not fresh.is_fresh(now + 61)
+    aged = entry("a", Age="50", **{"Cache-Control": "max-age=60"})
+    assert not aged.is_fresh(now + 20)
+
+
+def test_lru_evicts_by_bytes_and_recency():
+    cache = LRUCache(max_bytes=350)
+    for url in "abc":
+        cache.put(entry(url))
+    cache.get("a")
+    evicted = cache.put(entry("d"))
+    assert [e.url for e in evicted] == ["b"]
+    assert "a" in cache and "b" not in cache
+    assert cache.bytes == 300 and cache.evictions == 1
+    assert cache.put(entry("huge", 1000)) == []
+    assert "huge" not in cache
+    cache.remove("a")
+    assert len(cache) == 2 and cache.bytes == 200
+
+
+def test_lru_entry_bound():
+    cache = LRUCache(max_entries=2)
+    for url in "abc":
+        cache.put(entry(url))
+    assert list(url for url in "abc" if url in cache) == ["b", "c"]
+
+
+def test_disk_tier_round_trip_and_promotion(tmp_path):
+    disk = DiskCache(str(tmp_path), max_bytes=10_000)
+    disk.put(entry("http://x/a", ETag='"1"'))
+    loaded = disk.get("http://x/a")
+    assert loaded.body == b"x" * 100 and loaded.headers == {"ETag": '"1"'}
+    assert disk.get("http://x/missing") is None
+
+    cache = HTTPCache(directory=str(tmp_path))
+    assert cache.lookup("http://x/a").validators() == {"If-None-Match": '"1"'}
+    assert "http://x/a" in cache.memory
+
+
+def test_disk_tier_evicts_oldest(tmp_path):
+    disk = DiskCache(str(tmp_path), max_bytes=250)
+    for i, url in enumerate("abc"):
+        disk.put(entry(url))
+        os.utime(disk._path(url), (i, i))
+    disk._evict()
+    assert disk.get("a") is None
+    assert disk.get("c") is not None
+
+
+def test_fetch_revalidates_stale_entries():
+    with BenchmarkServer(config=ServerConfig(cache_max_age=0)) as server:
+        cache = HTTPCache()
+        with requests.Session() as session:
+            first, outcome = cache.fetch(session, server.static_url)
+            assert outcome == "miss"
+            second, outcome = cache.fetch(session, server.static_url)
+    assert outcome == "revalidated"
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert cache.outcomes == {"miss": 1, "revalidated": 1}
+
+
+def test_fetch_hits_fresh_entries():
+    with BenchmarkServer(config=ServerConfig(cache_max_age=60)) as server:
+        cache = HTTPCache()
+        with requests.Session() as session:
+            cache.fetch(session, server.api_url)
+            response, outcome = cache.fetch(session, server.api_url)
+    assert outcome == "hit"
+    assert "fact" in response.json()
+
+
+def test_no_store_is_never_cached():
+    with BenchmarkServer() as server:
+        cache = HTTPCache()
+        with requests.Session() as session:
+            outcomes = [cache.fetch(session, server.api_url)[1] for _ in range(2)]
+    assert outcomes == ["miss", "miss"]
+    assert len(cache.memory) == 0
+
+
+def test_server_answers_conditional_requests():
+    with BenchmarkServer(config=ServerConfig(cache_max_age=60)) as server:
+        response = requests.get(server.static_url)
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "max-age=60"
+        revalidated = requests.get(server.static_url, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        since = requests.get(
+            server.static_url,
+            headers={"If-Modified-Since": response.headers["Last-Modified"]},
+        )
+        assert since.status_code == 304
+        changed = requests.get(server.static_url, headers={"If-None-Match": '"old"'})
+        assert changed.status_code == 200
+
+
+def test_measure_requests_tags_cache_outcome():
+    with BenchmarkServer(config=ServerConfig(cache_max_age=60)) as server:
+        cache = HTTPCache()
+        with KeepAliveSession() as session:
+            records = [
+                measure_requests(server.api_url, session=session, cache=cache)
+                for _ in range(2)
+            ]
+    assert [record.tags["cache"] for record in records] == ["miss", "hit"]
+    assert "connection" not in records[1].tags
+    assert records[1].metrics["wire_bytes"] == 0
+    assert records[1].total_ns < records[0].total_ns
+    assert (
+        split_label("API - Requests", records[1].tags) == "API - Requests (cache hit)"
+    )
+
+
+def test_browser_cache_outcome():
+    assert browser_cache_outcome({"transferSize": 0, "decodedBodySize": 10}) == "hit"
+    assert (
+        browser_cache_outcome({"transferSize": 300, "encodedBodySize": 5000})
+        == "revalidated"
+    )
+    assert (
+        browser_cache_outcome({"transferSize": 5300, "encodedBodySize": 5000}) == "miss"
+    )
+    assert browser_cache_outcome({}) is None
+
+
+def test_browser_cache_outcome_of_small_body():
+    # A 40-byte JSON body: the revalidated transfer is larger than the body
+    assert (
+        browser_cache_outcome({"transferSize": 300, "encodedBodySize": 40})
+        == "revalidated"
+    )
+    assert browser_cache_outcome({"transferSize": 340, "encodedBodySize": 40}) == "miss"
+    revalidated = {"transferSize": 412, "encodedBodySize": 40, "responseStatus": 304}
+    assert browser_cache_outcome(revalidated) == "revalidated"
+    full = {"transferSize": 412, "encodedBodySize": 40, "responseStatus": 200}
+    assert browser_cache_outcome(full) == "miss"
@@ -0,0 +1,71 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+
+from selenium_v_requests_comparison.load import (
+    PERCENTILES,
+    LoadResult,
+    format_load_result,
+    plot_load_curve,
+    run_load_curve,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 200 if self.path == "/ok" else 500
+        body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_load_result_percentiles_and_throughput():
+    result = LoadResult(4, 2.0, np.linspace(0.001, 1.0, 1000))
+    assert result.throughput == pytest.approx(500)
+    assert list(result.percentiles) == list(PERCENTILES)
+    assert result.percentiles[50] == pytest.approx(0.5, abs=0.01)
+    assert "p99.9=" in format_load_result(result)
+
+
+def test_run_load_curve_reports_each_level(base_url):
+    results = run_load_curve(f"{base_url}/ok", levels=[1, 4], duration=0.3)
+    assert [result.concurrency for result in results] == [1, 4]
+    for result in results:
+        assert len(result.latencies) > 0
+        assert result.errors == 0
+        assert result.throughput > 0
+
+
+def test_non_200_responses_count_as_errors(base_url):
+    (result,) = run_load_curve(f"{base_url}/fail", levels=[2], duration=0.2)
+    assert len(result.latencies) == 0
+    assert result.errors > 0
+
+
+def test_plot_load_curve_writes_file(tmp_path):
+    results = [LoadResult(level, 1.0, np.full(10, 0.01 * level)) for level in (1, 8)]
+    filename = tmp_path / "curve.png"
+    plot_load_curve(results, str(filename), reference={"Selenium (serial)": 0.5})
+    assert filename.exists()
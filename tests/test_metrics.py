@@ -0,0 +1,167 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+import pytest
+import requests
+
+from selenium_v_requests_comparison import comparison
+from selenium_v_requests_comparison.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    ErrorBudget,
+    MetricsRegistry,
+    MetricsServer,
+    RunAborted,
+    is_failure,
+)
+from selenium_v_requests_comparison.timing import FetchRecord
+
+LABEL = "API - Requests"
+
+
+def record(seconds, status=200, **metrics):
+    return FetchRecord(
+        "requests", "http://x", int(seconds * 1e9), status=status, metrics=metrics
+    )
+
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_histogram_buckets_are_cumulative_and_skip_warmup():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.observe(LABEL, record(0.05), warmup=True)
+    registry.observe(LABEL, record(0.05))
+    registry.observe(LABEL, record(0.5))
+    registry.observe(LABEL, record(2))
+    text = registry.render()
+    buckets = sample_lines(text, "benchmark_sample_duration_seconds_bucket")
+    assert [line.rsplit(" ", 1)[1] for line in buckets] == ["1", "2", "3"]
+    assert buckets[-1].count('le="+Inf"') == 1
+    assert 'method="requests"' in buckets[0]
+    assert sample_lines(text, "benchmark_sample_duration_seconds_count")[0].endswith(
+        " 3"
+    )
+    assert sample_lines(text, "benchmark_samples_total")[0].endswith(" 4")
+    assert text.endswith("# EOF\n")
+
+
+def test_counts_statuses_bytes_and_resources():
+    registry = MetricsRegistry(run_id="abc")
+    registry.observe(LABEL, record(0.1, wire_bytes=100, peak_rss_bytes=2048))
+    registry.observe(LABEL, record(0.1, status=503, wire_bytes=50))
+    text = registry.render()
+    assert 'benchmark_run_info{run_id="abc"} 1' in text
+    assert sample_lines(text, "benchmark_wire_bytes_total")[0].endswith(" 150")
+    codes = sample_lines(text, "benchmark_responses_total")
+    assert [line.split('code="')[1][:3] for line in codes] == ["200", "503"]
+    assert sample_lines(text, "benchmark_resource_peak_rss_bytes{")[0].endswith(" 2048")
+    assert registry.failure_rate(LABEL) == (1, 2)
+
+
+def test_prometheus_format_names_counter_families_with_total():
+    registry = MetricsRegistry()
+    registry.observe(LABEL, record(0.1))
+    openmetrics, prometheus = registry.render(), registry.render(openmetrics=False)
+    assert "# TYPE benchmark_samples counter" in openmetrics
+    assert "# TYPE benchmark_samples_total counter" in prometheus
+    assert "# TYPE benchmark_run_info gauge" in prometheus
+    assert "# EOF" not in prometheus
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe('say "hi"\\', 0.1)
+    assert 'series="say \\"hi\\"\\\\"' in registry.render()
+
+
+def test_track_counts_exceptions_and_skips_the_sample():
+    registry = MetricsRegistry()
+    checked = []
+
+    def broken():
+        raise ConnectionError("refused")
+
+    tracked = registry.track(LABEL, broken, "requests", on_error=checked.append)
+    assert tracked() is None
+    assert tracked() is None
+    assert sample_lines(registry.render(), "benchmark_errors_total")[0].endswith(" 2")
+    assert registry.failure_rate(LABEL) == (2, 2)
+    assert checked == [LABEL, LABEL]
+
+
+def test_is_failure():
+    assert not is_failure(200)
+    assert not is_failure(304)
+    assert not is_failure(None)
+    assert is_failure(404)
+
+
+def test_error_budget_waits_for_min_samples():
+    registry = MetricsRegistry()
+    budget = ErrorBudget(registry, max_rate=0.5, min_samples=3)
+    registry.observe(LABEL, record(0.1, status=500))
+    registry.observe(LABEL, record(0.1, status=500))
+    budget.check(LABEL)
+    registry.observe(LABEL, record(0.1))
+    with pytest.raises(RunAborted, match="2 of 3"):
+        budget.check(LABEL)
+    budget.check("unknown series")
+
+
+def test_server_negotiates_format():
+    registry = MetricsRegistry()
+    registry.observe(LABEL, record(0.1))
+    with MetricsServer(registry) as server:
+        response = requests.get(server.url)
+        assert response.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+        assert "benchmark_samples_total" in response.text
+        response = requests.get(
+            server.url, headers={"Accept": "application/openmetrics-text"}
+        )
+        assert response.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+        assert response.text.endswith("# EOF\n")
+        assert requests.get(server.url.replace("/metrics", "/")).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "outcome",
+    [
+        {"return_value": record(0.001, status=503)},
+        {"side_effect": requests.ConnectionError("refused")},
+    ],
+    ids=["failed-status", "raised"],
+)
+def test_failing_run_aborts_early(tmp_path, monkeypatch, outcome):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "selenium_v_requests_comparison",
+            "--methods",
+            "requests",
+            "--warmup",
+            "0",
+            "--max-samples",
+            "50",
+            "--metrics-port",
+            "0",
+            "--abort-error-rate",
+            "0.5",
+            "--abort-min-samples",
+            "3",
+        ],
+    )
+    with (
+        patch.object(comparison, "measure_requests", **outcome) as measure,
+        pytest.raises(SystemExit) as exit_info,
+    ):
+        comparison.main()
+    assert exit_info.value.code == 2
+    # Targets are sampled in turn; the first to reach three failures aborts
+    assert measure.call_count == 5
+    assert not (tmp_path / comparison.REPORT_FILENAME).exists()
@@ -0,0 +1,105 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+import numpy as np
+import pytest
+
+from selenium_v_requests_comparison.openloop import (
+    LatencyHistogram,
+    arrival_times,
+    find_sustainable_rate,
+    format_open_loop_result,
+    plot_open_loop,
+    run_open_loop,
+)
+
+
+def test_histogram_percentiles_within_precision():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(np.log(0.05), 1.0, 20000)
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    assert histogram.count == len(values)
+    for p in (50, 90, 99, 99.9):
+        expected = np.percentile(values, p)
+        assert histogram.percentile(p) == pytest.approx(expected, rel=0.02)
+    assert histogram.percentile(100) == pytest.approx(values.max(), rel=1e-6)
+    assert histogram.mean == pytest.approx(values.mean())
+
+
+def test_histogram_small_values_are_exact_and_merge():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.000003)
+    second.record(0.000005)
+    second.record(-1)
+    first.merge(second)
+    assert first.count == 3
+    assert first.percentile(0) == 0
+    assert first.percentile(50) == pytest.approx(0.000003)
+    assert first.percentile(100) == pytest.approx(0.000005)
+    assert np.isnan(LatencyHistogram().percentile(50))
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(sub_bucket_bits=3))
+
+
+def test_arrival_times():
+    constant = arrival_times(10, 2)
+    assert len(constant) == 20
+    assert np.allclose(np.diff(constant), 0.1)
+    poisson = arrival_times(100, 10, "poisson", np.random.default_rng(1))
+    assert 900 < len(poisson) < 1100
+    assert poisson.max() < 10
+    with pytest.raises(ValueError):
+        arrival_times(10, 1, "burst")
+    with pytest.raises(ValueError):
+        arrival_times(0, 1)
+
+
+def test_latency_includes_queueing_delay():
+    # One worker taking 20ms per call at 100/s queues up: latency from the
+    # intended send time keeps growing, unlike the 20ms service time
+    result = run_open_loop(
+        lambda: time.sleep(0.02) or True, 100, 0.5, workers=1, max_backlog=100
+    )
+    assert not result.saturated
+    assert result.sent == 50
+    assert result.histogram.percentile(50) > 0.1
+    assert result.histogram.percentile(99) > 0.5
+    assert "rate=100/s" in format_open_loop_result(result)
+
+
+def test_backlog_marks_rate_saturated():
+    result = run_open_loop(
+        lambda: time.sleep(0.05) or True, 200, 1.0, workers=1, max_backlog=5
+    )
+    assert result.saturated
+    assert result.sent < 200
+
+
+def test_errors_are_counted():
+    def fetch():
+        raise RuntimeError("boom")
+
+    result = run_open_loop(fetch, 50, 0.1, workers=2)
+    assert result.errors == result.sent == 5
+    assert result.histogram.count == 0
+    assert not result.meets_slo(1.0)
+
+
+def test_sustainable_rate_stops_at_first_slo_miss(tmp_path):
+    rate, results = find_sustainable_rate(
+        lambda: time.sleep(0.01) or True,
+        rates=[400, 10, 50],
+        slo_p99=0.1,
+        duration=0.5,
+        workers=1,
+    )
+    assert rate == 50
+    assert [result.rate for result in results] == [10, 50, 400]
+    filename = tmp_path / "open_loop.png"
+    plot_open_loop({"Requests": results}, 0.1, str(filename))
+    assert filename.exists()
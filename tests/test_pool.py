@@ -0,0 +1,101 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch, MagicMock
+import pytest
+
+from selenium_v_requests_comparison.pool import WebDriverPool, BLANK_PAGE_URL
+from selenium_v_requests_comparison.comparison import measure_selenium
+
+
+def make_driver(profile_dir):
+    driver = MagicMock()
+    driver.window_handles = ["main"]
+    driver.current_url = BLANK_PAGE_URL
+    driver.execute_script.return_value = "complete"
+    driver.profile_dir = profile_dir
+    return driver
+
+
+def test_pool_requires_positive_size():
+    with pytest.raises(ValueError):
+        WebDriverPool(0, make_driver)
+
+
+def test_pool_records_cold_starts_and_reuses_sessions():
+    factory = MagicMock(side_effect=make_driver)
+    with WebDriverPool(2, factory) as pool:
+        assert factory.call_count == 2
+        assert len(pool.cold_start_times) == 2
+        seen = set()
+        for _ in range(4):
+            with pool.session() as driver:
+                seen.add(id(driver))
+        # No new browsers are launched after the pool has started
+        assert factory.call_count == 2
+        assert len(seen) == 2
+
+
+def test_pool_close_quits_drivers():
+    drivers = []
+
+    def factory(profile_dir):
+        driver = make_driver(profile_dir)
+        drivers.append(driver)
+        return driver
+
+    pool = WebDriverPool(2, factory)
+    pool.start()
+    pool.close()
+    for driver in drivers:
+        driver.quit.assert_called_once()
+        assert not os.path.exists(driver.profile_dir)
+
+
+def test_pool_start_failure_quits_started_drivers():
+    drivers = []
+
+    def factory(profile_dir):
+        if drivers:
+            raise RuntimeError("chromedriver exited")
+        drivers.append(make_driver(profile_dir))
+        return drivers[-1]
+
+    pool = WebDriverPool(3, factory)
+    with pytest.raises(RuntimeError):
+        pool.start()
+    drivers[0].quit.assert_called_once()
+    assert not os.path.exists(drivers[0].profile_dir)
+    assert len(pool.cold_start_times) == 1
+
+
+def test_reset_closes_extra_tabs_and_clears_state():
+    driver = MagicMock()
+    driver.window_handles = ["main", "popup"]
+    urls = {"main": "http://127.0.0.1:8000/static", "popup": "https://ads.example/x"}
+    driver.switch_to.window.side_effect = lambda handle: setattr(
+        driver, "current_url", urls[handle]
+    )
+    WebDriverPool.reset(driver)
+    driver.close.assert_called_once()
+    driver.switch_to.window.assert_called_with("main")
+    cleared = [
+        call.args[1]["origin"]
+        for call in driver.execute_cdp_cmd.call_args_list
+        if call.args[0] == "Storage.clearDataForOrigin"
+    ]
+    assert cleared == ["http://127.0.0.1:8000", "https://ads.example"]
+    driver.execute_cdp_cmd.assert_called_with("Network.clearBrowserCookies", {})
+    driver.get.assert_called_once_with(BLANK_PAGE_URL)
+
+
+def test_measure_selenium_with_pool_does_not_launch_chrome():
+    factory = MagicMock(side_effect=make_driver)
+    with WebDriverPool(1, factory) as pool:
+        with patch(
+            "selenium_v_requests_comparison.comparison.start_chrome"
+        ) as mock_start:
+            record = measure_selenium("https://example.com", pool=pool)
+            mock_start.assert_not_called()
+    assert record.tags["session"] == "warm"
@@ -0,0 +1,103 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import math
+from unittest.mock import patch, MagicMock
+import pytest
+
+from selenium_v_requests_comparison.profiles import (
+    BASELINE_PROFILE,
+    LOAD_PROFILES,
+    LoadProfile,
+    ProfileResult,
+    apply_blocking,
+    blocked_url_patterns,
+    compare_to_baseline,
+    run_profile_matrix,
+)
+from selenium_v_requests_comparison.comparison import start_chrome
+from selenium_v_requests_comparison.timing import FetchRecord
+
+
+def make_record(seconds, size=None):
+    record = FetchRecord("selenium", "http://example.com", int(seconds * 1e9))
+    if size is not None:
+        record.metrics["wire_bytes"] = size
+    return record
+
+
+def test_blocked_url_patterns_deduplicates():
+    patterns = blocked_url_patterns(["Stylesheet", "Stylesheet"], ["*ads*", "*.css"])
+    assert patterns == ["*.css", "*ads*"]
+
+
+def test_unknown_resource_type_rejected():
+    with pytest.raises(ValueError):
+        blocked_url_patterns(["Video"])
+    with pytest.raises(ValueError):
+        LoadProfile("bad", blocked_types=("Video",))
+
+
+def test_unknown_page_load_strategy_rejected():
+    with pytest.raises(ValueError):
+        LoadProfile("bad", "lazy")
+
+
+def test_presets_include_baseline_and_strategies():
+    assert LOAD_PROFILES[BASELINE_PROFILE].patterns == []
+    assert {p.page_load_strategy for p in LOAD_PROFILES.values()} == {
+        "normal",
+        "eager",
+        "none",
+    }
+
+
+def test_apply_blocking_sends_cdp_commands():
+    driver = MagicMock()
+    apply_blocking(driver, [])
+    driver.execute_cdp_cmd.assert_not_called()
+    apply_blocking(driver, ["*.png"])
+    driver.execute_cdp_cmd.assert_any_call(
+        "Network.setBlockedURLs", {"urls": ["*.png"]}
+    )
+
+
+def test_compare_to_baseline():
+    baseline = ProfileResult(
+        LOAD_PROFILES[BASELINE_PROFILE], [make_record(2.0, 4096)] * 3
+    )
+    eager = ProfileResult(LOAD_PROFILES["eager"], [make_record(1.5, 1024)] * 3)
+    rows = compare_to_baseline([baseline, eager])
+    assert rows[0]["latency_saved"] == 0
+    assert rows[1]["latency_saved"] == pytest.approx(0.5)
+    assert rows[1]["bytes_saved"] == 3072
+    assert math.isnan(compare_to_baseline([eager])[0]["bytes_saved"])
+
+
+def test_run_profile_matrix_starts_one_browser_per_profile():
+    driver_factory = MagicMock()
+    measure = MagicMock(return_value=make_record(1.0))
+    profiles = [LOAD_PROFILES[BASELINE_PROFILE], LOAD_PROFILES["eager-block-static"]]
+    results = run_profile_matrix(
+        "http://example.com", profiles, 2, driver_factory, measure
+    )
+    assert [len(result.records) for result in results] == [2, 2]
+    assert driver_factory.call_count == 2
+    kwargs = driver_factory.call_args.kwargs
+    assert kwargs["page_load_strategy"] == "eager"
+    assert "*.css" in kwargs["blocked_urls"]
+
+
+@patch("selenium.webdriver.Chrome")
+@patch("selenium_v_requests_comparison.comparison.resolve_chromedriver")
+def test_start_chrome_applies_profile(mock_resolve, mock_chrome):
+    mock_resolve.return_value = "/usr/bin/chromedriver"
+    driver = start_chrome(
+        "/tmp/profile", page_load_strategy="eager", blocked_urls=["*.png"]
+    )
+    options = mock_chrome.call_args.kwargs["options"]
+    assert options.page_load_strategy == "eager"
+    driver.execute_cdp_cmd.assert_any_call(
+        "Network.setBlockedURLs", {"urls": ["*.png"]}
+    )
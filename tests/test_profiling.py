@@ -0,0 +1,137 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from unittest.mock import MagicMock
+
+import pstats
+
+from selenium_v_requests_comparison.comparison import measure_requests
+from selenium_v_requests_comparison.profiling import (
+    ChromeTracer,
+    Profiler,
+    current_profiler,
+    driver_debugging_port,
+    merge_stats,
+    profile_section,
+    profiling,
+    top_functions,
+)
+from selenium_v_requests_comparison.server import BenchmarkServer
+
+
+def busy():
+    return sum(i * i for i in range(20000))
+
+
+def fake_connection(batches):
+    connection = MagicMock()
+    events = [
+        {"method": "Tracing.dataCollected", "params": {"value": batch}}
+        for batch in batches
+    ]
+    events.append({"method": "Tracing.tracingComplete", "params": {}})
+    connection.wait_for_event.side_effect = events
+    return connection
+
+
+def test_sections_write_phase_and_method_stats(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    with profiling(profiler):
+        for _ in range(2):
+            with profile_section("requests", "fetch"):
+                busy()
+                # A nested section counts toward the outer one
+                with profile_section("requests", "body"):
+                    busy()
+            with profile_section("requests", "body"):
+                busy()
+    assert current_profiler() is None
+    paths = profiler.write_stats()
+    names = sorted(os.path.basename(path) for path in paths)
+    assert names == ["requests.body.pstats", "requests.fetch.pstats", "requests.pstats"]
+    merged = pstats.Stats(str(tmp_path / "requests.pstats"))
+    calls = {key[2]: value[1] for key, value in merged.stats.items()}
+    assert calls["busy"] == 6
+    assert any(
+        "busy" in line for line in top_functions(str(tmp_path / "requests.pstats"))
+    )
+
+
+def test_merge_stats_across_runs(tmp_path):
+    for run in ("a", "b"):
+        profiler = Profiler(str(tmp_path / run))
+        with profiling(profiler), profile_section("requests", "fetch"):
+            busy()
+        profiler.write_stats()
+    output = merge_stats(
+        [str(tmp_path / run / "requests.pstats") for run in ("a", "b")],
+        str(tmp_path / "merged.pstats"),
+    )
+    calls = {key[2]: value[1] for key, value in pstats.Stats(output).stats.items()}
+    assert calls["busy"] == 2
+
+
+def test_hooks_are_inactive_without_profiler(tmp_path):
+    with profile_section("requests", "fetch"):
+        busy()
+    assert current_profiler() is None
+
+
+def test_measure_requests_is_profiled_by_phase(tmp_path):
+    profiler = Profiler(str(tmp_path), trace_every=0)
+    with BenchmarkServer() as server, profiling(profiler):
+        measure_requests(server.api_url)
+    assert set(profiler.profiles) == {("requests", "fetch"), ("requests", "body")}
+
+
+def test_chrome_tracer_collects_events():
+    connection = fake_connection([[{"name": "a"}], [{"name": "b"}]])
+    tracer = ChromeTracer(connection, close=True)
+    tracer.start(["loading"])
+    assert tracer.stop() == [{"name": "a"}, {"name": "b"}]
+    methods = [call.args[0] for call in connection.send.call_args_list]
+    assert methods == ["Tracing.start", "Tracing.end"]
+    connection.close.assert_called_once()
+
+
+def test_traces_every_nth_iteration(tmp_path):
+    profiler = Profiler(str(tmp_path), trace_every=2)
+    connections = []
+
+    def connect():
+        connections.append(fake_connection([[{"name": "load"}]]))
+        return connections[-1], True
+
+    tracers = []
+    for _ in range(3):
+        with profiler.trace("cdp", connect) as tracer:
+            tracers.append(tracer)
+    assert [tracer is not None for tracer in tracers] == [True, False, True]
+    assert [os.path.basename(path) for path in profiler.traces] == [
+        "cdp-0001.json",
+        "cdp-0003.json",
+    ]
+    with open(profiler.traces[0]) as f:
+        assert json.load(f) == {"traceEvents": [{"name": "load"}]}
+
+
+def test_trace_failure_does_not_fail_sample(tmp_path, caplog):
+    profiler = Profiler(str(tmp_path))
+
+    def connect():
+        raise OSError("no browser")
+
+    with profiler.trace("selenium", connect) as tracer:
+        assert tracer is None
+    assert "Could not start a Chrome trace" in caplog.text
+    assert profiler.traces == []
+
+
+def test_driver_debugging_port():
+    driver = MagicMock()
+    driver.capabilities = {"goog:chromeOptions": {"debuggerAddress": "localhost:9333"}}
+    assert driver_debugging_port(driver) == 9333
+    driver.capabilities = {}
+    assert driver_debugging_port(driver) is None
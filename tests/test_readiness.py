@@ -0,0 +1,66 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from unittest.mock import MagicMock
+import pytest
+
+from selenium_v_requests_comparison.readiness import Readiness
+
+
+def network_event(method, request_id):
+    message = {"message": {"method": method, "params": {"requestId": request_id}}}
+    return {"message": json.dumps(message)}
+
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError):
+        Readiness("sleep")
+    with pytest.raises(ValueError):
+        Readiness("js")
+
+
+def test_ready_state_strategy():
+    driver = MagicMock()
+    driver.execute_script.side_effect = ["loading", "interactive", "complete"]
+    assert Readiness("ready-state", timeout=2).wait(driver) is True
+    driver.execute_script.assert_called_with("return document.readyState")
+
+
+def test_selector_strategy():
+    driver = MagicMock()
+    assert Readiness("selector", timeout=1, selector="#app").wait(driver) is True
+    driver.find_element.assert_called_with("css selector", "#app")
+
+
+def test_js_strategy_times_out():
+    driver = MagicMock()
+    driver.execute_script.return_value = False
+    readiness = Readiness("js", timeout=0.2, script="return window.done")
+    assert readiness.wait(driver) is False
+    driver.execute_script.assert_called_with("return window.done")
+
+
+def test_network_idle_waits_for_in_flight_requests():
+    driver = MagicMock()
+    driver.get_log.side_effect = [
+        [network_event("Network.requestWillBeSent", "1")],
+        [network_event("Network.requestWillBeSent", "2")],
+        [network_event("Network.loadingFinished", "1")],
+        [network_event("Network.loadingFailed", "2")],
+    ] + [[]] * 100
+    readiness = Readiness("network-idle", timeout=2, idle_time=0.1)
+    assert readiness.needs_performance_log
+    assert readiness.wait(driver) is True
+    # All four batches of events were consumed before the page counted as idle
+    assert driver.get_log.call_count > 4
+
+
+def test_network_idle_prepare_discards_old_events():
+    driver = MagicMock()
+    Readiness("network-idle").prepare(driver)
+    driver.get_log.assert_called_once_with("performance")
+    driver = MagicMock()
+    Readiness("ready-state").prepare(driver)
+    driver.get_log.assert_not_called()
@@ -0,0 +1,78 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pytest
+
+from selenium_v_requests_comparison.report import (
+    ECDF_POINTS,
+    HISTOGRAM_BINS,
+    render_report,
+    save_boxplot,
+    summarize_series,
+    write_report,
+)
+from selenium_v_requests_comparison.store import Series
+
+
+def make_series(label, values, phases=None):
+    series = Series(label)
+    for value in values:
+        series.add({"total_ns": int(value * 1e9), "phases_ns": phases or {}})
+    return series
+
+
+def test_summary_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(np.log(0.05), 0.5, 5000)
+    stats = summarize_series(make_series("API - Requests", values))
+    assert stats.n == 5000
+    assert stats.median == pytest.approx(np.median(values), rel=1e-6)
+    assert stats.quantiles[99] == pytest.approx(np.percentile(values, 99), rel=1e-6)
+    assert stats.minimum <= stats.whisker_low <= stats.q1 <= stats.q3
+    assert stats.q3 <= stats.whisker_high <= stats.maximum
+    assert len(stats.ecdf[0]) == ECDF_POINTS
+    assert stats.histogram[0].sum() == 5000
+    assert len(stats.histogram[1]) == HISTOGRAM_BINS
+    assert summarize_series(Series("empty")) is None
+
+
+def test_summary_size_is_independent_of_sample_count():
+    small = summarize_series(make_series("a", np.linspace(0.01, 0.1, 10)))
+    large = summarize_series(make_series("a", np.linspace(0.01, 0.1, 100000)))
+    assert len(small.ecdf[0]) == len(large.ecdf[0])
+    assert len(small.histogram[0]) == len(large.histogram[0])
+
+
+def test_constant_series_is_summarized():
+    stats = summarize_series(make_series("a", [0.02] * 5))
+    assert stats.whisker_low == stats.whisker_high == pytest.approx(0.02)
+    assert stats.histogram[0].sum() == 5
+
+
+def test_report_is_self_contained(tmp_path):
+    stats = [
+        summarize_series(
+            make_series("API - Requests", [0.01, 0.02, 0.03], {"ttfb": 5e6})
+        ),
+        summarize_series(make_series("API - Selenium <b>", [0.2, 0.3, 0.5])),
+    ]
+    filename = write_report(
+        stats, str(tmp_path / "report.html"), run={"run_id": "abc123"}
+    )
+    html = open(filename, encoding="utf-8").read()
+    assert html.count("<svg") == 4
+    assert "<?xml" not in html
+    assert "abc123" in html
+    assert "API - Selenium &lt;b&gt;" in html
+    assert "src=" not in html and "href=" not in html.split("<svg")[0]
+    # No series has phases, so the phases chart is left out
+    assert render_report(stats[1:]).count("<svg") == 3
+
+
+def test_boxplot_is_saved(tmp_path):
+    stats = [summarize_series(make_series("a", [0.1, 0.2, 0.3]))]
+    filename = tmp_path / "box.png"
+    save_boxplot(stats, str(filename), ["median: 0.20"])
+    assert filename.stat().st_size > 0
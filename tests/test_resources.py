@@ -0,0 +1,77 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import subprocess
+from unittest.mock import MagicMock
+import pytest
+
+from selenium_v_requests_comparison.resources import (
+    RESOURCE_METRICS,
+    ResourceSampler,
+    driver_pid,
+    parse_stat,
+    process_tree,
+    resources_available,
+    sample_resources,
+)
+from selenium_v_requests_comparison.comparison import measure_requests
+
+needs_proc = pytest.mark.skipif(not resources_available(), reason="Requires /proc")
+
+
+def test_parse_stat_handles_spaces_in_command():
+    fields = ["S", "42"] + ["0"] * 9 + ["300", "200"] + ["0"] * 8 + ["10"]
+    line = f"1234 (chrome (renderer) x) {' '.join(fields)}"
+    ppid, cpu_seconds, rss_bytes = parse_stat(line)
+    assert ppid == 42
+    assert cpu_seconds == pytest.approx(500 / os.sysconf("SC_CLK_TCK"))
+    assert rss_bytes == 10 * os.sysconf("SC_PAGE_SIZE")
+
+
+@needs_proc
+def test_process_tree_includes_children():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+    try:
+        tree = process_tree(os.getpid())
+        assert child.pid in tree
+        assert list(process_tree(os.getpid(), include_children=False)) == [os.getpid()]
+    finally:
+        child.kill()
+        child.wait()
+
+
+@needs_proc
+def test_sampler_records_usage():
+    with ResourceSampler(os.getpid(), include_children=False, interval=0.01) as sampler:
+        sum(i * i for i in range(300_000))
+    usage = sampler.usage()
+    assert set(usage) == set(RESOURCE_METRICS)
+    assert usage["peak_rss_bytes"] >= usage["mean_rss_bytes"] > 0
+    assert usage["cpu_seconds"] >= 0
+    assert usage["process_count"] == 1
+
+
+def test_sample_resources_without_pid_yields_none():
+    with sample_resources(None) as sampler:
+        assert sampler is None
+
+
+def test_driver_pid():
+    driver = MagicMock()
+    driver.service.process.pid = 4321
+    assert driver_pid(driver) == 4321
+    assert driver_pid(MagicMock()) is None
+
+
+@needs_proc
+def test_measure_requests_records_resource_metrics(monkeypatch):
+    session = MagicMock()
+    session.get.return_value.status_code = 200
+    monkeypatch.setattr(
+        "selenium_v_requests_comparison.comparison.KeepAliveSession",
+        lambda **kwargs: session,
+    )
+    record = measure_requests("http://127.0.0.1/")
+    for metric in RESOURCE_METRICS:
+        assert metric in record.metrics
@@ -0,0 +1,137 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import itertools
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from selenium_v_requests_comparison.sampling import (
+    STOP_CONVERGED,
+    STOP_MAX_SAMPLES,
+    STOP_TIME_BUDGET,
+    AdaptiveSampler,
+    MAX_BOOTSTRAP_SAMPLES,
+    SampleSet,
+    bootstrap_ci,
+    mann_whitney_u,
+    ratio_ci,
+)
+from selenium_v_requests_comparison.timing import FetchRecord
+
+
+def test_bootstrap_ci_contains_median():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1.0, 0.1, 200)
+    low, high = bootstrap_ci(values, rng=rng)
+    assert low < np.median(values) < high
+    assert high - low < 0.1
+
+
+def test_bootstrap_ci_of_large_sample_draws_a_bounded_subsample():
+    rng = np.random.default_rng(3)
+    values = rng.normal(1.0, 0.1, MAX_BOOTSTRAP_SAMPLES * 100)
+    spy = Mock(wraps=rng)
+    low, high = bootstrap_ci(values, resamples=500, rng=spy)
+    assert spy.integers.call_args.kwargs["size"] == (500, MAX_BOOTSTRAP_SAMPLES)
+    # Width of a normal median's 95% CI: 2 * 1.96 * 1.2533 * sigma / sqrt(n)
+    expected = 2 * 1.96 * 1.2533 * 0.1 / np.sqrt(len(values))
+    assert low < np.median(values) < high
+    assert high - low == pytest.approx(expected, rel=0.3)
+
+
+def test_mann_whitney_u_detects_slower_samples():
+    rng = np.random.default_rng(2)
+    baseline = rng.normal(1.0, 0.05, 30)
+    _, p_slower = mann_whitney_u(baseline, baseline + 0.1)
+    _, p_faster = mann_whitney_u(baseline, baseline - 0.1)
+    assert p_slower < 0.001
+    assert p_faster > 0.99
+
+
+def test_mann_whitney_u_handles_ties_and_empty_samples():
+    u, p_value = mann_whitney_u([1, 1, 1], [1, 1, 1])
+    assert u == 4.5
+    assert p_value == 1.0
+    assert mann_whitney_u([], [1.0])[1] == 1.0
+
+
+def test_ratio_ci_of_scaled_samples():
+    rng = np.random.default_rng(1)
+    fast = rng.normal(1.0, 0.05, 100)
+    ratio, low, high = ratio_ci(fast * 10, fast, rng=rng)
+    assert ratio == pytest.approx(10)
+    assert low <= 10 <= high
+
+
+def test_sampler_discards_warmup_and_converges():
+    values = itertools.chain([5.0, 5.0], itertools.repeat(1.0))
+    sampler = AdaptiveSampler(warmup=2, min_samples=3, max_samples=20, seed=0)
+    sample_sets = sampler.run({"steady": lambda: next(values)})
+    steady = sample_sets["steady"]
+    assert steady.warmup == 2
+    assert steady.stop_reason == STOP_CONVERGED
+    assert list(steady.values) == [1.0, 1.0, 1.0]
+
+
+def test_sampler_stops_noisy_method_at_cap_or_budget():
+    rng = np.random.default_rng(2)
+    sampler = AdaptiveSampler(
+        warmup=0, min_samples=2, max_samples=10, ci_width=0.0001, seed=0
+    )
+    sample_sets = sampler.run({"noisy": lambda: float(rng.exponential(1.0))})
+    assert sample_sets["noisy"].stop_reason == STOP_MAX_SAMPLES
+    assert len(sample_sets["noisy"].records) == 10
+
+    sampler = AdaptiveSampler(
+        warmup=0, min_samples=2, max_samples=10, ci_width=0.0001, time_budget=0.0
+    )
+    sample_sets = sampler.run({"slow": lambda: float(rng.exponential(1.0))})
+    assert sample_sets["slow"].stop_reason == STOP_TIME_BUDGET
+
+
+def test_summary_excludes_outliers_from_mean():
+    records = [FetchRecord("requests", "u", 1_000_000_000) for _ in range(9)]
+    records.append(FetchRecord("requests", "u", 100_000_000_000))
+    sampler = AdaptiveSampler(seed=0)
+    summary = sampler.summarize(SampleSet("x", records))
+    assert summary["outliers"] == 1
+    assert summary["mean"] == pytest.approx(1.0)
+    assert summary["median"] == pytest.approx(1.0)
+
+
+def test_sampler_skips_failed_measurements():
+    outcomes = itertools.cycle([None, 1.0])
+    sampler = AdaptiveSampler(warmup=1, min_samples=3, max_samples=20, seed=0)
+    seen = []
+    sample_sets = sampler.run(
+        {"flaky": lambda: next(outcomes), "down": lambda: None},
+        on_result=lambda label, result, warmup: seen.append(label),
+    )
+    flaky, down = sample_sets["flaky"], sample_sets["down"]
+    assert (flaky.warmup, len(flaky), flaky.errors) == (1, 3, 4)
+    assert flaky.stop_reason == STOP_CONVERGED
+    # A method that always fails stops once its attempts reach the cap
+    assert (len(down), down.errors, down.stop_reason) == (0, 20, STOP_MAX_SAMPLES)
+    assert set(seen) == {"flaky"}
+
+
+def test_invalid_sample_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveSampler(min_samples=10, max_samples=5)
+
+
+def test_sampler_streams_results_without_keeping_records():
+    seen = []
+    sampler = AdaptiveSampler(warmup=1, min_samples=2, max_samples=4, seed=0)
+    sample_sets = sampler.run(
+        {"x": lambda: 1.0},
+        on_result=lambda label, result, warmup: seen.append((label, warmup)),
+        keep_records=False,
+    )
+    assert seen[0] == ("x", True)
+    assert all(not warmup for _, warmup in seen[1:])
+    assert sample_sets["x"].records == []
+    assert len(sample_sets["x"]) == len(seen) - 1
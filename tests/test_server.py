@@ -0,0 +1,83 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+import time
+import pytest
+import requests
+
+from selenium_v_requests_comparison.server import (
+    JOB_TITLE_CLASS,
+    BenchmarkRequestHandler,
+    BenchmarkServer,
+    ServerConfig,
+)
+from selenium_v_requests_comparison.session import KeepAliveSession
+
+
+@pytest.fixture
+def server():
+    with BenchmarkServer(
+        config=ServerConfig(render_delay=0.25, item_count=3)
+    ) as server:
+        yield server
+
+
+def test_api_endpoint_returns_json(server):
+    response = requests.get(server.api_url)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json"
+    assert "fact" in response.json()
+
+
+def test_static_page_lists_job_titles(server):
+    response = requests.get(server.static_url)
+    assert response.text.count(JOB_TITLE_CLASS) == 3
+
+
+def test_rendered_page_injects_titles_with_delay(server):
+    response = requests.get(server.rendered_url)
+    assert 'id="jobs"' in response.text
+    assert "250);" in response.text
+    assert "Job 2" in response.text
+
+
+def test_payload_size_and_chunked_overrides(server):
+    response = requests.get(server.api_url, params={"size": 5000, "chunked": 1})
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert len(response.content) >= 5000
+    json.loads(response.content)
+    html = requests.get(server.static_url, params={"size": 4096})
+    assert len(html.content) == 4096
+
+
+def test_injected_latency(server):
+    start = time.perf_counter()
+    requests.get(server.api_url, params={"latency": 0.2})
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_unknown_path_is_404(server):
+    assert requests.get(server.base_url + "/missing").status_code == 404
+
+
+def median_reused_response_time(count=9):
+    with BenchmarkServer() as server, KeepAliveSession() as session:
+        session.get(server.api_url).content
+        times = []
+        for _ in range(count):
+            start = time.perf_counter()
+            session.get(server.api_url).content
+            times.append(time.perf_counter() - start)
+    return sorted(times)[count // 2]
+
+
+def test_keep_alive_responses_are_not_delayed(monkeypatch):
+    fast = median_reused_response_time()
+    # Nagle plus delayed ACK adds ~40ms per reused-connection response
+    monkeypatch.setattr(BenchmarkRequestHandler, "disable_nagle_algorithm", False)
+    delayed = median_reused_response_time()
+    if delayed < 0.02:
+        pytest.skip("This platform does not delay ACKs on loopback.")
+    assert fast < delayed / 2
@@ -0,0 +1,61 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from selenium_v_requests_comparison.session import KeepAliveSession
+from selenium_v_requests_comparison.comparison import measure_requests
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"fact": "cats"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/fact"
+    server.shutdown()
+    server.server_close()
+
+
+def test_first_request_is_cold_then_reused(server_url):
+    with KeepAliveSession(pool_size=1) as session:
+        assert session.last_connection_reused is None
+        session.get(server_url)
+        assert session.last_connection_reused is False
+        session.get(server_url)
+        assert session.last_connection_reused is True
+        assert session.connection_count(server_url) == 1
+
+
+def test_adapter_uses_configured_pool_and_retries():
+    session = KeepAliveSession(pool_size=4, max_retries=3, backoff_factor=0.1)
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
+
+
+def test_measure_requests_with_session(server_url):
+    with KeepAliveSession() as session:
+        first = measure_requests(server_url, session=session)
+        second = measure_requests(server_url, session=session)
+    assert first.tags["connection"] == "cold"
+    assert second.tags["connection"] == "reused"
@@ -0,0 +1,92 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import subprocess
+import time
+from unittest.mock import patch
+import pytest
+
+from selenium_v_requests_comparison import comparison
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+HEAVY_MODULES = ("selenium", "webdriver_manager", "matplotlib")
+# Generous ceiling for importing the CLI module in a fresh interpreter
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_does_not_load_heavy_dependencies():
+    result = run_python(
+        "import sys\n"
+        "import selenium_v_requests_comparison.comparison\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_import_time_within_budget():
+    result = run_python(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import selenium_v_requests_comparison.comparison\n"
+        "print(time.perf_counter() - start)"
+    )
+    assert float(result.stdout) < IMPORT_BUDGET_SECONDS
+
+
+def test_help_is_fast_path():
+    start = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from selenium_v_requests_comparison.comparison import main; main()",
+            "--help",
+        ],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    assert time.perf_counter() - start < IMPORT_BUDGET_SECONDS
+
+
+def test_requests_only_run_skips_chrome(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "selenium_v_requests_comparison",
+            "--methods",
+            "requests",
+            "--local-server",
+            "--warmup",
+            "0",
+            "--min-samples",
+            "2",
+            "--max-samples",
+            "2",
+        ],
+    )
+    with patch.object(comparison, "install_chrome_if_needed") as mock_install:
+        comparison.main()
+    mock_install.assert_not_called()
+    assert (tmp_path / comparison.BOXPLOT_FILENAME).exists()
+    assert "<svg" in (tmp_path / comparison.REPORT_FILENAME).read_text()
+    assert len(os.listdir(tmp_path / comparison.HISTORY_DIR)) == 1
+
+
+def test_unknown_method_rejected(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "--methods", "curl"])
+    with pytest.raises(SystemExit):
+        comparison.main()
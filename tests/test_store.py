@@ -0,0 +1,122 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gzip
+import pytest
+
+from selenium_v_requests_comparison.sampling import SampleSet
+from selenium_v_requests_comparison.store import (
+    ResultStore,
+    load_series,
+    read_entries,
+    read_run,
+    split_label,
+)
+from selenium_v_requests_comparison.timing import FetchRecord
+
+
+def make_record(ms, tags=None, **metrics):
+    return FetchRecord(
+        "requests",
+        "http://example.com",
+        int(ms * 1e6),
+        phases_ns={"ttfb": int(ms * 5e5)},
+        tags=tags or {},
+        metrics=metrics,
+    )
+
+
+@pytest.mark.parametrize("filename", ["results.jsonl", "results.jsonl.gz"])
+def test_round_trip(tmp_path, filename):
+    path = str(tmp_path / filename)
+    with ResultStore(path, {"methods": ["requests"]}) as store:
+        store.append("API - Requests", make_record(50), warmup=True)
+        store.append("API - Requests", make_record(10, {"connection": "cold"}))
+        store.append("API - Requests", make_record(20, {"connection": "reused"}))
+        store.append("API - Requests", make_record(30, {"connection": "reused"}))
+        store.append_cold_start("Selenium cold start", 1.5)
+        store.append_group(
+            SampleSet("API - Requests", warmup=1, stop_reason="converged")
+        )
+    run = read_run(path)
+    assert run["methods"] == ["requests"]
+    assert "hostname" in run["host"]
+
+    groups = load_series(path, split=False)
+    assert list(groups) == ["API - Requests"]
+    assert groups["API - Requests"].values.tolist() == pytest.approx([0.01, 0.02, 0.03])
+    assert groups["API - Requests"].stop_reason == "converged"
+
+    series = load_series(path)
+    assert list(series) == [
+        "API - Requests (cold)",
+        "API - Requests (reused)",
+        "Selenium cold start",
+    ]
+    assert series["API - Requests (reused)"].mean_phases()["ttfb"] == pytest.approx(
+        0.0125
+    )
+    assert (
+        len(load_series(path, include_warmup=True, split=False)["API - Requests"]) == 4
+    )
+
+
+def test_partial_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with ResultStore(path) as store:
+        store.append("API - Requests", make_record(10))
+    with open(path, "a") as f:
+        f.write('{"type": "sample", "lab')
+    assert [entry["type"] for entry in read_entries(path)] == ["run", "sample"]
+
+
+def test_killed_gzip_writer_is_read_to_last_complete_line(tmp_path):
+    path = str(tmp_path / "results.jsonl.gz")
+    with gzip.open(path, "wt") as f:
+        f.write('{"type": "run"}\n' + '{"type": "sample"}\n' * 2000)
+    with open(path, "rb") as f:
+        data = f.read()
+    # A killed writer leaves the stream without its end-of-stream marker
+    with open(path, "wb") as f:
+        f.write(data[:-20])
+    entries = list(read_entries(path))
+    assert entries[0] == {"type": "run"}
+    assert 1 < len(entries) <= 2001
+
+
+def test_existing_file_is_not_overwritten(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text("earlier run\n")
+    with pytest.raises(FileExistsError):
+        ResultStore(str(path))
+    assert path.read_text() == "earlier run\n"
+
+
+def test_run_id_placeholder_names_one_file_per_run(tmp_path):
+    template = str(tmp_path / "results_{run_id}.jsonl")
+    with ResultStore(template) as first, ResultStore(template) as second:
+        assert first.path == template.replace("{run_id}", first.run_id)
+    assert read_run(second.path)["run_id"] == second.run_id
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_entries_are_on_disk_before_close(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    store = ResultStore(path)
+    store.append("API - Requests", make_record(10))
+    assert len(list(read_entries(path))) == 2
+    store.close()
+
+
+def test_mean_metrics_only_for_metrics_on_every_sample(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with ResultStore(path) as store:
+        store.append("A - Requests", make_record(10, cpu_seconds=1.0, extra=5))
+        store.append("A - Requests", make_record(10, cpu_seconds=3.0))
+    assert load_series(path)["A - Requests"].mean_metrics() == {"cpu_seconds": 2.0}
+
+
+def test_split_label():
+    assert split_label("A - Selenium", {"session": "warm"}) == "A - Selenium (warm)"
+    assert split_label("A - Requests", {}) == "A - Requests"
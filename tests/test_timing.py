@@ -0,0 +1,95 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from selenium_v_requests_comparison.timing import (
+    navigation_phases,
+    phase_timer,
+)
+from selenium_v_requests_comparison.session import KeepAliveSession
+from selenium_v_requests_comparison.comparison import measure_requests
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"x" * 4096
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_measure_requests_records_socket_phases(server_url):
+    record = measure_requests(server_url)
+    assert record.method == "requests"
+    assert record.status == 200
+    for phase in ("dns", "connect", "ttfb", "body"):
+        assert phase in record.phases_ns
+    # Plain HTTP has no handshake
+    assert "tls" not in record.phases_ns
+    assert sum(record.phases_ns.values()) <= record.total_ns
+
+
+def test_reused_connection_skips_connect_phases(server_url):
+    with KeepAliveSession() as session:
+        measure_requests(server_url, session=session)
+        record = measure_requests(server_url, session=session)
+    assert "dns" not in record.phases_ns
+    assert "connect" not in record.phases_ns
+    assert "ttfb" in record.phases_ns
+
+
+def test_phases_not_recorded_without_timer(server_url):
+    responses = []
+    with phase_timer() as timer, KeepAliveSession() as session:
+        # A fetch on another thread runs without a timer of its own
+        thread = threading.Thread(
+            target=lambda: responses.append(session.get(server_url))
+        )
+        thread.start()
+        thread.join()
+    assert responses[0].status_code == 200
+    assert timer.phases_ns == {}
+
+
+def test_navigation_phases_from_timing_entry():
+    entry = {
+        "domainLookupStart": 1.0,
+        "domainLookupEnd": 3.0,
+        "connectStart": 3.0,
+        "secureConnectionStart": 5.0,
+        "connectEnd": 9.0,
+        "requestStart": 9.5,
+        "responseStart": 20.0,
+        "responseEnd": 25.0,
+        "loadEventEnd": 40.0,
+    }
+    phases = navigation_phases(entry)
+    assert phases == {
+        "dns": 2_000_000,
+        "connect": 2_000_000,
+        "tls": 4_000_000,
+        "ttfb": 10_500_000,
+        "body": 5_000_000,
+        "render": 15_000_000,
+    }
+    assert navigation_phases(None) == {}
@@ -0,0 +1,152 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gzip
+import math
+import zlib
+
+import pytest
+import requests
+
+from selenium_v_requests_comparison.comparison import (
+    measure_encoding,
+    measure_requests,
+)
+from selenium_v_requests_comparison.server import (
+    BenchmarkServer,
+    ServerConfig,
+    negotiate_encoding,
+)
+from selenium_v_requests_comparison.session import KeepAliveSession
+from selenium_v_requests_comparison.timing import FetchRecord
+from selenium_v_requests_comparison.transfer import (
+    ENCODINGS,
+    EncodingResult,
+    compare_encodings,
+    decode_body,
+    format_encoding_row,
+    format_transfer,
+    plot_encodings,
+    resource_sizes,
+    run_encoding_comparison,
+    transfer_counter,
+)
+
+PAYLOAD_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def server():
+    config = ServerConfig(payload_size=PAYLOAD_SIZE, compression=True)
+    with BenchmarkServer(config=config) as server:
+        yield server
+
+
+def test_socket_bytes_are_counted_per_request(server):
+    with KeepAliveSession() as session:
+        for _ in range(2):
+            with transfer_counter() as counter:
+                session.get(server.api_url, headers={"Accept-Encoding": "identity"})
+            # Body plus status line and headers, on a fresh or reused connection
+            assert PAYLOAD_SIZE < counter.bytes_received < PAYLOAD_SIZE + 1024
+            assert 0 < counter.bytes_sent < 1024
+            assert counter.requests == 1
+    with transfer_counter() as counter:
+        requests.get(server.api_url)
+    assert counter.bytes_received == 0
+
+
+def test_measure_requests_records_wire_and_decoded_bytes(server):
+    record = measure_requests(server.api_url)
+    # requests asks for gzip by default, so far fewer bytes cross the wire
+    assert record.metrics["decoded_bytes"] >= PAYLOAD_SIZE
+    assert record.metrics["wire_bytes"] < record.metrics["decoded_bytes"] / 2
+    assert record.metrics["request_count"] == 1
+    assert "wire=" in format_transfer(record.metrics)
+
+
+def test_server_negotiates_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("deflate;q=0.5, gzip;q=0") == "deflate"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_server_compression_is_opt_in(server):
+    compressed = requests.get(server.static_url)
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert len(compressed.content) == PAYLOAD_SIZE
+    plain = requests.get(server.static_url, params={"compress": 0})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.content == compressed.content
+
+
+def test_decode_body():
+    body = b"job " * 100
+    assert decode_body(gzip.compress(body), "gzip") == body
+    assert decode_body(zlib.compress(body), "deflate") == body
+    raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    assert decode_body(raw.compress(body) + raw.flush(), "deflate") == body
+    assert decode_body(body, "identity") == body
+    with pytest.raises(ValueError):
+        decode_body(body, "br")
+
+
+def test_measure_encoding_times_decode(server):
+    with KeepAliveSession() as session:
+        record = measure_encoding(server.api_url, "deflate", session)
+    assert record.tags == {"encoding": "deflate"}
+    assert record.metrics["decoded_bytes"] >= PAYLOAD_SIZE
+    assert record.metrics["encoded_bytes"] < record.metrics["decoded_bytes"]
+    assert record.phases_ns["decode"] > 0
+    assert sum(record.phases_ns.values()) <= record.total_ns
+
+
+def test_encoding_comparison(server, tmp_path):
+    results = run_encoding_comparison(server.api_url, ENCODINGS, 2, measure_encoding)
+    assert [len(result.records) for result in results] == [2, 2, 2]
+    rows = compare_encodings(results)
+    identity, gzip_row, _ = rows
+    assert identity["bytes_saved"] == 0
+    assert identity["ratio"] == pytest.approx(1)
+    assert gzip_row["used"] == "gzip"
+    assert gzip_row["bytes_saved"] > PAYLOAD_SIZE / 2
+    assert gzip_row["ratio"] > 2
+    assert "KiB saved" in format_encoding_row(gzip_row)
+    filename = tmp_path / "encodings.png"
+    plot_encodings(rows, str(filename))
+    assert filename.exists()
+
+
+def test_compare_encodings_ratio_of_empty_or_unmeasured_body():
+    def sample(**metrics):
+        return FetchRecord("requests", "u", 1_000_000, metrics=metrics)
+
+    empty = EncodingResult(
+        "identity", [sample(wire_bytes=200, decoded_bytes=0, encoded_bytes=0)]
+    )
+    unmeasured = EncodingResult("gzip", [sample(wire_bytes=200)])
+    rows = compare_encodings([empty, unmeasured])
+    assert [math.isnan(row["ratio"]) for row in rows] == [True, True]
+    assert rows[1]["bytes_saved"] == 0
+
+
+def test_resource_sizes():
+    metrics = resource_sizes(
+        [
+            ["navigation", 1300, 1000, 4000],
+            ["script", 500, 200, 600],
+            ["script", 0, 0, 0],
+        ]
+    )
+    assert metrics == {
+        "wire_bytes": 1800,
+        "encoded_bytes": 1200,
+        "decoded_bytes": 4600,
+        "request_count": 3,
+        "wire_bytes.navigation": 1300,
+        "wire_bytes.script": 500,
+    }
+    assert resource_sizes(None) == {}
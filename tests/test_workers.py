@@ -0,0 +1,84 @@
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import queue
+import socket
+from unittest.mock import patch, MagicMock
+import pytest
+
+from selenium_v_requests_comparison.timing import FetchRecord
+from selenium_v_requests_comparison.workers import (
+    ParallelResult,
+    PortAllocator,
+    _selenium_worker,
+    format_parallel_result,
+    run_parallel_selenium,
+)
+
+
+def make_driver(profile_dir, **options):
+    driver = MagicMock()
+    driver.window_handles = ["main"]
+    driver.current_url = "about:blank"
+    driver.execute_script.return_value = "complete"
+    return driver
+
+
+def test_port_blocks_do_not_overlap():
+    first = PortAllocator(0, base_port=20000, block_size=10)
+    second = PortAllocator(1, base_port=20000, block_size=10)
+    assert set(first.ports).isdisjoint(second.ports)
+    assert first.next_port() in first.ports
+    assert second.next_port() in second.ports
+
+
+def test_port_allocator_skips_busy_ports():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        port = busy.getsockname()[1]
+        allocator = PortAllocator(0, base_port=port, block_size=2)
+        assert allocator.next_port() == port + 1
+
+
+def test_parallel_result_rates():
+    records = [
+        FetchRecord("selenium", "u", 1_000_000_000, tags={"worker": 0}),
+        FetchRecord("selenium", "u", 3_000_000_000, tags={"worker": 0}),
+        FetchRecord("selenium", "u", 2_000_000_000, tags={"worker": 1}),
+    ]
+    result = ParallelResult(2, 6.0, records)
+    assert result.pages_per_minute == pytest.approx(30)
+    assert result.per_worker_latency() == {0: 2.0, 1: 2.0}
+    assert "pages/min=30.0" in format_parallel_result(result)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Relies on fork to inherit mocks")
+@patch(
+    "selenium_v_requests_comparison.comparison.start_chrome", side_effect=make_driver
+)
+def test_run_parallel_selenium_spreads_samples(mock_start):
+    result = run_parallel_selenium(["https://example.com"] * 6, workers=2)
+    assert result.errors == 0
+    assert len(result.records) == 6
+    assert {record.tags["worker"] for record in result.records} <= {0, 1}
+    assert result.pages_per_minute > 0
+
+
+@patch(
+    "selenium_v_requests_comparison.comparison.start_chrome", side_effect=make_driver
+)
+def test_worker_uses_driver_options_and_its_port_block(mock_start):
+    tasks, results = queue.Queue(), queue.Queue()
+    tasks.put(None)
+    options = {"page_load_strategy": "eager", "blocked_urls": ["*.png"]}
+    _selenium_worker(1, 20000, "", None, options, tasks, results)
+    kwargs = mock_start.call_args.kwargs
+    assert kwargs["page_load_strategy"] == "eager"
+    assert kwargs["blocked_urls"] == ["*.png"]
+    ports = PortAllocator(1, base_port=20000).ports
+    assert kwargs["debugging_port"] in ports
+    assert kwargs["service_port"] in ports
+    assert kwargs["service_port"] != kwargs["debugging_port"]
+    assert [results.get()[0] for _ in range(2)] == ["ready", "done"]